@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+"""Benchmarks per-document parsing in the docs review agent.
+
+Compares the old per-call setup, which built a MarkdownIt parser and
+looked up string regexes on every call, against the shared parser and
+precompiled patterns used by DocumentModel. Runs over the MDX files in
+apps/docs by default:
+
+    python benchmarks/document_parsing.py [--docs-dir DIR] [--repeat N]
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_DIR / "src" / "development" / "agents" / "docs"))
+
+from markdown_it import MarkdownIt  # noqa: E402
+
+import patterns  # noqa: E402
+from document_model import DocumentModel, get_parser  # noqa: E402
+
+DEFAULT_DOCS_DIR = PROJECT_DIR.parents[2] / "apps" / "docs"
+
+# Patterns as they were passed to re on every call
+LEGACY_RELATED_FILES_PATTERNS = [
+    r"(?:##?\s*Related Files[^\n]*\n(?:[^\n]*\n)*?)((?:[-*]\s*`[^`]+`[^\n]*\n)+)",
+    r"(?:##?\s*Related Files[^\n]*\n(?:[^\n]*\n)*?)((?:[-*]\s*\/[^\n]+\n)+)",
+    r"(?:##?\s*Related Files[^\n]*\n(?:[^\n]*\n)*?)((?:[-*]\s*(?:`[^`]+`|\/[^\n]+)[^\n]*\n)+)",
+]
+
+
+def legacy_normalize_code(code: str) -> str:
+    code = re.sub(r"#.*$", "", code, flags=re.MULTILINE)
+    code = re.sub(r"//.*$", "", code, flags=re.MULTILINE)
+    code = re.sub(r"/\*.*?\*/", "", code, flags=re.DOTALL)
+    code = re.sub(r"\s+", " ", code)
+    return code.strip()
+
+
+def legacy_pass(content: str, path: str) -> int:
+    """The per-document work as it was done before DocumentModel."""
+    md = MarkdownIt()
+    references = set()
+    for token in md.parse(content):
+        if token.type == "fence":
+            references.update(
+                re.findall(
+                    r"\b(?:class|def|function|const|let|var)\s+(\w+)", token.content
+                )
+            )
+        elif token.type == "inline" and "`" in token.content:
+            references.update(re.findall(r"`([^`]+)`", token.content))
+
+    related = set()
+    for pattern in LEGACY_RELATED_FILES_PATTERNS:
+        for match in re.finditer(pattern, content, re.MULTILINE | re.IGNORECASE):
+            related.update(
+                re.findall(r"(?:`([^`]+)`|[-*]\s*(\/[^\s\n]+))", match.group(1))
+            )
+
+    blocks = re.findall(r"```(\w*)\n(.*?)```", content, re.DOTALL)
+    normalized = [legacy_normalize_code(block) for _, block in blocks]
+    return len(references) + len(related) + len(normalized)
+
+
+def current_pass(content: str, path: str) -> int:
+    """The same work through a DocumentModel on the shared parser."""
+    document = DocumentModel(content, path, get_parser())
+    references = set()
+    for fence in document.fences:
+        references.update(patterns.DECLARATION.findall(fence.content))
+    references.update(code.content for code in document.inline_code)
+
+    normalized = []
+    for fence in document.fences:
+        code = patterns.HASH_COMMENT.sub("", fence.content)
+        code = patterns.SLASH_COMMENT.sub("", code)
+        code = patterns.BLOCK_COMMENT.sub("", code)
+        normalized.append(patterns.WHITESPACE.sub(" ", code).strip())
+    return len(references) + len(document.related_files) + len(normalized)
+
+
+def construct_per_call(content: str, path: str) -> int:
+    return len(MarkdownIt().disable("html_block").options)
+
+
+def construct_shared(content: str, path: str) -> int:
+    return len(get_parser().options)
+
+
+def parser_per_call(content: str, path: str) -> int:
+    return len(MarkdownIt().disable("html_block").parse(content))
+
+
+def shared_parser(content: str, path: str) -> int:
+    return len(get_parser().parse(content))
+
+
+def run(name, func, docs, repeat):
+    # Warm up once so imports and the regex cache do not count
+    for path, content in docs:
+        func(content, path)
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for path, content in docs:
+            func(content, path)
+        timings.append(time.perf_counter() - start)
+
+    best = min(timings)
+    print(
+        f"{name:<24} best {best * 1000:8.2f} ms / pass, "
+        f"{best / len(docs) * 1e6:8.1f} us / doc"
+    )
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs-dir", default=str(DEFAULT_DOCS_DIR))
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    docs = [
+        (str(path), path.read_text(encoding="utf-8"))
+        for path in sorted(Path(args.docs_dir).rglob("*.md*"))
+        if path.suffix in (".md", ".mdx") and "node_modules" not in path.parts
+    ]
+    if not docs:
+        sys.exit(f"No markdown files found in {args.docs_dir}")
+    print(f"{len(docs)} documents, best of {args.repeat} passes\n")
+
+    construct = run("construct per call", construct_per_call, docs, args.repeat)
+    construct_once = run("construct once", construct_shared, docs, args.repeat)
+    per_call = run("parse, parser per call", parser_per_call, docs, args.repeat)
+    shared = run("parse, shared parser", shared_parser, docs, args.repeat)
+    legacy = run("legacy document pass", legacy_pass, docs, args.repeat)
+    current = run("DocumentModel pass", current_pass, docs, args.repeat)
+
+    print(f"\nsetup speedup:    {construct / construct_once:.0f}x")
+    print(f"parser speedup:   {per_call / shared:.2f}x")
+    print(f"document speedup: {legacy / current:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
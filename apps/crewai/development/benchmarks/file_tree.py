@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+"""Benchmarks generate_file_tree on a synthetic tree of about 100k entries.
+
+Compares the previous implementation, which rebuilt its ignore patterns
+for every directory and split and relpath'ed the full path of every entry,
+against the one in development.tools.file_tools, which compiles its
+ignore rules once per call.
+
+Also times the bounded breadth-first tree, which stops once its budget
+is spent:
+
+    python benchmarks/file_tree.py [--entries 100000] [--dir DIR] [--repeat N]
+
+The tree is created in a temporary directory under --dir, which defaults
+to the current directory: the previous implementation ignores every path
+with "tmp" or "temp" anywhere in it, so the system temp directory cannot
+be used.
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+PROJECT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_DIR / "src"))
+
+from development.tools.file_tools import (  # noqa: E402
+    generate_bounded_file_tree,
+    generate_file_tree,
+)
+from development.tools.repo_walker import IgnoreMatcher, scan_directory  # noqa: E402
+from development.tools.repository import RepositoryContext  # noqa: E402
+
+
+def legacy_generate_file_tree(path: str, max_depth: int = 5) -> str:
+    """generate_file_tree as it was in crew.py."""
+
+    def should_ignore(path: str, ignore_patterns: set, ignore_paths: set) -> bool:
+        path_parts = path.split(os.sep)
+        rel_path = os.path.relpath(path, "/Users/jhs/Projects/sfh")
+        return any(
+            any(
+                pattern in part.lower() or part.endswith(pattern.replace("*", ""))
+                for pattern in ignore_patterns
+            )
+            for part in path_parts
+        ) or any(rel_path.startswith(ignore_path) for ignore_path in ignore_paths)
+
+    root_matcher = IgnoreMatcher.from_gitignore(path)
+
+    def tree_helper(
+        dir_path: str,
+        relative_dir: str = "",
+        prefix: str = "",
+        depth: int = 0,
+        matcher: Optional[IgnoreMatcher] = None,
+    ) -> List[str]:
+        if depth > max_depth:
+            return []
+
+        ignore_patterns = {
+            ".git",
+            "node_modules",
+            "__pycache__",
+            ".venv",
+            ".DS_Store",
+            "*.pyc",
+            "*.pyo",
+            "*.pyd",
+            ".env",
+            ".vscode",
+            ".idea",
+            "dist",
+            "build",
+            "coverage",
+            "tmp",
+            "temp",
+            "logs",
+            ".next",
+            ".cache",
+        }
+
+        ignore_paths = {"apps/crewai/openlit", "apps/crewai/development/openlit"}
+
+        try:
+            dir_matcher = (
+                matcher.for_directory(path, relative_dir) if matcher else root_matcher
+            )
+            entries = [
+                entry
+                for entry in scan_directory(dir_path, dir_matcher, relative_dir)
+                if not should_ignore(entry.path, ignore_patterns, ignore_paths)
+            ]
+
+            tree = []
+            for i, entry in enumerate(entries):
+                is_last = i == len(entries) - 1
+                marker = "└── " if is_last else "├── "
+                tree.append(f"{prefix}{marker}{entry.name}")
+                if entry.is_dir():
+                    ext_prefix = "    " if is_last else "│   "
+                    entry_relative = (
+                        f"{relative_dir}/{entry.name}" if relative_dir else entry.name
+                    )
+                    tree.extend(
+                        tree_helper(
+                            entry.path,
+                            entry_relative,
+                            prefix + ext_prefix,
+                            depth + 1,
+                            dir_matcher,
+                        )
+                    )
+
+            return tree
+        except Exception as e:
+            return [f"Error accessing {dir_path}: {str(e)}"]
+
+    try:
+        tree_lines = [".", *tree_helper(path)]
+        return "\n".join(tree_lines)
+    except Exception as e:
+        return f"Error generating file tree: {str(e)}"
+
+
+def build_tree(root: Path, entries: int) -> int:
+    """Creates a monorepo-like tree of packages, with some ignored content."""
+    (root / ".gitignore").write_text("*.generated.ts\nlocal/\n")
+    created = 0
+    package = 0
+    while created < entries:
+        package_dir = root / "packages" / f"pkg{package:03d}"
+        for module in range(10):
+            module_dir = package_dir / "src" / f"module{module}" / "components"
+            module_dir.mkdir(parents=True)
+            for i in range(20):
+                (module_dir / f"Component{i}.tsx").touch()
+                (module_dir / f"Component{i}.generated.ts").touch()
+            (module_dir / "index.ts").touch()
+            created += 45
+        for ignored in ("node_modules/react", "dist", "local"):
+            ignored_dir = package_dir / ignored
+            ignored_dir.mkdir(parents=True)
+            for i in range(20):
+                (ignored_dir / f"file{i}.js").touch()
+            created += 21
+        package += 1
+    return created
+
+
+def best_time(func, root: str, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = func(root)
+        timings.append(time.perf_counter() - start)
+    return min(timings), output
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--dir", default=".")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    root = os.path.abspath(tempfile.mkdtemp(prefix="file-tree-bench-", dir=args.dir))
+    try:
+        created = build_tree(Path(root), args.entries)
+        print(f"{created} entries in {root}, best of {args.repeat} runs\n")
+
+        # The synthetic tree is its own repository
+        repository = RepositoryContext(root)
+        legacy, legacy_output = best_time(legacy_generate_file_tree, root, args.repeat)
+        current, output = best_time(
+            lambda path: generate_file_tree(path, repository=repository),
+            root,
+            args.repeat,
+        )
+        if output != legacy_output:
+            sys.exit("Outputs differ")
+
+        bounded, bounded_output = best_time(
+            lambda path: generate_bounded_file_tree(path, repository=repository),
+            root,
+            args.repeat,
+        )
+
+        lines = output.count("\n") + 1
+        print(f"legacy generate_file_tree   {legacy * 1000:8.1f} ms")
+        print(f"generate_file_tree          {current * 1000:8.1f} ms")
+        print(
+            f"generate_bounded_file_tree  {bounded * 1000:8.1f} ms, "
+            f"{len(bounded_output)} of {len(output)} chars"
+        )
+        print(f"\n{lines} lines in both trees, speedup {legacy / current:.2f}x")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+"""Benchmarks Related Files extraction on pathological documents.
+
+Compares the old regex extraction, whose lazy line skipping backtracks
+through the rest of the document for every "Related Files" heading that
+is not followed by a list, against the token-based section parser in
+DocumentModel:
+
+    python benchmarks/related_files.py [--sizes 500 1000 2000 4000]
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_DIR / "src" / "development" / "agents" / "docs"))
+
+from document_model import DocumentModel, get_parser, normalize_file_path  # noqa: E402
+
+LEGACY_PATTERNS = [
+    r"(?:##?\s*Related Files[^\n]*\n(?:[^\n]*\n)*?)((?:[-*]\s*`[^`]+`[^\n]*\n)+)",
+    r"(?:##?\s*Related Files[^\n]*\n(?:[^\n]*\n)*?)((?:[-*]\s*\/[^\n]+\n)+)",
+    r"(?:##?\s*Related Files[^\n]*\n(?:[^\n]*\n)*?)((?:[-*]\s*(?:`[^`]+`|\/[^\n]+)[^\n]*\n)+)",
+]
+
+
+def legacy_related_files(content: str) -> set:
+    """The regex extraction as it was in _extract_related_files."""
+    related_files = set()
+    for pattern in LEGACY_PATTERNS:
+        for match in re.finditer(pattern, content, re.MULTILINE | re.IGNORECASE):
+            file_list = match.group(1)
+            for backtick_match, plain_match in re.findall(
+                r"(?:`([^`]+)`|[-*]\s*(\/[^\s\n]+))", file_list
+            ):
+                clean_path = normalize_file_path(
+                    (backtick_match or plain_match).strip()
+                )
+                if clean_path:
+                    related_files.add(clean_path)
+    return related_files
+
+
+def headings_without_lists(lines: int) -> str:
+    """Many "Related Files" headings, none followed by a list."""
+    return "# Guide\n\n" + "## Related Files\n\nSee the source for details.\n\n" * (
+        lines // 4
+    )
+
+
+def list_at_the_end(lines: int) -> str:
+    """A long section of prose before the only list in the document."""
+    return (
+        "# Guide\n\n## Related Files\n\n"
+        + "Some explanation of the files below.\n" * lines
+        + "\n- `src/index.ts`\n"
+    )
+
+
+def long_list_items(lines: int) -> str:
+    """A Related Files list whose items never contain a path."""
+    return "# Guide\n\n## Related Files\n\n" + "- a plain list item\n" * lines
+
+
+CASES = {
+    "headings without lists": headings_without_lists,
+    "list at the end": list_at_the_end,
+    "items without paths": long_list_items,
+}
+
+
+def best_time(func, content, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(content)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 1000, 2000, 4000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(
+        f"{'case':<24} {'lines':>6} {'legacy regex':>14} {'parse':>10} {'sections':>10}"
+    )
+    for name, build in CASES.items():
+        for size in args.sizes:
+            content = build(size)
+            legacy = best_time(legacy_related_files, content, args.repeat)
+            parse = best_time(
+                lambda text: DocumentModel(text, "bench.mdx", get_parser()),
+                content,
+                args.repeat,
+            )
+            document = DocumentModel(content, "bench.mdx", get_parser())
+            sections = best_time(
+                lambda _: document._find_related_files(), content, args.repeat
+            )
+            print(
+                f"{name:<24} {content.count(chr(10)):>6} "
+                f"{legacy * 1000:>11.1f} ms {parse * 1000:>7.1f} ms "
+                f"{sections * 1000:>7.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+import json
+import logging
+import os
+import tempfile
+import time
+import uuid
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from llm_dispatcher import LLMRequest
+
+logger = logging.getLogger("DocsReviewAgent")
+
+
+class BatchBackend:
+    """Submits LLM requests for asynchronous processing and fetches the results.
+
+    Request ids must be unique within a batch and at most 64 characters of
+    letters, digits, "_" and "-".
+    """
+
+    name: str = ""
+
+    def submit(self, requests: List[Tuple[str, LLMRequest]]) -> str:
+        """Submits (id, request) pairs and returns the batch id."""
+        raise NotImplementedError
+
+    def status(self, batch_id: str) -> str:
+        """Returns "ended" once every result is available, else "in_progress"."""
+        raise NotImplementedError
+
+    def results(self, batch_id: str) -> Iterator[Tuple[str, Union[str, Exception]]]:
+        """Yields (id, response text or error) for each request of an ended batch."""
+        raise NotImplementedError
+
+
+class AnthropicBatchBackend(BatchBackend):
+    """Runs requests through the Anthropic Message Batches API."""
+
+    name = "anthropic"
+
+    def __init__(self, client_factory: Callable[[], Any]):
+        self.client_factory = client_factory
+
+    def submit(self, requests: List[Tuple[str, LLMRequest]]) -> str:
+        batch = self.client_factory().messages.batches.create(
+            requests=[
+                {
+                    "custom_id": request_id,
+                    "params": {
+                        "model": request.model,
+                        "max_tokens": request.max_tokens,
+                        "temperature": request.temperature,
+                        "system": request.system,
+                        "messages": [{"role": "user", "content": request.prompt}],
+                    },
+                }
+                for request_id, request in requests
+            ]
+        )
+        return batch.id
+
+    def status(self, batch_id: str) -> str:
+        batch = self.client_factory().messages.batches.retrieve(batch_id)
+        return "ended" if batch.processing_status == "ended" else "in_progress"
+
+    def results(self, batch_id: str) -> Iterator[Tuple[str, Union[str, Exception]]]:
+        for entry in self.client_factory().messages.batches.results(batch_id):
+            if entry.result.type == "succeeded":
+                yield entry.custom_id, entry.result.message.content[0].text
+            else:
+                yield entry.custom_id, RuntimeError(
+                    f"Batch request {entry.result.type}: {entry.result}"
+                )
+
+
+class LocalBatchBackend(BatchBackend):
+    """File-based stand-in for a batch API, for tests and dry runs.
+
+    A batch is a <id>.requests.jsonl file in the directory; it has ended once
+    a matching <id>.results.jsonl file of {"custom_id", "text"} or
+    {"custom_id", "error"} lines exists. If a responder is given, results
+    are produced from it the first time the status is checked.
+    """
+
+    name = "local"
+
+    def __init__(
+        self,
+        directory: str,
+        responder: Optional[Callable[[LLMRequest], str]] = None,
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.responder = responder
+
+    def _requests_path(self, batch_id: str) -> Path:
+        return self.directory / f"{batch_id}.requests.jsonl"
+
+    def _results_path(self, batch_id: str) -> Path:
+        return self.directory / f"{batch_id}.results.jsonl"
+
+    def submit(self, requests: List[Tuple[str, LLMRequest]]) -> str:
+        batch_id = f"local_{uuid.uuid4().hex}"
+        with open(self._requests_path(batch_id), "w", encoding="utf-8") as f:
+            for request_id, request in requests:
+                f.write(
+                    json.dumps({"custom_id": request_id, "params": asdict(request)})
+                    + "\n"
+                )
+        return batch_id
+
+    def _respond(self, batch_id: str) -> None:
+        lines = []
+        with open(self._requests_path(batch_id), "r", encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                try:
+                    text = self.responder(LLMRequest(**entry["params"]))
+                    lines.append({"custom_id": entry["custom_id"], "text": text})
+                except Exception as e:
+                    lines.append({"custom_id": entry["custom_id"], "error": str(e)})
+        _write_atomic(
+            self._results_path(batch_id),
+            "".join(json.dumps(line) + "\n" for line in lines),
+        )
+
+    def status(self, batch_id: str) -> str:
+        if not self._requests_path(batch_id).exists():
+            raise ValueError(f"Unknown batch: {batch_id}")
+        if not self._results_path(batch_id).exists() and self.responder:
+            self._respond(batch_id)
+        return "ended" if self._results_path(batch_id).exists() else "in_progress"
+
+    def results(self, batch_id: str) -> Iterator[Tuple[str, Union[str, Exception]]]:
+        with open(self._results_path(batch_id), "r", encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                if "error" in entry:
+                    yield entry["custom_id"], RuntimeError(entry["error"])
+                else:
+                    yield entry["custom_id"], entry["text"]
+
+
+def _write_atomic(path: Path, data: str) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class BatchJob:
+    """LLM requests collected during a review, saved to a job file.
+
+    The job file records the requests, keyed by their LLM cache key, what
+    kind of analysis each one asks for, and the batch they were submitted
+    as, so results can be collected and checked by a later process.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.backend: Optional[str] = None
+        self.batch_id: Optional[str] = None
+        self.status = "pending"
+        self.submitted_at: Optional[float] = None
+        self.requests: Dict[str, LLMRequest] = {}
+        self.kinds: Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.requests)
+
+    def add(self, request_id: str, request: LLMRequest, kind: str = "") -> None:
+        """Adds a request; ids already in the job are ignored."""
+        if self.batch_id is not None:
+            raise ValueError(f"Batch job {self.path} was already submitted")
+        if request_id not in self.requests:
+            self.requests[request_id] = request
+            self.kinds[request_id] = kind
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "backend": self.backend,
+            "batch_id": self.batch_id,
+            "status": self.status,
+            "submitted_at": self.submitted_at,
+            "requests": {
+                request_id: asdict(request)
+                for request_id, request in self.requests.items()
+            },
+            "kinds": self.kinds,
+        }
+        _write_atomic(self.path, json.dumps(data, indent=2))
+
+    @classmethod
+    def load(cls, path: str) -> "BatchJob":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        job = cls(path)
+        job.backend = data["backend"]
+        job.batch_id = data["batch_id"]
+        job.status = data["status"]
+        job.submitted_at = data["submitted_at"]
+        job.requests = {
+            request_id: LLMRequest(**params)
+            for request_id, params in data["requests"].items()
+        }
+        job.kinds = data.get("kinds", {})
+        return job
+
+    def submit(self, backend: BatchBackend) -> None:
+        """Submits the collected requests and saves the job file."""
+        if self.batch_id is not None:
+            raise ValueError(f"Batch job {self.path} was already submitted")
+        self.batch_id = backend.submit(list(self.requests.items()))
+        self.backend = backend.name
+        self.status = "submitted"
+        self.submitted_at = time.time()
+        self.save()
+        logger.info(
+            f"Submitted {len(self.requests)} LLM requests as batch {self.batch_id}, job saved to {self.path}"
+        )
+
+    def collect(
+        self, backend: BatchBackend, store: Callable[[str, str], None]
+    ) -> Dict[str, Any]:
+        """Passes each result to store(request_id, text) once the batch has ended.
+
+        Results that store() rejects by raising are logged and counted as
+        failed. Can be called repeatedly; it only collects once the batch
+        is done.
+        """
+        if self.batch_id is None:
+            raise ValueError(f"Batch job {self.path} has not been submitted")
+        if backend.name != self.backend:
+            raise ValueError(
+                f"Batch job {self.path} was submitted to {self.backend}, not {backend.name}"
+            )
+
+        summary = {"batch_id": self.batch_id, "requests": len(self.requests)}
+        if self.status != "collected" and backend.status(self.batch_id) != "ended":
+            summary["status"] = "in_progress"
+            return summary
+
+        succeeded = failed = 0
+        for request_id, result in backend.results(self.batch_id):
+            if request_id not in self.requests:
+                continue
+            try:
+                if isinstance(result, Exception):
+                    raise result
+                store(request_id, result)
+                succeeded += 1
+            except Exception as e:
+                logger.error(f"Batch request {request_id} failed: {e}")
+                failed += 1
+
+        self.status = "collected"
+        self.save()
+        summary.update(status="collected", succeeded=succeeded, failed=failed)
+        return summary
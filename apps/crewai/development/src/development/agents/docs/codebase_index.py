@@ -0,0 +1,319 @@
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+from pathlib import Path
+from functools import partial
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from mapped_file import DEFAULT_MAX_FILE_BYTES, SkippedFile, map_file
+
+logger = logging.getLogger("DocsReviewAgent")
+
+# Bump when the tokenizer or schema changes so stale indexes are rebuilt
+INDEX_VERSION = "3"
+
+# Tokens are maximal runs of word characters, so any word in a keyword
+# that is not at its edge is a whole token wherever the keyword occurs.
+# ASCII-only so keywords and raw file bytes are split the same way
+BYTES_TOKEN_PATTERN = re.compile(rb"[\w$]+")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    token TEXT NOT NULL,
+    reversed_token TEXT NOT NULL,
+    before TEXT NOT NULL,
+    after TEXT NOT NULL,
+    file_id INTEGER NOT NULL,
+    PRIMARY KEY (token, before, after, file_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_by_file ON postings (file_id);
+CREATE INDEX IF NOT EXISTS postings_by_suffix ON postings (reversed_token, after);
+"""
+
+# How a word of a keyword is looked up: as a whole token, or as the start
+# or end of a token when it sits at the keyword's edge
+EXACT = "exact"
+PREFIX = "prefix"
+SUFFIX = "suffix"
+
+# A token as stored: the token and the bytes just before and after it,
+# as latin-1 characters, or "" at the start or end of the file
+Posting = Tuple[str, str, str]
+
+
+def _context(data: bytes, start: int, end: int) -> str:
+    return data[start:end].decode("latin-1") if start >= 0 else ""
+
+
+def keyword_tokens(keyword: str) -> Optional[Set[Tuple[str, str, str, str]]]:
+    """Returns the (kind, word, before, after) lookups for a keyword.
+
+    Every file containing the keyword has a token passing each lookup. A
+    keyword that is a single word matches whole tokens only, whatever
+    surrounds them. Otherwise the words inside the keyword are whole tokens
+    with the keyword's characters around them, while the first word may be
+    the end of a longer token and the last the start of one: ".env" needs a
+    token starting with "env" right after a ".". Contexts that are not
+    fixed by the keyword are None. Returns None when the keyword has no
+    word characters, so it needs a full scan.
+    """
+    data = keyword.encode("utf-8")
+    words = list(BYTES_TOKEN_PATTERN.finditer(data))
+    if not words:
+        return None
+    if len(words) == 1 and words[0].group() == data:
+        return {(EXACT, keyword, None, None)}
+
+    lookups = set()
+    for match in words:
+        start, end = match.span()
+        before = _context(data, start - 1, start) if start else None
+        after = _context(data, end, end + 1) if end < len(data) else None
+        kind = SUFFIX if before is None else PREFIX if after is None else EXACT
+        lookups.add((kind, match.group().decode("ascii"), before, after))
+    return lookups
+
+
+def _prefix_range(prefix: str) -> Tuple[str, str]:
+    """Returns the bounds of the ASCII strings starting with prefix."""
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def tokenize_file(
+    file_path: Path, max_bytes: Optional[int] = DEFAULT_MAX_FILE_BYTES
+) -> Optional[Set[Posting]]:
+    """Returns the word tokens of a file with their contexts, or None if it is unreadable.
+
+    The file is tokenized straight from a memory map; binary files and files
+    over max_bytes are indexed without tokens.
+    """
+    try:
+        with map_file(file_path, max_bytes) as data:
+            return {
+                (
+                    match.group().decode("ascii"),
+                    _context(data, match.start() - 1, match.start()),
+                    _context(data, match.end(), match.end() + 1),
+                )
+                for match in BYTES_TOKEN_PATTERN.finditer(data)
+            }
+    except SkippedFile as e:
+        logger.debug(f"Skipping file: {e}")
+        return set()
+    except OSError as e:
+        logger.warning(f"Error reading file {file_path}: {e}")
+        return None
+
+
+def default_index_path(cache_dir: str, repo_path: str) -> Path:
+    """Returns the index location for a repository inside the cache directory."""
+    repo_key = hashlib.sha1(str(Path(repo_path).resolve()).encode()).hexdigest()[:12]
+    return Path(cache_dir) / f"codebase-index-{repo_key}.sqlite3"
+
+
+class CodebaseIndex:
+    """On-disk inverted index mapping word tokens to repository files.
+
+    Files are re-tokenized only when their mtime or size changes, so after the
+    first build a search costs one stat per file plus reads of the candidate
+    files returned by the posting-list intersection.
+    """
+
+    def __init__(
+        self,
+        repo_path: str,
+        index_path: str,
+        max_file_bytes: Optional[int] = DEFAULT_MAX_FILE_BYTES,
+    ):
+        self.repo_path = Path(repo_path)
+        self.index_path = Path(index_path)
+        self.max_file_bytes = max_file_bytes
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.index_path))
+        self._conn.executescript(SCHEMA)
+        self._check_version()
+
+    def __enter__(self) -> "CodebaseIndex":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def _check_version(self) -> None:
+        """Drops the stored postings if they were built by another index version."""
+        row = self._conn.execute(
+            "SELECT value FROM meta WHERE key = 'version'"
+        ).fetchone()
+        if row and row[0] == INDEX_VERSION:
+            return
+
+        if row:
+            logger.info("Codebase index version changed, rebuilding")
+        # The schema may have changed too, so the tables are recreated
+        self._conn.executescript(
+            "DROP TABLE IF EXISTS postings; DROP TABLE IF EXISTS files;" + SCHEMA
+        )
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)",
+                (INDEX_VERSION,),
+            )
+
+    def update(
+        self,
+        files: Iterable[Path],
+        map_func: Callable[..., Iterator] = map,
+    ) -> Tuple[int, int]:
+        """Brings the index in sync with the given files.
+
+        Changed files are tokenized through map_func, so a worker pool's
+        ordered map can be passed in to read them in parallel. Returns a
+        tuple of (re-indexed files, removed files).
+        """
+        known: Dict[str, Tuple[int, int, int]] = {
+            path: (file_id, mtime_ns, size)
+            for file_id, path, mtime_ns, size in self._conn.execute(
+                "SELECT id, path, mtime_ns, size FROM files"
+            )
+        }
+        seen = set()
+        changed: List[Tuple[Path, str, os.stat_result]] = []
+
+        for file_path in files:
+            relative_path = str(file_path.relative_to(self.repo_path))
+            seen.add(relative_path)
+            try:
+                stat = file_path.stat()
+            except OSError as e:
+                logger.warning(f"Error checking file {file_path}: {e}")
+                continue
+
+            entry = known.get(relative_path)
+            if entry and entry[1] == stat.st_mtime_ns and entry[2] == stat.st_size:
+                continue
+            changed.append((file_path, relative_path, stat))
+
+        updated = 0
+        removed = [path for path in known if path not in seen]
+
+        with self._conn:
+            tokenizer = partial(tokenize_file, max_bytes=self.max_file_bytes)
+            token_sets = map_func(tokenizer, [item[0] for item in changed])
+            for (_, relative_path, stat), tokens in zip(changed, token_sets):
+                if tokens is None:
+                    continue
+                self._store(relative_path, known.get(relative_path), stat, tokens)
+                updated += 1
+
+            for path in removed:
+                file_id = known[path][0]
+                self._conn.execute("DELETE FROM postings WHERE file_id = ?", (file_id,))
+                self._conn.execute("DELETE FROM files WHERE id = ?", (file_id,))
+
+        logger.info(
+            f"Codebase index updated: {updated} files re-indexed, {len(removed)} removed"
+        )
+        return updated, len(removed)
+
+    def _store(
+        self,
+        relative_path: str,
+        entry: Optional[Tuple[int, int, int]],
+        stat: os.stat_result,
+        tokens: Set[Posting],
+    ) -> None:
+        """Replaces the postings for a single file."""
+        if entry:
+            file_id = entry[0]
+            self._conn.execute("DELETE FROM postings WHERE file_id = ?", (file_id,))
+            self._conn.execute(
+                "UPDATE files SET mtime_ns = ?, size = ? WHERE id = ?",
+                (stat.st_mtime_ns, stat.st_size, file_id),
+            )
+        else:
+            cursor = self._conn.execute(
+                "INSERT INTO files (path, mtime_ns, size) VALUES (?, ?, ?)",
+                (relative_path, stat.st_mtime_ns, stat.st_size),
+            )
+            file_id = cursor.lastrowid
+
+        self._conn.executemany(
+            "INSERT INTO postings (token, reversed_token, before, after, file_id) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                (token, token[::-1], before, after, file_id)
+                for token, before, after in tokens
+            ),
+        )
+
+    def candidates(self, keyword: str) -> Optional[Set[str]]:
+        """Returns the files that may contain the keyword.
+
+        For a single word these are exactly the files with it as a token.
+        The words of a longer keyword are looked up with the characters the
+        keyword puts around them, those at its edges by token prefix or,
+        through the reversed tokens, by suffix. Returns None when the
+        keyword cannot be narrowed down by the index, see keyword_tokens().
+        """
+        lookups = keyword_tokens(keyword)
+        if lookups is None:
+            return None
+
+        queries = []
+        params: List[str] = []
+        for kind, word, before, after in lookups:
+            if kind == PREFIX:
+                conditions = ["token >= ?", "token < ?"]
+                params.extend(_prefix_range(word))
+            elif kind == SUFFIX:
+                conditions = ["reversed_token >= ?", "reversed_token < ?"]
+                params.extend(_prefix_range(word[::-1]))
+            else:
+                conditions = ["token = ?"]
+                params.append(word)
+            for column, value in (("before", before), ("after", after)):
+                if value is not None:
+                    conditions.append(f"{column} = ?")
+                    params.append(value)
+            queries.append(
+                "SELECT file_id FROM postings WHERE " + " AND ".join(conditions)
+            )
+
+        query = " INTERSECT ".join(queries)
+        rows = self._conn.execute(
+            f"SELECT path FROM files WHERE id IN ({query})", params
+        )
+        return {path for (path,) in rows}
+
+    def lookup(self, keywords: List[str]) -> Dict[str, List[str]]:
+        """Maps each indexed file to the keywords that may occur in it."""
+        all_files: Optional[List[str]] = None
+        by_file: Dict[str, List[str]] = {}
+
+        for keyword in keywords:
+            files = self.candidates(keyword)
+            if files is None:
+                if all_files is None:
+                    all_files = [
+                        path for (path,) in self._conn.execute("SELECT path FROM files")
+                    ]
+                files = all_files
+            for path in files:
+                by_file.setdefault(path, []).append(keyword)
+
+        return by_file
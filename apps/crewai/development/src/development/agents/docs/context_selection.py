@@ -0,0 +1,154 @@
+import difflib
+import math
+import re
+from collections import Counter
+from typing import List, Optional, Set, Tuple
+
+from llm_dispatcher import CHARS_PER_TOKEN
+
+# Default budget for the source excerpt sent with each comparison
+DEFAULT_CONTEXT_TOKENS = 6000
+
+IDENTIFIER_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+# Declarations kept as an outline of the file, whichever regions are sent
+SIGNATURE_PATTERN = re.compile(
+    r"^[ \t]*(?:export[ \t]+)?(?:default[ \t]+)?(?:pub[ \t]+)?(?:async[ \t]+)?"
+    r"(?:def|class|function|interface|type|enum|struct|fn|func|impl|module)\b"
+)
+
+# Fraction of the budget that may go to the signature outline
+SIGNATURE_SHARE = 0.2
+
+# Windows re-ranked with difflib after the identifier-overlap pass
+RERANK_CANDIDATES = 5
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def identifiers(text: str) -> Set[str]:
+    return set(IDENTIFIER_PATTERN.findall(text))
+
+
+def _windows(line_count: int, window_lines: int) -> List[Tuple[int, int]]:
+    """Overlapping (start, end) line ranges covering the file."""
+    step = max(1, window_lines // 2)
+    starts = range(0, max(1, line_count - window_lines + step), step)
+    return [(start, min(line_count, start + window_lines)) for start in starts]
+
+
+def _rank_windows(
+    lines: List[str], windows: List[Tuple[int, int]], block: str
+) -> List[Tuple[int, int]]:
+    """Orders windows by how closely they match a doc block.
+
+    Windows are scored by the shared identifiers, weighted so identifiers
+    that appear all over the file count for less. The best few are then
+    re-ranked by fuzzy text similarity.
+    """
+    window_ids = [identifiers("\n".join(lines[start:end])) for start, end in windows]
+    document_frequency = Counter(identifier for ids in window_ids for identifier in ids)
+    block_ids = identifiers(block)
+    weight = {
+        identifier: math.log(1 + len(windows) / document_frequency[identifier])
+        for identifier in block_ids
+        if document_frequency[identifier]
+    }
+
+    scored = []
+    for index, ids in enumerate(window_ids):
+        score = sum(weight[identifier] for identifier in ids & weight.keys())
+        if score:
+            scored.append((score, index))
+    scored.sort(key=lambda item: (-item[0], item[1]))
+
+    top = scored[:RERANK_CANDIDATES]
+    if len(top) > 1:
+        matcher = difflib.SequenceMatcher(autojunk=False)
+        matcher.set_seq2(block)
+        reranked = []
+        for score, index in top:
+            start, end = windows[index]
+            matcher.set_seq1("\n".join(lines[start:end]))
+            reranked.append((score * (1 + matcher.ratio()), index))
+        reranked.sort(key=lambda item: (-item[0], item[1]))
+        scored = reranked + scored[RERANK_CANDIDATES:]
+
+    return [windows[index] for _, index in scored]
+
+
+def _merge(ranges: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def select_context(
+    source: str,
+    doc_blocks: List[str],
+    max_tokens: Optional[int] = DEFAULT_CONTEXT_TOKENS,
+    window_lines: int = 40,
+) -> Tuple[str, bool]:
+    """Selects the parts of a source file most relevant to the doc blocks.
+
+    Files that fit in max_tokens are returned whole. Larger files are cut
+    into overlapping windows; the best matching windows for each block are
+    taken in turn until the budget is spent, and the file's declarations
+    are added as an outline. Returns the excerpt and whether it was sliced.
+    """
+    if max_tokens is None or estimate_tokens(source) <= max_tokens:
+        return source, False
+
+    lines = source.splitlines()
+    windows = _windows(len(lines), window_lines)
+    rankings = [_rank_windows(lines, windows, block) for block in doc_blocks]
+
+    signatures = [
+        number for number, line in enumerate(lines) if SIGNATURE_PATTERN.match(line)
+    ]
+    outline: List[int] = []
+    outline_tokens = 0
+    for number in signatures:
+        cost = estimate_tokens(lines[number])
+        if outline_tokens + cost > max_tokens * SIGNATURE_SHARE:
+            break
+        outline.append(number)
+        outline_tokens += cost
+
+    # Take each block's next best window in turn so every block is covered
+    selected: List[Tuple[int, int]] = []
+    used_tokens = outline_tokens
+    depth = 0
+    while any(depth < len(ranking) for ranking in rankings):
+        for ranking in rankings:
+            if depth >= len(ranking) or ranking[depth] in selected:
+                continue
+            start, end = ranking[depth]
+            cost = estimate_tokens("\n".join(lines[start:end]))
+            if used_tokens + cost > max_tokens:
+                continue
+            selected.append((start, end))
+            used_tokens += cost
+        depth += 1
+
+    regions = _merge(selected)
+    covered = {number for start, end in regions for number in range(start, end)}
+
+    parts = []
+    outline = [number for number in outline if number not in covered]
+    if outline:
+        parts.append("... declarations elsewhere in the file ...")
+        parts.extend(f"{number + 1}: {lines[number]}" for number in outline)
+    for start, end in regions:
+        parts.append(f"... lines {start + 1}-{end} of {len(lines)} ...")
+        parts.extend(lines[start:end])
+    if not regions:
+        parts.append("... no regions of the file matched the examples ...")
+
+    return "\n".join(parts), True
@@ -0,0 +1,246 @@
+import logging
+from abc import ABC, abstractmethod
+from typing import Iterable, List, Optional, Set
+
+import patterns
+from document_model import DocumentModel
+
+logger = logging.getLogger("DocsReviewAgent")
+
+
+class Rule(ABC):
+    """A documentation quality check.
+
+    Local rules implement check() over the parsed document. Rules that need
+    an LLM subclass LLMRule instead.
+    """
+
+    id: str = ""
+    requires_llm: bool = False
+
+    @abstractmethod
+    def check(self, document: DocumentModel) -> List[dict]:
+        """Returns the issues found in the document."""
+
+    def issue(
+        self,
+        document: DocumentModel,
+        line_number: int,
+        category: str,
+        issue: str,
+        explanation: str,
+        recommendation: str,
+    ) -> dict:
+        """Builds a quality issue at a line of the document."""
+        return {
+            "file": document.file_path,
+            "type": "quality_issue",
+            "category": category,
+            "line_number": line_number,
+            "issue": issue,
+            "explanation": explanation,
+            "context": document.context_around(line_number),
+            "recommendation": recommendation,
+        }
+
+
+class LLMRule(Rule):
+    """A quality check that asks Claude for a JSON analysis of the document."""
+
+    requires_llm = True
+    # Bump when the prompt changes so cached analyses are not reused
+    version: str = "1"
+    system: str = ""
+    max_tokens: int = 1024
+
+    def check(self, document: DocumentModel) -> List[dict]:
+        """Finds nothing: the agent runs LLM rules through their prompt."""
+        return []
+
+    @abstractmethod
+    def build_prompt(self, document: DocumentModel) -> str:
+        """Returns the prompt asking for the analysis of the document."""
+
+    @abstractmethod
+    def parse_response(self, analysis: dict, document: DocumentModel) -> List[dict]:
+        """Turns the JSON analysis of the document into issues."""
+
+
+class OverviewHeaderRule(Rule):
+    """Flags "Overview" headers, which the table of contents already adds."""
+
+    id = "overview_header"
+
+    def check(self, document: DocumentModel) -> List[dict]:
+        return [
+            self.issue(
+                document,
+                heading.line_number,
+                "unnecessary_header",
+                'Unnecessary "Overview" header found',
+                'The "Overview" header is automatically added by the table of contents and should be removed',
+                'Remove the "Overview" header and keep the content',
+            )
+            for heading in document.headings
+            if heading.level <= 2 and heading.text.strip().lower() == "overview"
+        ]
+
+
+class FenceLanguageRule(Rule):
+    """Flags code blocks without a language tag."""
+
+    id = "fence_language"
+
+    def check(self, document: DocumentModel) -> List[dict]:
+        return [
+            self.issue(
+                document,
+                fence.line_number,
+                "missing_language",
+                "Code block without a language",
+                "Code blocks without a language are not highlighted and are skipped when comparing examples with the code",
+                "Add the language after the opening fence, e.g. ```bash",
+            )
+            for fence in document.fences
+            if not fence.language
+        ]
+
+
+class FrontmatterRule(Rule):
+    """Flags documents without a frontmatter title, which Starlight requires."""
+
+    id = "frontmatter"
+
+    def check(self, document: DocumentModel) -> List[dict]:
+        if document.frontmatter is None:
+            problem = "Missing frontmatter"
+        elif not patterns.FRONTMATTER_TITLE.search(document.frontmatter):
+            problem = "Missing title in frontmatter"
+        else:
+            return []
+        return [
+            self.issue(
+                document,
+                1,
+                "frontmatter",
+                problem,
+                "Starlight takes the page title from the frontmatter and fails to build pages without one",
+                "Start the document with a frontmatter block holding its title:\n---\ntitle: Page title\n---",
+            )
+        ]
+
+
+def heading_anchors(document: DocumentModel) -> Set[str]:
+    """Returns the anchors of the document's headings, as the site generates them."""
+    anchors = set()
+    for heading in document.headings:
+        slug = patterns.SLUG_EXCLUDED.sub("", heading.text.strip().lower())
+        slug = slug.replace(" ", "-")
+        anchor, n = slug, 0
+        while anchor in anchors:
+            n += 1
+            anchor = f"{slug}-{n}"
+        anchors.add(anchor)
+    return anchors
+
+
+class LinkRule(Rule):
+    """Flags links without a target and in-page links to missing headings.
+
+    Links to other pages are left alone: where they lead depends on the
+    site's routing, which the document alone does not tell.
+    """
+
+    id = "links"
+
+    def check(self, document: DocumentModel) -> List[dict]:
+        issues = []
+        anchors = None
+        for link in document.links:
+            href = link.href.strip()
+            if not href:
+                problem = "Link without a target"
+            elif href.startswith("#"):
+                if anchors is None:
+                    anchors = heading_anchors(document)
+                if href[1:].lower() in anchors:
+                    continue
+                problem = f"Link to a missing section: {href}"
+            else:
+                continue
+            issues.append(
+                self.issue(
+                    document,
+                    link.line_number,
+                    "broken_link",
+                    problem,
+                    "The link does not lead to any part of the document",
+                    "Point the link at an existing heading or page, or remove it",
+                )
+            )
+        return issues
+
+
+class RelatedFilesRule(Rule):
+    """Flags documents without a Related Files section.
+
+    The review compares a document with the files listed there, so a
+    document without one is only checked against files guessed from its
+    JSON and YAML examples. Not a default rule: few documents have the
+    section yet.
+    """
+
+    id = "related_files"
+
+    def check(self, document: DocumentModel) -> List[dict]:
+        if any(
+            heading.text.strip().lower().startswith("related files")
+            for heading in document.headings
+        ):
+            return []
+        line_number = document.line_offset + 1
+        return [
+            self.issue(
+                document,
+                line_number,
+                "missing_related_files",
+                "No Related Files section",
+                "Without a Related Files section the review cannot tell which source files the document describes",
+                "Add a '## Related Files' section listing the source files as `path` items",
+            )
+        ]
+
+
+DEFAULT_RULES: List[Rule] = [
+    OverviewHeaderRule(),
+    FenceLanguageRule(),
+    FrontmatterRule(),
+    LinkRule(),
+]
+
+
+class RuleEngine:
+    """Runs a set of quality rules, keeping local and LLM rules apart."""
+
+    def __init__(self, rules: Optional[Iterable[Rule]] = None):
+        self.rules = list(DEFAULT_RULES if rules is None else rules)
+
+    @property
+    def local_rules(self) -> List[Rule]:
+        return [rule for rule in self.rules if not rule.requires_llm]
+
+    @property
+    def llm_rules(self) -> List[LLMRule]:
+        return [rule for rule in self.rules if rule.requires_llm]
+
+    def run_local(self, document: DocumentModel) -> List[dict]:
+        """Runs every local rule and returns their issues in rule order."""
+        issues = []
+        for rule in self.local_rules:
+            try:
+                issues.extend(rule.check(document))
+            except Exception as e:
+                logger.error(
+                    f"Error running rule {rule.id} on {document.file_path}: {e}"
+                )
+        return issues
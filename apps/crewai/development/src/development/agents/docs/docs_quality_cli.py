@@ -3,6 +3,7 @@
 import argparse
 import os
 from docs_review_agent import DocsReviewAgent
+from report_formats import FINDINGS_FORMATS
 import logging
 from crewai import Crew, Task
 import agentops
@@ -51,6 +52,47 @@ def create_docs_review_crew(agent, session, file_path=None, dir_path=None):
     return crew
 
 
+def scan_directory(agent, args):
+    """Scans a directory with the agent directly and returns the report.
+
+    Used for the options a crew task cannot pass on to the agent. Returns
+    None when the LLM checks were submitted as a batch job instead.
+    """
+    findings_out = (
+        open(args.findings_out, "w", encoding="utf-8") if args.findings_out else None
+    )
+    try:
+        result = agent.scan_docs_quality(
+            args.dir_path,
+            base_rev=args.base_rev,
+            batch_job=args.batch_job,
+            findings_out=findings_out,
+            findings_format=args.findings_format,
+        )
+    finally:
+        if findings_out is not None:
+            findings_out.close()
+    submitted = result.get("batch_job")
+    if submitted:
+        print(
+            f"\nSubmitted {submitted['requests']} LLM request(s) as batch {submitted['batch_id']}.\n"
+            f"Collect the results with 'collect {submitted['path']}', then run the scan again."
+        )
+        return None
+    return result["report"]
+
+
+def collect_batch_job(agent, job_path):
+    """Collects a batch job's results into the agent's cache and describes them."""
+    summary = agent.collect_batch_job(job_path)
+    if summary["status"] != "collected":
+        return f"Batch {summary['batch_id']} is still in progress, try again later."
+    return (
+        f"Collected batch {summary['batch_id']}: {summary['succeeded']} succeeded, "
+        f"{summary['failed']} failed. Run the scan again to build the report."
+    )
+
+
 def main():
     parser = argparse.ArgumentParser(description="Documentation Quality Review Tool")
     parser.add_argument(
@@ -85,6 +127,24 @@ def main():
         "directory", help="Review all documentation files in a directory"
     )
     dir_parser.add_argument("dir_path", help="Path to the documentation directory")
+    dir_parser.add_argument(
+        "--base-rev",
+        help="Only scan files changed since this git revision (e.g. origin/main)",
+    )
+    dir_parser.add_argument(
+        "--batch-job",
+        help="Submit the LLM checks as an offline batch saved to this job file instead of sending them",
+    )
+    dir_parser.add_argument(
+        "--findings-out",
+        help="Also write the issues to this file as they are found, for CI tools",
+    )
+    dir_parser.add_argument(
+        "--findings-format",
+        choices=FINDINGS_FORMATS,
+        default="jsonl",
+        help="Format of --findings-out: JSON lines or a SARIF log (default: jsonl)",
+    )
     dir_parser.add_argument(
         "--repo-name",
         help='GitHub repository name (e.g., "owner/repo"), required if posting to GitHub',
@@ -94,9 +154,15 @@ def main():
         help="GitHub Discussions category ID, required if posting to GitHub",
     )
 
+    # Batch collection command
+    collect_parser = subparsers.add_parser(
+        "collect", help="Collect the results of a batch job submitted by a scan"
+    )
+    collect_parser.add_argument("job_path", help="Path to the batch job file")
+
     args = parser.parse_args()
 
-    if args.post_to_github:
+    if args.post_to_github and args.command != "collect":
         if not args.github_token:
             print(
                 "Error: GitHub token is required when posting to GitHub. Set it via --github-token or GITHUB_TOKEN environment variable"
@@ -132,9 +198,14 @@ def main():
                 print(f"Posted to GitHub: {posted}")
 
         elif args.command == "directory":
-            # Create and run crew for directory review
-            crew = create_docs_review_crew(agent, session, dir_path=args.dir_path)
-            result = crew.kickoff()
+            if args.base_rev or args.batch_job or args.findings_out:
+                result = scan_directory(agent, args)
+                if result is None:
+                    return 0
+            else:
+                # Create and run crew for directory review
+                crew = create_docs_review_crew(agent, session, dir_path=args.dir_path)
+                result = crew.kickoff()
 
             # Post to GitHub if requested
             if args.post_to_github and result:
@@ -143,8 +214,12 @@ def main():
                 )
                 print(f"Posted to GitHub: {posted}")
 
+        elif args.command == "collect":
+            print(collect_batch_job(agent, args.job_path))
+            return 0
+
         else:
-            print("Error: Please specify a command ('file' or 'directory')")
+            print("Error: Please specify a command ('file', 'directory' or 'collect')")
             return 1
 
         # Print results
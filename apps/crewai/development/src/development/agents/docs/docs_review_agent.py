@@ -1,17 +1,38 @@
 import logging
-from typing import List, Optional, Any
+from typing import Dict, List, Optional, Any, TextIO, Tuple, Union
 from crewai import Agent, Task
 from langchain.tools import BaseTool
 from github import Github
 import os
 import requests
 from bs4 import BeautifulSoup
-from markdown_it import MarkdownIt
-import re
+from functools import partial
 from pathlib import Path
 from pydantic import Field, PrivateAttr
-import pathspec
 from dotenv import load_dotenv
+from development.tools.repo_walker import list_repository_files
+from development.tools.repository import find_repository_root
+from batch_jobs import AnthropicBatchBackend, BatchBackend, BatchJob
+from codebase_index import CodebaseIndex, default_index_path
+from context_selection import DEFAULT_CONTEXT_TOKENS, estimate_tokens, select_context
+from doc_rules import LLMRule, Rule, RuleEngine
+from document_model import DocumentModel, get_parser
+from fingerprints import DEFAULT_MIN_SIMILARITY, FingerprintIndex, SimilarCode
+from git_changes import changed_files
+from llm_cache import (
+    DEFAULT_MAX_BYTES,
+    DEFAULT_MAX_ENTRIES,
+    DEFAULT_TTL_SECONDS,
+    ResultCache,
+    make_cache_key,
+)
+from llm_dispatcher import AsyncLLMDispatcher, LLMRequest, batched_results
+from keyword_matcher import KeywordMatcher, match_file
+from mapped_file import DEFAULT_MAX_FILE_BYTES
+import patterns
+from report_formats import findings_writer
+from report_writer import CombinedReportWriter, QualityReportWriter
+from scan_pool import ScanPool
 
 # Load environment variables
 load_dotenv()
@@ -22,6 +43,34 @@ logging.basicConfig(
 )
 logger = logging.getLogger("DocsReviewAgent")
 
+CLAUDE_MODEL = "claude-3-haiku-20240307"
+
+# Bump when a prompt changes so cached results for the old prompt are ignored
+COMPARE_PROMPT_VERSION = "2"
+
+COMPARE_SYSTEM = "You are a documentation verification assistant specialized in comparing code examples against actual implementations. Be thorough and precise in identifying discrepancies."
+
+COMPARE_TASK = """Your task is to:
+1. Compare the documentation code examples against the actual implementation
+2. Identify any semantic differences, inconsistencies, or outdated patterns
+3. Consider both exact matches and logically equivalent code
+4. Pay special attention to:
+   - API changes
+   - Parameter differences
+   - Type changes
+   - Structural changes
+   - Deprecated features
+   - Best practices violations"""
+
+# One entry of the discrepancy list Claude is asked to return
+DISCREPANCY_SCHEMA = """        {
+            "type": "semantic_difference|api_change|parameter_mismatch|deprecated_feature|best_practice|other",
+            "severity": "high|medium|low",
+            "docs_version": "relevant code from docs",
+            "code_version": "relevant code from implementation",
+            "explanation": "detailed explanation of the difference"
+        }"""
+
 
 class FetchDocsTool(BaseTool):
     name: str = "fetch_docs"
@@ -106,11 +155,95 @@ class PostToGiscusTool(BaseTool):
 class DocsReviewAgent:
     """Agent responsible for reviewing documentation and finding inconsistencies with codebase."""
 
-    def __init__(self, github_token: Optional[str] = None):
+    def __init__(
+        self,
+        github_token: Optional[str] = None,
+        cache_dir: Optional[str] = None,
+        search_workers: Optional[int] = None,
+        search_executor: str = "thread",
+        search_chunk_size: int = 64,
+        file_enumeration: str = "auto",
+        max_file_bytes: Optional[int] = DEFAULT_MAX_FILE_BYTES,
+        llm_cache_ttl: Optional[float] = DEFAULT_TTL_SECONDS,
+        llm_cache_max_entries: int = DEFAULT_MAX_ENTRIES,
+        llm_cache_max_bytes: int = DEFAULT_MAX_BYTES,
+        quality_rules: Optional[List[Rule]] = None,
+        llm_concurrency: int = 8,
+        llm_requests_per_minute: float = 50,
+        llm_tokens_per_minute: float = 50000,
+        llm_max_retries: int = 4,
+        llm_max_connections: int = 20,
+        llm_max_keepalive_connections: int = 10,
+        llm_keepalive_expiry: float = 30.0,
+        llm_context_tokens: Optional[int] = DEFAULT_CONTEXT_TOKENS,
+        llm_batch_tokens: Optional[int] = None,
+        batch_backend: Optional[BatchBackend] = None,
+    ):
         self.github_token = github_token or os.getenv("GITHUB_TOKEN")
         if not self.github_token:
             raise ValueError("GitHub token is required")
 
+        # Directory for persistent state such as the codebase index
+        self.cache_dir = cache_dir or os.getenv(
+            "DOCS_REVIEW_CACHE_DIR", os.path.expanduser("~/.cache/docs_review")
+        )
+
+        # Worker pool used to read and match files in search_codebase
+        self.scan_pool = ScanPool(
+            workers=search_workers,
+            executor=search_executor,
+            chunk_size=search_chunk_size,
+        )
+
+        # How search_codebase lists files: "auto", "walk" or "git-index"
+        self.file_enumeration = file_enumeration
+
+        # Larger files are skipped by search_codebase to bound memory use
+        self.max_file_bytes = max_file_bytes
+
+        # LLM results keyed by the content they were computed from
+        self.llm_cache = ResultCache(
+            os.path.join(self.cache_dir, "llm"),
+            ttl_seconds=llm_cache_ttl,
+            max_entries=llm_cache_max_entries,
+            max_bytes=llm_cache_max_bytes,
+        )
+
+        # Anthropic clients are created on first use and shared by every call,
+        # with a connection pool sized by these settings
+        self.llm_max_connections = llm_max_connections
+        self.llm_max_keepalive_connections = llm_max_keepalive_connections
+        self.llm_keepalive_expiry = llm_keepalive_expiry
+        self._anthropic_client = None
+        self._async_anthropic_client = None
+
+        # Token budget for the source excerpt in each comparison; None sends
+        # whole files
+        self.llm_context_tokens = llm_context_tokens
+
+        # When set, comparisons of small files are packed into shared requests
+        # of up to this many tokens
+        self.llm_batch_tokens = llm_batch_tokens
+
+        # Backend for offline batch jobs, and the job collecting requests
+        # while a review runs in batch mode
+        self.batch_backend = batch_backend or AnthropicBatchBackend(
+            self._get_anthropic_client
+        )
+        self._batch_job: Optional[BatchJob] = None
+
+        # Sends Claude comparisons concurrently within the API rate limits
+        self.llm_dispatcher = AsyncLLMDispatcher(
+            self._get_async_anthropic_client,
+            max_concurrency=llm_concurrency,
+            requests_per_minute=llm_requests_per_minute,
+            tokens_per_minute=llm_tokens_per_minute,
+            max_retries=llm_max_retries,
+        )
+
+        # Documentation quality rules; defaults to the built-in local rules
+        self.rule_engine = RuleEngine(quality_rules)
+
         logger.info("Initializing DocsReviewAgent")
 
         # Define tools properly
@@ -161,147 +294,126 @@ class DocsReviewAgent:
             logger.error(f"Error reading MDX file: {e}")
             return None
 
-    def extract_code_references(self, markdown_text: str) -> List[str]:
+    def parse_document(self, doc_content: str, file_path: str = "") -> DocumentModel:
+        """Parses a documentation file once for every review stage."""
+        return DocumentModel(doc_content, file_path, get_parser())
+
+    def _document(self, doc: Union[str, DocumentModel]) -> DocumentModel:
+        """Accepts either raw markdown or an already parsed document."""
+        return doc if isinstance(doc, DocumentModel) else self.parse_document(doc)
+
+    def extract_code_references(
+        self, markdown_text: Union[str, DocumentModel]
+    ) -> List[str]:
         """Extracts code references and important terms from markdown content."""
         logger.info("Starting code reference extraction")
-        md = MarkdownIt()
-        tokens = md.parse(markdown_text)
+        document = self._document(markdown_text)
         code_references = set()
 
-        for token in tokens:
-            if token.type == "fence":  # Code blocks
-                logger.debug("Processing code fence block")
-                code = token.content
-                # Extract function names, class names, and important terms
-                references = re.findall(
-                    r"\b(?:class|def|function|const|let|var)\s+(\w+)", code
-                )
-                code_references.update(references)
-            elif token.type == "inline" and "`" in token.content:  # Inline code
-                logger.debug("Processing inline code")
-                # Extract terms within backticks
-                references = re.findall(r"`([^`]+)`", token.content)
-                code_references.update(references)
+        for fence in document.fences:  # Code blocks
+            logger.debug("Processing code fence block")
+            # Extract function names, class names, and important terms
+            references = patterns.DECLARATION.findall(fence.content)
+            code_references.update(references)
+
+        # Terms within backticks
+        code_references.update(code.content for code in document.inline_code)
 
         logger.info(f"Found {len(code_references)} unique code references")
         return list(code_references)
 
     def search_codebase(self, repo_path: str, keywords: List[str]) -> List[str]:
         """Searches the local codebase for files containing the keywords."""
+        return list(self.search_codebase_matches(repo_path, keywords))
+
+    def search_codebase_matches(
+        self, repo_path: str, keywords: List[str]
+    ) -> Dict[str, List[str]]:
+        """Maps each file containing any of the keywords to the keywords it contains."""
         logger.info(f"Searching codebase in {repo_path} for {len(keywords)} keywords")
-        matching_files = set()  # Using set to avoid duplicates
+        matching_files: Dict[str, List[str]] = {}
         repo_path = Path(repo_path)
 
-        # Load .gitignore patterns
-        gitignore_path = repo_path / ".gitignore"
-        gitignore_patterns = []
-        if gitignore_path.exists():
-            logger.debug("Loading .gitignore patterns")
-            with open(gitignore_path, "r") as f:
-                gitignore_patterns = [
-                    line.strip()
-                    for line in f
-                    if line.strip() and not line.startswith("#")
-                ]
-
-        # Create pathspec matcher
-        spec = pathspec.PathSpec.from_lines(
-            pathspec.patterns.GitWildMatchPattern, gitignore_patterns
-        )
+        # Compile all keywords into one automaton so each file is scanned once
+        matcher = KeywordMatcher(keywords)
 
-        # Additional binary and system files to exclude
-        excluded_extensions = {
-            ".pyc",
-            ".pyo",
-            ".pyd",
-            ".so",
-            ".dll",
-            ".dylib",
-            ".class",
-            ".exe",
-            ".bin",
-            ".pkl",
-            ".db",
-        }
         searchable_extensions = {".py", ".js", ".ts", ".jsx", ".tsx", ".md", ".mdx"}
 
-        def should_skip(path: Path) -> bool:
-            """Helper to determine if a path should be skipped."""
-            try:
-                # Get path relative to repo root for gitignore matching
-                relative_path = path.relative_to(repo_path)
-
-                # Skip if matches gitignore patterns
-                if spec.match_file(str(relative_path)):
-                    return True
-
-                # Skip binary files
-                if path.suffix in excluded_extensions:
-                    return True
-
-                # Skip if not in searchable extensions
-                if path.suffix not in searchable_extensions:
-                    return True
-
-                return False
-            except Exception as e:
-                logger.warning(f"Error checking path {path}: {e}")
-                return True
-
-        # First, collect all searchable files
+        # First, collect all searchable files, either from the git index or
+        # by walking the tree with nested .gitignore rules applied
         logger.info("Collecting searchable files...")
-        searchable_files = []
-        for file_path in repo_path.rglob("*"):
-            if file_path.is_file() and not should_skip(file_path):
-                searchable_files.append(file_path)
+        searchable_files = [
+            repo_path / relative_path
+            for relative_path in list_repository_files(
+                str(repo_path), self.file_enumeration
+            )
+            if os.path.splitext(relative_path)[1] in searchable_extensions
+        ]
 
         total_files = len(searchable_files)
         logger.info(f"Found {total_files} files to search through")
 
-        # Then search through the files
-        for i, file_path in enumerate(searchable_files, 1):
+        # Bring the persistent index up to date, then only read the files
+        # whose tokens can hold at least one keyword
+        index_path = default_index_path(self.cache_dir, str(repo_path))
+        with CodebaseIndex(
+            str(repo_path), str(index_path), self.max_file_bytes
+        ) as index:
+            index.update(searchable_files, map_func=self.scan_pool.map)
+            candidates = index.lookup(keywords)
+
+        total_candidates = len(candidates)
+        logger.info(
+            f"Index narrowed search to {total_candidates}/{total_files} candidate files"
+        )
+
+        # Then confirm the matches in the candidate files
+        scan = partial(
+            match_file, matcher, repo_path, max_file_bytes=self.max_file_bytes
+        )
+        for i, (relative_path, found) in enumerate(
+            self.scan_pool.map(scan, sorted(candidates)), 1
+        ):
             if i % 100 == 0:  # Log progress every 100 files
                 logger.info(
-                    f"Searched through {i}/{total_files} files ({(i/total_files)*100:.1f}%)"
+                    f"Searched through {i}/{total_candidates} files ({(i/total_candidates)*100:.1f}%)"
                 )
 
-            try:
-                content = file_path.read_text()
-                for keyword in keywords:
-                    if keyword in content:
-                        relative_path = str(file_path.relative_to(repo_path))
-                        matching_files.add(relative_path)
-                        logger.debug(f"Found match for '{keyword}' in: {relative_path}")
-                        break  # Once we find one keyword, no need to check others for this file
-            except Exception as e:
-                logger.warning(f"Error reading file {file_path}: {e}")
-                continue
+            # A single-word keyword only matches whole tokens, as the index
+            # stores them, whatever other keywords brought the file in
+            possible = set(candidates[relative_path])
+            found = [keyword for keyword in found if keyword in possible]
+            if found:
+                matching_files[relative_path] = found
+                logger.debug(f"Found matches for {found} in: {relative_path}")
 
         logger.info(
             f"Search complete. Found {len(matching_files)} files containing keywords"
         )
-        return list(matching_files)
+        return matching_files
 
     def analyze_discrepancies(
-        self, doc_content: str, code_files: List[str], repo_path: str
+        self,
+        doc_content: Union[str, DocumentModel],
+        code_files: List[str],
+        repo_path: str,
     ) -> List[dict]:
         """Analyzes discrepancies between documentation and code."""
         logger.info("Starting discrepancy analysis")
         discrepancies = []
 
+        # Extract code examples from docs
+        doc_code_blocks = [
+            fence.content for fence in self._document(doc_content).fences
+        ]
+        logger.debug(f"Found {len(doc_code_blocks)} code blocks in documentation")
+
         for file_path in code_files:
             logger.debug(f"Analyzing file: {file_path}")
             try:
                 full_path = Path(repo_path) / file_path
                 code_content = full_path.read_text()
-
-                # Extract code examples from docs
-                doc_code_blocks = re.findall(
-                    r"```[\w]*\n(.*?)```", doc_content, re.DOTALL
-                )
-                logger.debug(
-                    f"Found {len(doc_code_blocks)} code blocks in documentation"
-                )
+                index = FingerprintIndex(code_content)
 
                 # Compare code examples with actual code
                 for block in doc_code_blocks:
@@ -309,7 +421,7 @@ class DocsReviewAgent:
                         continue
 
                     # Look for similar but not identical code
-                    similar_code = self._find_similar_code(block.strip(), code_content)
+                    similar_code = self._find_similar_code(block.strip(), index)
                     if similar_code:
                         logger.info(f"Found discrepancy in {file_path}")
                         discrepancies.append(
@@ -317,7 +429,9 @@ class DocsReviewAgent:
                                 "file": file_path,
                                 "type": "code_mismatch",
                                 "docs_version": block.strip(),
-                                "code_version": similar_code,
+                                "code_version": similar_code.code,
+                                "similarity": round(similar_code.similarity, 2),
+                                "line_number": similar_code.start_line,
                             }
                         )
 
@@ -369,7 +483,7 @@ class DocsReviewAgent:
                 raise ValueError("No documentation file is currently being reviewed")
 
             # Extract the relevant path parts for pathname mapping
-            # From: /Users/jhs/Projects/sfh/apps/docs/src/content/docs/dev/stack/turborepo.mdx
+            # From: <repo>/apps/docs/src/content/docs/dev/stack/turborepo.mdx
             # To: dev/stack/turborepo
             try:
                 parts = self.current_docs_file.parts
@@ -464,108 +578,94 @@ class DocsReviewAgent:
             logger.error(f"Error posting to GitHub Discussions: {e}")
             return False
 
-    def _find_similar_code(self, docs_code: str, actual_code: str) -> Optional[str]:
-        """Helper method to find similar code snippets."""
-        # Remove whitespace and comments for comparison
-        clean_docs = re.sub(r"\s+|#.*$", "", docs_code, flags=re.MULTILINE)
-
-        # Look for similar code segments
-        code_lines = actual_code.split("\n")
-        for i in range(len(code_lines)):
-            window = "\n".join(code_lines[i : i + len(docs_code.split("\n"))])
-            clean_window = re.sub(r"\s+|#.*$", "", window, flags=re.MULTILINE)
-
-            if clean_docs in clean_window:
-                return window
-
+    def _find_similar_code(
+        self,
+        docs_code: str,
+        index: FingerprintIndex,
+        min_similarity: float = DEFAULT_MIN_SIMILARITY,
+    ) -> Optional[SimilarCode]:
+        """Helper method to find similar code snippets.
+
+        Looks the snippet up in the file's fingerprint index, ignoring
+        whitespace and comments, and returns the closest region if it shares
+        at least min_similarity of the snippet's fingerprints.
+        """
+        similar_code = index.find(docs_code)
+        if similar_code and similar_code.similarity >= min_similarity:
+            return similar_code
         return None
 
-    def _extract_related_files(self, doc_content: str) -> List[str]:
+    def _extract_related_files(
+        self, doc_content: Union[str, DocumentModel]
+    ) -> List[str]:
         """Extracts files listed in the Related Files section of the documentation."""
         logger.info("Extracting related files from documentation")
-
-        # Look for Related Files section using common markdown patterns
-        # The section might have explanatory text before the list
-        patterns = [
-            # Match section with backtick-formatted paths
-            r"(?:##?\s*Related Files[^\n]*\n(?:[^\n]*\n)*?)((?:[-*]\s*`[^`]+`[^\n]*\n)+)",
-            # Match section with plain list items
-            r"(?:##?\s*Related Files[^\n]*\n(?:[^\n]*\n)*?)((?:[-*]\s*\/[^\n]+\n)+)",
-            # Match section with mixed format
-            r"(?:##?\s*Related Files[^\n]*\n(?:[^\n]*\n)*?)((?:[-*]\s*(?:`[^`]+`|\/[^\n]+)[^\n]*\n)+)",
-        ]
-
-        related_files = set()
-
-        for pattern in patterns:
-            matches = re.finditer(pattern, doc_content, re.MULTILINE | re.IGNORECASE)
-            for match in matches:
-                file_list = match.group(1)
-                # Extract both backtick-formatted and plain paths
-                files = re.findall(r"(?:`([^`]+)`|[-*]\s*(\/[^\s\n]+))", file_list)
-                for backtick_match, plain_match in files:
-                    filename = backtick_match or plain_match
-                    if filename:
-                        # Clean up the path
-                        clean_path = self._normalize_file_path(filename.strip())
-                        if clean_path:
-                            related_files.add(clean_path)
-
-                # Also look for paths in explanatory text
-                explanatory_paths = re.findall(
-                    r"(?:^|\s)(?:`([^`]+)`|(/[^\s,]+))", file_list
-                )
-                for backtick_match, plain_match in explanatory_paths:
-                    filename = backtick_match or plain_match
-                    if filename:
-                        clean_path = self._normalize_file_path(filename.strip())
-                        if clean_path:
-                            related_files.add(clean_path)
-
-        # If no files found in Related Files section, try to find files mentioned in code blocks
-        if not related_files:
-            logger.info("No files found in Related Files section, checking code blocks")
-            code_blocks = re.finditer(
-                r"```(?:json|yaml)\n(.*?)```", doc_content, re.DOTALL
-            )
-            for block in code_blocks:
-                content = block.group(1)
-                # Look for file paths in code blocks
-                paths = re.findall(
-                    r'(?:"([^"]+\.[a-zA-Z]+)"|\'([^\']+\.[a-zA-Z]+)\')', content
-                )
-                for quote_match, single_match in paths:
-                    filename = quote_match or single_match
-                    if filename:
-                        clean_path = self._normalize_file_path(filename.strip())
-                        if clean_path:
-                            related_files.add(clean_path)
+        related_files = self._document(doc_content).related_files
 
         logger.info(f"Found {len(related_files)} related files in documentation")
         for file in related_files:
             logger.debug(f"Found related file: {file}")
-        return list(related_files)
+        return related_files
 
-    def _normalize_file_path(self, path: str) -> Optional[str]:
-        """Normalizes file paths found in documentation."""
-        if not path:
-            return None
+    def _verify_code_examples(
+        self, doc_content: Union[str, DocumentModel], file_path: str
+    ) -> List[dict]:
+        """Verifies code examples in documentation against actual code file."""
+        return self._verify_files(self._document(doc_content), [file_path])
 
-        # Remove any leading ./ or /
-        path = re.sub(r"^\.?/", "", path)
+    def _verify_files(
+        self, document: DocumentModel, file_paths: List[str]
+    ) -> List[dict]:
+        """Verifies code examples in documentation against several code files.
+
+        JSON examples are compared locally; everything else is sent to Claude,
+        with the comparisons for all files dispatched concurrently.
+        """
+        blocks_by_lang = self._group_code_blocks(document)
+        steps = []
+        for file_path in file_paths:
+            steps.extend(self._plan_code_verification(blocks_by_lang, file_path))
+
+        pending = [step for step in steps if step["discrepancies"] is None]
+        if pending:
+            results = self._compare_many_with_claude(
+                [
+                    (
+                        step["blocks"],
+                        step["actual_code"],
+                        step["file_path"],
+                        step["lang"],
+                    )
+                    for step in pending
+                ]
+            )
+            for step, discrepancies in zip(pending, results):
+                step["discrepancies"] = discrepancies
 
-        # Skip if it's not a file path or doesn't have an extension
-        if not re.search(r"\.[a-zA-Z]+$", path):
-            return None
+        discrepancies = []
+        for step in steps:
+            discrepancies.extend(step["discrepancies"])
+        return discrepancies
 
-        # Skip common non-source files
-        if re.match(r"^(node_modules|dist|build|coverage|\.git)/", path):
-            return None
+    def _group_code_blocks(self, document: DocumentModel) -> Dict[str, List[str]]:
+        """Groups the documentation's code blocks by language."""
+        blocks_by_lang = {}
+        for lang, fences in document.fences_by_language.items():
+            # Skip if empty language or non-code blocks
+            if not lang or lang in ["bash", "shell", "console", "output"]:
+                continue
+            blocks_by_lang[lang] = [fence.content.strip() for fence in fences]
 
-        return path
+        return blocks_by_lang
 
-    def _verify_code_examples(self, doc_content: str, file_path: str) -> List[dict]:
-        """Verifies code examples in documentation against actual code file."""
+    def _plan_code_verification(
+        self, blocks_by_lang: Dict[str, List[str]], file_path: str
+    ) -> List[dict]:
+        """Plans the comparisons for one code file, one step per language.
+
+        Steps that could be settled locally carry their discrepancies; the
+        rest have discrepancies set to None and need a Claude comparison.
+        """
         logger.info(f"Verifying code examples against {file_path}")
 
         try:
@@ -575,65 +675,269 @@ class DocsReviewAgent:
             logger.error(f"Error reading file {file_path}: {e}")
             return []
 
-        # Extract code blocks with their language specifiers
-        code_blocks = re.finditer(r"```(\w*)\n(.*?)```", doc_content, re.DOTALL)
-        discrepancies = []
-
-        # Group code blocks by language for batch processing
-        blocks_by_lang = {}
-        for block_match in code_blocks:
-            lang = block_match.group(1).lower()
-            block = block_match.group(2).strip()
-
-            # Skip if empty language or non-code blocks
-            if not lang or lang in ["bash", "shell", "console", "output"]:
-                continue
-
-            if lang not in blocks_by_lang:
-                blocks_by_lang[lang] = []
-            blocks_by_lang[lang].append(block)
-
-        # Process each language group
+        steps = []
         for lang, blocks in blocks_by_lang.items():
+            step = {
+                "file_path": file_path,
+                "lang": lang,
+                "blocks": blocks,
+                "actual_code": actual_code,
+                "discrepancies": None,
+            }
             if lang == "json":
                 # For JSON, first try structured comparison
                 try:
-                    json_discrepancies = self._compare_json(
+                    step["discrepancies"] = self._compare_json(
                         blocks[0], actual_code, file_path
                     )
-                    if json_discrepancies:
-                        discrepancies.extend(json_discrepancies)
-                    continue
                 except Exception as e:
                     logger.error(
                         f"Error in JSON comparison, falling back to Claude: {e}"
                     )
+            steps.append(step)
 
-            # Use Claude for semantic comparison
-            try:
-                semantic_discrepancies = self._compare_with_claude(
-                    blocks, actual_code, file_path, lang
-                )
-                discrepancies.extend(semantic_discrepancies)
-            except Exception as e:
-                logger.error(f"Error in Claude comparison: {e}")
-
-        return discrepancies
+        return steps
 
     def _compare_with_claude(
         self, doc_blocks: List[str], actual_code: str, file_path: str, lang: str
     ) -> List[dict]:
         """Uses Claude to perform semantic comparison between documentation and code."""
-        from anthropic import Anthropic
+        return self._compare_many_with_claude(
+            [(doc_blocks, actual_code, file_path, lang)]
+        )[0]
+
+    def _compare_many_with_claude(self, comparisons: List[tuple]) -> List[List[dict]]:
+        """Runs several Claude comparisons concurrently.
+
+        Each comparison is a (doc_blocks, actual_code, file_path, lang) tuple.
+        Cached analyses are reused and the rest are sent through the
+        dispatcher at once. Returns the discrepancies for each comparison in
+        order; a failed comparison is logged and yields no discrepancies.
+        """
+        results: List[List[dict]] = [[] for _ in comparisons]
+        misses = []
+        for i, (doc_blocks, actual_code, file_path, lang) in enumerate(comparisons):
+            cache_key = make_cache_key(
+                CLAUDE_MODEL,
+                COMPARE_PROMPT_VERSION,
+                self.llm_context_tokens,
+                lang,
+                file_path,
+                doc_blocks,
+                actual_code,
+            )
+            analysis = self.llm_cache.get(cache_key)
+            if analysis is not None:
+                logger.debug(f"Using cached comparison for {file_path} ({lang})")
+                try:
+                    results[i] = self._convert_claude_discrepancies(
+                        analysis, file_path, lang
+                    )
+                    continue
+                except Exception as e:
+                    # Request it again; the new analysis replaces the bad one
+                    logger.error(
+                        f"Ignoring malformed cached analysis for {file_path}: {e}"
+                    )
+            misses.append((i, cache_key))
+
+        if not misses:
+            return results
+
+        # In batch mode the requests are deferred to the batch job
+        if self._batch_job is not None:
+            for i, cache_key in misses:
+                self._batch_job.add(
+                    cache_key,
+                    self._build_compare_request(*comparisons[i]),
+                    kind="compare",
+                )
+            return results
 
-        discrepancies = []
-        api_key = os.getenv("ANTHROPIC_API_KEY")
-        if not api_key:
-            raise ValueError(
-                "ANTHROPIC_API_KEY not found in environment variables. Please add it to your .env file."
+        analyses = self._request_comparisons([comparisons[i] for i, _ in misses])
+        for (i, cache_key), analysis in zip(misses, analyses):
+            if analysis is None:
+                continue
+            _, _, file_path, lang = comparisons[i]
+            try:
+                # Convert Claude's analysis to our format
+                results[i] = self._convert_claude_discrepancies(
+                    analysis, file_path, lang
+                )
+                self.llm_cache.set(cache_key, analysis)
+            except Exception as e:
+                logger.error(f"Error getting Claude's analysis for {file_path}: {e}")
+
+        return results
+
+    def _request_comparisons(
+        self, comparisons: List[tuple], batch: bool = True
+    ) -> List[Optional[dict]]:
+        """Sends comparisons to Claude and returns each one's analysis.
+
+        In batching mode, comparisons of small files are packed into shared
+        requests; anything a batched response leaves out is retried on its
+        own. Failed comparisons are logged and yield None.
+        """
+        import json
+
+        analyses: List[Optional[dict]] = [None] * len(comparisons)
+        if batch and self.llm_batch_tokens:
+            groups, sections = self._batch_comparisons(comparisons)
+        else:
+            groups, sections = [[i] for i in range(len(comparisons))], None
+
+        llm_requests = [
+            (
+                self._build_compare_request(*comparisons[group[0]])
+                if len(group) == 1
+                else self._build_batch_compare_request([sections[i] for i in group])
             )
+            for group in groups
+        ]
+        try:
+            responses = self.llm_dispatcher.run_sync(llm_requests)
+        except Exception as e:
+            logger.error(f"Error in Claude comparison: {e}")
+            return analyses
+
+        retry = []
+        for group, response in zip(groups, responses):
+            try:
+                if isinstance(response, Exception):
+                    raise response
+
+                # Parse Claude's response
+                analysis = json.loads(response)
+                if len(group) == 1:
+                    analyses[group[0]] = analysis
+                    continue
 
-        anthropic = Anthropic(api_key=api_key)
+                results = batched_results(analysis)
+                for number, i in enumerate(group, 1):
+                    if number in results:
+                        analyses[i] = {
+                            "discrepancies": results[number].get("discrepancies", [])
+                        }
+                    else:
+                        retry.append(i)
+            except Exception as e:
+                files = ", ".join(comparisons[i][2] for i in group)
+                logger.error(f"Error getting Claude's analysis for {files}: {e}")
+                if len(group) > 1:
+                    retry.extend(group)
+
+        if retry:
+            logger.info(f"Retrying {len(retry)} batched comparisons individually")
+            retried = self._request_comparisons(
+                [comparisons[i] for i in retry], batch=False
+            )
+            for i, analysis in zip(retry, retried):
+                analyses[i] = analysis
+
+        return analyses
+
+    def _batch_comparisons(
+        self, comparisons: List[tuple]
+    ) -> Tuple[List[List[int]], List[str]]:
+        """Packs comparisons into groups that fit the batch token budget.
+
+        Returns the groups of comparison indexes and the prompt section for
+        each comparison. Comparisons taking more than half the budget are
+        sent on their own.
+        """
+        sections = [self._compare_section(*comparison) for comparison in comparisons]
+        groups: List[List[int]] = []
+        group_tokens: List[int] = []
+        for i, section in enumerate(sections):
+            tokens = estimate_tokens(section)
+            if tokens > self.llm_batch_tokens // 2:
+                groups.append([i])
+                group_tokens.append(self.llm_batch_tokens)
+                continue
+            for g, used in enumerate(group_tokens):
+                if used + tokens <= self.llm_batch_tokens:
+                    groups[g].append(i)
+                    group_tokens[g] += tokens
+                    break
+            else:
+                groups.append([i])
+                group_tokens.append(tokens)
+
+        logger.info(
+            f"Packed {len(comparisons)} comparisons into {len(groups)} requests"
+        )
+        return groups, sections
+
+    def _source_excerpt(
+        self, doc_blocks: List[str], actual_code: str
+    ) -> Tuple[str, str]:
+        """Returns the prompt heading and source text to compare against."""
+        # Large files are cut down to the regions relevant to the examples
+        source, sliced = select_context(
+            actual_code, doc_blocks, self.llm_context_tokens
+        )
+        if sliced:
+            return (
+                "Relevant excerpts of the actual codebase implementation (unrelated regions are omitted and must not be reported as missing):",
+                source,
+            )
+        return "Actual codebase implementation:", source
+
+    def _compare_section(
+        self, doc_blocks: List[str], actual_code: str, file_path: str, lang: str
+    ) -> str:
+        """Describes one comparison for a batched request."""
+        source_heading, source = self._source_excerpt(doc_blocks, actual_code)
+        section = f"""Language: {lang}
+File: {file_path}
+
+{source_heading}
+```{lang}
+{source}
+```
+
+Documentation code examples:
+"""
+        for i, block in enumerate(doc_blocks, 1):
+            section += f"\nExample {i}:\n```{lang}\n{block}\n```\n"
+        return section
+
+    def _build_batch_compare_request(self, sections: List[str]) -> LLMRequest:
+        """Builds one Claude request covering several comparisons."""
+        prompt = f"""You are performing a documentation verification task. You need to compare code examples from documentation against the actual codebase implementation. Below are {len(sections)} independent comparisons, each against a different file.
+
+For each comparison, {COMPARE_TASK[0].lower()}{COMPARE_TASK[1:]}
+"""
+        for number, section in enumerate(sections, 1):
+            prompt += f"\n## Comparison {number}\n{section}"
+
+        prompt += f"""\nAnalyze each comparison separately and provide a structured response in the following format:
+{{
+    "results": [
+        {{
+            "id": <comparison number>,
+            "discrepancies": [
+{DISCREPANCY_SCHEMA}
+            ]
+        }}
+    ]
+}}
+
+Include a result for every comparison. Only include actual discrepancies. If the code of a comparison is equivalent, return an empty list for it."""
+
+        return LLMRequest(
+            model=CLAUDE_MODEL,
+            system=COMPARE_SYSTEM,
+            prompt=prompt,
+            max_tokens=4096,
+        )
+
+    def _build_compare_request(
+        self, doc_blocks: List[str], actual_code: str, file_path: str, lang: str
+    ) -> LLMRequest:
+        """Builds the Claude request comparing documentation blocks with code."""
+        source_heading, source = self._source_excerpt(doc_blocks, actual_code)
 
         # Prepare the context for Claude
         prompt = f"""You are performing a documentation verification task. You need to compare code examples from documentation against the actual codebase implementation.
@@ -641,21 +945,11 @@ class DocsReviewAgent:
 Language: {lang}
 File: {file_path}
 
-Your task is to:
-1. Compare the documentation code examples against the actual implementation
-2. Identify any semantic differences, inconsistencies, or outdated patterns
-3. Consider both exact matches and logically equivalent code
-4. Pay special attention to:
-   - API changes
-   - Parameter differences
-   - Type changes
-   - Structural changes
-   - Deprecated features
-   - Best practices violations
+{COMPARE_TASK}
 
-Actual codebase implementation:
+{source_heading}
 ```{lang}
-{actual_code}
+{source}
 ```
 
 Documentation code examples:
@@ -665,56 +959,109 @@ Documentation code examples:
         for i, block in enumerate(doc_blocks, 1):
             prompt += f"\nExample {i}:\n```{lang}\n{block}\n```\n"
 
-        prompt += """\nAnalyze the differences and provide a structured response in the following format:
-{
+        prompt += f"""\nAnalyze the differences and provide a structured response in the following format:
+{{
     "discrepancies": [
-        {
-            "type": "semantic_difference|api_change|parameter_mismatch|deprecated_feature|best_practice|other",
-            "severity": "high|medium|low",
-            "docs_version": "relevant code from docs",
-            "code_version": "relevant code from implementation",
-            "explanation": "detailed explanation of the difference"
-        }
+{DISCREPANCY_SCHEMA}
     ]
-}
+}}
 
 Only include actual discrepancies. If the code is equivalent, return an empty list."""
 
-        try:
-            # Get Claude's analysis
-            response = anthropic.messages.create(
-                model="claude-3-haiku-20240307",
-                max_tokens=4096,
-                temperature=0,
-                system="You are a documentation verification assistant specialized in comparing code examples against actual implementations. Be thorough and precise in identifying discrepancies.",
-                messages=[{"role": "user", "content": prompt}],
-            )
+        return LLMRequest(
+            model=CLAUDE_MODEL,
+            system=COMPARE_SYSTEM,
+            prompt=prompt,
+            max_tokens=4096,
+        )
 
-            # Parse Claude's response
-            import json
+    def _anthropic_api_key(self) -> str:
+        """Reads the Anthropic API key from the environment."""
+        api_key = os.getenv("ANTHROPIC_API_KEY")
+        if not api_key:
+            raise ValueError(
+                "ANTHROPIC_API_KEY not found in environment variables. Please add it to your .env file."
+            )
+        return api_key
 
-            analysis = json.loads(response.content[0].text)
-
-            # Convert Claude's analysis to our format
-            for disc in analysis.get("discrepancies", []):
-                discrepancies.append(
-                    {
-                        "file": file_path,
-                        "type": "semantic_mismatch",
-                        "language": lang,
-                        "docs_version": disc["docs_version"],
-                        "code_version": disc["code_version"],
-                        "context": {
-                            "type": disc["type"],
-                            "severity": disc["severity"],
-                            "explanation": disc["explanation"],
-                        },
-                    }
-                )
+    def _http_limits(self):
+        """Connection pool settings shared by the sync and async clients."""
+        import httpx
 
-        except Exception as e:
-            logger.error(f"Error getting Claude's analysis: {e}")
+        return httpx.Limits(
+            max_connections=self.llm_max_connections,
+            max_keepalive_connections=self.llm_max_keepalive_connections,
+            keepalive_expiry=self.llm_keepalive_expiry,
+        )
 
+    def _get_anthropic_client(self):
+        """Returns the agent's Anthropic client, creating it on first use."""
+        if self._anthropic_client is None:
+            import httpx
+            from anthropic import DEFAULT_TIMEOUT, Anthropic
+
+            self._anthropic_client = Anthropic(
+                api_key=self._anthropic_api_key(),
+                http_client=httpx.Client(
+                    limits=self._http_limits(),
+                    timeout=DEFAULT_TIMEOUT,
+                    follow_redirects=True,
+                ),
+            )
+        return self._anthropic_client
+
+    def _get_async_anthropic_client(self):
+        """Returns the async client used by the LLM dispatcher.
+
+        It is created on the dispatcher's event loop and reused for every
+        dispatch, so connections stay alive between reviews.
+        """
+        if self._async_anthropic_client is None:
+            import httpx
+            from anthropic import DEFAULT_TIMEOUT, AsyncAnthropic
+
+            # The dispatcher retries with its own backoff and rate budget
+            self._async_anthropic_client = AsyncAnthropic(
+                api_key=self._anthropic_api_key(),
+                max_retries=0,
+                http_client=httpx.AsyncClient(
+                    limits=self._http_limits(),
+                    timeout=DEFAULT_TIMEOUT,
+                    follow_redirects=True,
+                ),
+            )
+        return self._async_anthropic_client
+
+    def close(self) -> None:
+        """Closes the Anthropic clients and stops the dispatcher's event loop."""
+        if self._anthropic_client is not None:
+            self._anthropic_client.close()
+            self._anthropic_client = None
+        if self._async_anthropic_client is not None:
+            self.llm_dispatcher.run_coroutine(self._async_anthropic_client.close)
+            self._async_anthropic_client = None
+        self.llm_dispatcher.close()
+
+    def _convert_claude_discrepancies(
+        self, analysis: dict, file_path: str, lang: str
+    ) -> List[dict]:
+        """Converts Claude's comparison analysis into discrepancy dicts."""
+        discrepancies = []
+        for disc in analysis.get("discrepancies", []):
+            discrepancies.append(
+                {
+                    "file": file_path,
+                    "type": "semantic_mismatch",
+                    "language": lang,
+                    "docs_version": disc["docs_version"],
+                    "code_version": disc["code_version"],
+                    "context": {
+                        "type": disc["type"],
+                        "severity": disc["severity"],
+                        "explanation": disc["explanation"],
+                    },
+                }
+            )
         return discrepancies
 
     def _compare_json(
@@ -807,14 +1154,12 @@ Only include actual discrepancies. If the code is equivalent, return an empty li
     def _normalize_code(self, code: str) -> str:
         """Normalizes code for comparison by removing whitespace and comments."""
         # Remove comments
-        code = re.sub(r"#.*$", "", code, flags=re.MULTILINE)  # Python comments
-        code = re.sub(
-            r"//.*$", "", code, flags=re.MULTILINE
-        )  # JavaScript/TypeScript comments
-        code = re.sub(r"/\*.*?\*/", "", code, flags=re.DOTALL)  # Multi-line comments
+        code = patterns.HASH_COMMENT.sub("", code)  # Python comments
+        code = patterns.SLASH_COMMENT.sub("", code)  # JavaScript/TypeScript comments
+        code = patterns.BLOCK_COMMENT.sub("", code)  # Multi-line comments
 
         # Normalize whitespace
-        code = re.sub(r"\s+", " ", code)
+        code = patterns.WHITESPACE.sub(" ", code)
         return code.strip()
 
     def _get_code_context(
@@ -840,204 +1185,324 @@ Only include actual discrepancies. If the code is equivalent, return an empty li
                 }
         return {}
 
-    def _check_docs_quality(self, doc_content: str, file_path: str) -> List[dict]:
-        """Checks documentation for quality requirements using Claude."""
-        logger.info(f"Checking documentation quality for {file_path}")
-        issues = []
-
-        try:
-            from anthropic import Anthropic
+    def _check_docs_quality(
+        self, doc_content: Union[str, DocumentModel], file_path: str
+    ) -> List[dict]:
+        """Checks documentation for quality requirements.
 
-            api_key = os.getenv("ANTHROPIC_API_KEY")
-            if not api_key:
-                raise ValueError(
-                    "ANTHROPIC_API_KEY not found in environment variables. Please add it to your .env file."
-                )
+        Structural rules run locally over the markdown tokens; only rules
+        that need semantic judgement are sent to Claude.
+        """
+        logger.info(f"Checking documentation quality for {file_path}")
+        document = (
+            doc_content
+            if isinstance(doc_content, DocumentModel)
+            else self.parse_document(doc_content, file_path)
+        )
+        issues = self.rule_engine.run_local(document)
 
-            anthropic = Anthropic(api_key=api_key)
+        for rule in self.rule_engine.llm_rules:
+            issues.extend(self._run_llm_rule(rule, document))
 
-            # Prepare the prompt for Claude
-            prompt = f"""Analyze this markdown documentation and identify if it contains any "Overview" headers (# Overview or ## Overview).
-If found, provide the line number and surrounding context.
-Only identify actual headers, not the word "Overview" used in other contexts.
+        return issues
 
-Documentation to analyze:
-```markdown
-{doc_content}
-```
+    def _run_llm_rule(self, rule: LLMRule, document: DocumentModel) -> List[dict]:
+        """Runs a quality rule that needs Claude, reusing cached analyses."""
+        try:
+            cache_key = make_cache_key(
+                CLAUDE_MODEL, rule.id, rule.version, document.content
+            )
+            analysis = self.llm_cache.get(cache_key)
+            if analysis is not None:
+                logger.debug(
+                    f"Using cached {rule.id} analysis for {document.file_path}"
+                )
+                return rule.parse_response(analysis, document)
 
-Respond in this exact JSON format:
-{{
-    "has_overview_header": boolean,
-    "findings": [
-        {{
-            "line_number": number,
-            "header_text": "the exact header text",
-            "context": "surrounding text (about 100 chars before and after)"
-        }}
-    ]
-}}"""
-
-            # Get Claude's analysis
-            response = anthropic.messages.create(
-                model="claude-3-haiku-20240307",
-                max_tokens=1024,
-                temperature=0,
-                system="You are a documentation quality checker. Be precise in identifying Overview headers in markdown files. Only respond with the exact JSON format specified.",
-                messages=[{"role": "user", "content": prompt}],
+            request = LLMRequest(
+                model=CLAUDE_MODEL,
+                system=rule.system,
+                prompt=rule.build_prompt(document),
+                max_tokens=rule.max_tokens,
             )
+            if self._batch_job is not None:
+                self._batch_job.add(cache_key, request, kind=f"rule:{rule.id}")
+                return []
+
+            # Get Claude's analysis through the dispatcher, so rule checks
+            # share the comparisons' rate budget and retries
+            (response,) = self.llm_dispatcher.run_sync([request])
+            if isinstance(response, Exception):
+                raise response
 
             # Parse the response
             import json
 
-            analysis = json.loads(response.content[0].text)
-
-            # Add issues based on findings
-            if analysis.get("has_overview_header"):
-                for finding in analysis.get("findings", []):
-                    issues.append(
-                        {
-                            "file": file_path,
-                            "type": "quality_issue",
-                            "category": "unnecessary_header",
-                            "line_number": finding["line_number"],
-                            "issue": 'Unnecessary "Overview" header found',
-                            "explanation": 'The "Overview" header is automatically added by the table of contents and should be removed',
-                            "context": finding["context"],
-                            "recommendation": 'Remove the "Overview" header and keep the content',
-                        }
-                    )
+            analysis = json.loads(response)
+            issues = rule.parse_response(analysis, document)
+            self.llm_cache.set(cache_key, analysis)
+            return issues
 
         except Exception as e:
-            logger.error(f"Error during Claude analysis: {e}")
+            logger.error(f"Error during Claude analysis for rule {rule.id}: {e}")
+            return []
 
-        return issues
+    def _start_batch_job(self, job_path: str) -> None:
+        """Defers LLM requests that miss the cache to a new batch job."""
+        if os.path.exists(job_path):
+            raise ValueError(f"Batch job {job_path} already exists")
+        self._batch_job = BatchJob(job_path)
 
-    def scan_docs_quality(self, docs_dir: str) -> dict:
-        """Scans all documentation files in the specified directory for quality issues."""
-        logger.info(f"Starting documentation quality scan in {docs_dir}")
-        all_issues = []
-
-        try:
-            # Get list of all markdown files
-            markdown_files = []
-            for root, _, files in os.walk(docs_dir):
-                for file in files:
-                    if file.endswith((".md", ".mdx")):
-                        file_path = os.path.join(root, file)
-                        markdown_files.append(file_path)
-
-            total_files = len(markdown_files)
-            processed_files = 0
-
-            if total_files == 0:
-                logger.warning(f"No markdown files found in {docs_dir}")
-                print(f"\nNo markdown files found in {docs_dir}")
-                return {
-                    "success": True,
-                    "issues_found": 0,
-                    "issues": [],
-                    "report": self._generate_quality_report([]),
-                }
+    def _submit_batch_job(self) -> Optional[dict]:
+        """Submits the deferred requests, if there are any, and ends batch mode."""
+        job, self._batch_job = self._batch_job, None
+        if job is None or not len(job):
+            return None
+        job.submit(self.batch_backend)
+        return {"path": str(job.path), "batch_id": job.batch_id, "requests": len(job)}
+
+    def collect_batch_job(self, job_path: str) -> dict:
+        """Collects the results of a submitted batch job into the LLM cache.
+
+        Returns a summary whose status is "in_progress" until the batch has
+        ended. Once it reports "collected", rerunning the same review builds
+        its report from the cache without further requests. Results that
+        are not a valid analysis are logged, counted as failed and not cached.
+        """
+        job = BatchJob.load(job_path)
+        return job.collect(
+            self.batch_backend,
+            lambda cache_key, text: self._store_batch_result(job, cache_key, text),
+        )
 
-            print(f"\nScanning {total_files} documentation files...")
-            print("Progress: ", end="", flush=True)
+    def _store_batch_result(self, job: BatchJob, cache_key: str, text: str) -> None:
+        """Caches a batch result once it has been parsed and checked, or raises."""
+        import json
 
-            for file_path in markdown_files:
-                relative_path = os.path.relpath(file_path, docs_dir)
+        analysis = json.loads(text)
+        if not isinstance(analysis, dict):
+            raise ValueError("analysis is not a JSON object")
+        if job.kinds.get(cache_key) == "compare":
+            # Conversion raises on missing or malformed discrepancy fields
+            self._convert_claude_discrepancies(analysis, "", "")
+        self.llm_cache.set(cache_key, analysis)
+
+    def llm_cache_stats(self) -> dict:
+        """Returns hit/miss counters and size of the LLM result cache."""
+        return self.llm_cache.stats()
+
+    def _log_llm_cache_stats(self) -> None:
+        """Logs a one-line summary of the LLM cache counters."""
+        stats = self.llm_cache.stats()
+        logger.info(
+            f"LLM cache: {stats['hits']} hits, {stats['misses']} misses "
+            f"({stats['hit_rate']:.0%} hit rate), {stats['entries']} entries"
+        )
 
-                try:
-                    with open(file_path, "r", encoding="utf-8") as f:
-                        content = f.read()
+    def scan_docs_quality(
+        self,
+        docs_dir: str,
+        base_rev: Optional[str] = None,
+        batch_job: Optional[str] = None,
+        report_out: Optional[TextIO] = None,
+        findings_out: Optional[TextIO] = None,
+        findings_format: str = "jsonl",
+    ) -> dict:
+        """Scans all documentation files in the specified directory for quality issues.
+
+        When base_rev is given, only files changed since that revision are scanned.
+        When batch_job is given, LLM requests are submitted as an offline batch
+        saved to that job file instead of being sent; the report is left out
+        until the results are collected with collect_batch_job().
+        When report_out is given, the report is written to that stream as
+        each file is checked instead of being returned. When findings_out is
+        given, each file's issues are also written to it as soon as the file
+        is checked, as JSON lines or, with findings_format="sarif", as a
+        SARIF log with paths relative to the repository root.
+        """
+        logger.info(f"Starting documentation quality scan in {docs_dir}")
+        all_issues = []
+        writer = QualityReportWriter(report_out)
+        findings = None
+        if findings_out is not None:
+            findings = findings_writer(
+                findings_out,
+                findings_format,
+                base_dir=find_repository_root(docs_dir) or docs_dir,
+                source_dir=docs_dir,
+            )
+        if batch_job:
+            self._start_batch_job(batch_job)
 
-                    # Print progress
-                    processed_files += 1
-                    progress = (processed_files / total_files) * 100
-                    print(
-                        f"\rProgress: {progress:.1f}% - Checking: {relative_path:<60}",
-                        end="",
-                        flush=True,
+        try:
+            try:
+                # Get list of all markdown files
+                markdown_files = []
+                for root, _, files in os.walk(docs_dir):
+                    for file in files:
+                        if file.endswith((".md", ".mdx")):
+                            file_path = os.path.join(root, file)
+                            markdown_files.append(file_path)
+
+                # Quality checks only depend on the doc itself, so unchanged
+                # docs can be skipped entirely
+                if base_rev:
+                    changed = changed_files(docs_dir, base_rev)
+                    markdown_files = [
+                        file_path
+                        for file_path in markdown_files
+                        if Path(os.path.relpath(file_path, docs_dir)).as_posix()
+                        in changed
+                    ]
+                    logger.info(
+                        f"Incremental scan against {base_rev}: {len(markdown_files)} changed files"
                     )
 
-                    # Check quality requirements
-                    issues = self._check_docs_quality(content, relative_path)
-
-                    # Print findings for current file
-                    if issues:
-                        print(f"\nFound {len(issues)} issue(s) in {relative_path}")
+                total_files = len(markdown_files)
+                processed_files = 0
+
+                if total_files == 0:
+                    self._batch_job = None
+                    logger.warning(f"No markdown files found in {docs_dir}")
+                    print(f"\nNo markdown files found in {docs_dir}")
+                    return {
+                        "success": True,
+                        "issues_found": 0,
+                        "issues": [],
+                        "report": writer.finish(),
+                    }
 
-                    all_issues.extend(issues)
+                print(f"\nScanning {total_files} documentation files...")
+                print("Progress: ", end="", flush=True)
 
-                except Exception as e:
-                    print(f"\nError processing file {file_path}: {e}")
-                    logger.error(f"Error processing file {file_path}: {e}")
-
-            # Clear the progress line and print summary
-            print("\n")
-            if all_issues:
-                print(
-                    f"Found total of {len(all_issues)} quality issues in {total_files} files."
-                )
-            else:
-                print(f"No quality issues found in {total_files} files.")
+                for file_path in markdown_files:
+                    relative_path = os.path.relpath(file_path, docs_dir)
 
-        except Exception as e:
-            logger.error(f"Error scanning docs directory: {e}")
-            raise
+                    try:
+                        with open(file_path, "r", encoding="utf-8") as f:
+                            content = f.read()
 
-        # Generate report
-        report = self._generate_quality_report(all_issues)
+                        # Print progress
+                        processed_files += 1
+                        progress = (processed_files / total_files) * 100
+                        print(
+                            f"\rProgress: {progress:.1f}% - Checking: {relative_path:<60}",
+                            end="",
+                            flush=True,
+                        )
 
-        return {
-            "success": True,
-            "issues_found": len(all_issues),
-            "issues": all_issues,
-            "report": report,
-        }
+                        # Check quality requirements
+                        issues = self._check_docs_quality(content, relative_path)
 
-    def _generate_quality_report(self, issues: List[dict]) -> str:
-        """Generates a formatted report of documentation quality issues."""
-        report = f"# Documentation Quality Report\n\n"
+                        # Print findings for current file
+                        if issues:
+                            print(f"\nFound {len(issues)} issue(s) in {relative_path}")
 
-        if not issues:
-            report += "✅ **No quality issues found in documentation.**\n"
-            return report
+                        all_issues.extend(issues)
+                        writer.add_file(relative_path, issues)
+                        if findings is not None:
+                            findings.add(issues)
 
-        report += f"## Found Issues ({len(issues)})\n\n"
+                    except Exception as e:
+                        print(f"\nError processing file {file_path}: {e}")
+                        logger.error(f"Error processing file {file_path}: {e}")
 
-        # Group issues by file
-        by_file = {}
-        for issue in issues:
-            file_path = issue["file"]
-            if file_path not in by_file:
-                by_file[file_path] = []
-            by_file[file_path].append(issue)
+                # Clear the progress line and print summary
+                print("\n")
+                if all_issues:
+                    print(
+                        f"Found total of {len(all_issues)} quality issues in {total_files} files."
+                    )
+                else:
+                    print(f"No quality issues found in {total_files} files.")
 
-        for file_path, file_issues in by_file.items():
-            report += f"### File: `{file_path}`\n\n"
+            except Exception as e:
+                logger.error(f"Error scanning docs directory: {e}")
+                self._batch_job = None
+                writer.abandon(f"scan failed: {e}")
+                raise
+
+            self._log_llm_cache_stats()
+
+            submitted = self._submit_batch_job()
+            if submitted:
+                writer.abandon(
+                    f"LLM checks were deferred to batch job {submitted['path']}; "
+                    "scan again once its results are collected"
+                )
+                return {
+                    "success": True,
+                    "issues_found": len(all_issues),
+                    "issues": all_issues,
+                    "report": None,
+                    "batch_job": submitted,
+                }
 
-            for i, issue in enumerate(file_issues, 1):
-                report += f"#### Issue {i}: {issue['issue']}\n"
-                report += f"- **Category**: {issue['category']}\n"
-                report += f"- **Line**: {issue['line_number']}\n"
-                report += f"- **Explanation**: {issue['explanation']}\n"
+            # Generate report
+            report = writer.finish()
 
-                if issue.get("context"):
-                    report += "\nContext:\n```markdown\n"
-                    report += issue["context"]
-                    report += "\n```\n"
+            return {
+                "success": True,
+                "issues_found": len(all_issues),
+                "issues": all_issues,
+                "report": report,
+            }
 
-                report += f"\n**Recommendation**: {issue['recommendation']}\n\n"
+        finally:
+            # A SARIF log is completed even when the scan stops early
+            if findings is not None:
+                findings.finish()
 
-        report += "## Summary of Requirements\n"
-        report += "1. ❌ Do not include '# Overview' headers - these are automatically added by the table of contents\n"
+    def _generate_quality_report(
+        self, issues: List[dict], out: Optional[TextIO] = None
+    ) -> Optional[str]:
+        """Generates a formatted report of documentation quality issues.
 
-        return report
+        The report is written to out when given, otherwise it is returned.
+        """
+        writer = QualityReportWriter(out)
+        writer.add_issues(issues)
+        return writer.finish()
 
     def review_documentation(
-        self, docs_url: str, repo_path: str, repo_name: str, discussion_category_id: str
+        self,
+        docs_url: str,
+        repo_path: str,
+        repo_name: str,
+        discussion_category_id: str,
+        base_rev: Optional[str] = None,
+        batch_job: Optional[str] = None,
+        report_out: Optional[TextIO] = None,
+        findings_out: Optional[TextIO] = None,
+        findings_format: str = "jsonl",
     ) -> dict:
-        """Main method to perform a complete documentation review."""
+        """Main method to perform a complete documentation review.
+
+        When base_rev is given, only work affected by changes since that
+        revision is redone: the doc is checked if it changed itself, and only
+        changed source files are verified against an unchanged doc. A review
+        with nothing to redo is skipped without posting.
+
+        When batch_job is given, LLM requests are submitted as an offline
+        batch saved to that job file and nothing is posted. Once
+        collect_batch_job() has collected the results, running the review
+        again posts the full report from the cache.
+
+        When report_out is given, the report is written to that stream as
+        the review progresses instead of being posted and returned. When
+        findings_out is given, quality issues and discrepancies are also
+        written to it as they are found, as JSON lines or, with
+        findings_format="sarif", as a SARIF log with paths relative to
+        repo_path.
+        """
+        findings = None
+        if findings_out is not None:
+            findings = findings_writer(
+                findings_out, findings_format, base_dir=repo_path, docs_url=docs_url
+            )
+        if batch_job:
+            self._start_batch_job(batch_job)
+
         try:
             logger.info(f"Starting documentation review for {docs_url}")
 
@@ -1049,51 +1514,129 @@ Respond in this exact JSON format:
                 logger.error(error_msg)
                 return {"error": error_msg}
 
-            # 2. Check quality requirements
+            # Parse the documentation once for every step below
+            document = self.parse_document(doc_content, docs_url)
+
+            changed = None
+            doc_changed = True
+            if base_rev:
+                changed = changed_files(repo_path, base_rev)
+                doc_path = os.path.relpath(
+                    Path(docs_url).resolve(), Path(repo_path).resolve()
+                )
+                doc_changed = Path(doc_path).as_posix() in changed
+                logger.info(
+                    f"Incremental review against {base_rev}: documentation {'changed' if doc_changed else 'unchanged'}"
+                )
+
+            # 2. Check quality requirements; an unchanged doc is not
+            # re-checked, and the report says so rather than reporting it clean
             logger.info("Step 2: Checking quality requirements")
-            quality_issues = self._check_docs_quality(doc_content, docs_url)
+            quality_issues = (
+                self._check_docs_quality(document, docs_url) if doc_changed else []
+            )
+            if findings is not None:
+                findings.add(quality_issues)
 
             # 3. Extract related files
             logger.info("Step 3: Extracting related files")
-            related_files = self._extract_related_files(doc_content)
+            related_files = self._extract_related_files(document)
 
             # 4. Extract code references as backup
             logger.info("Step 4: Extracting additional code references")
-            code_refs = self.extract_code_references(doc_content)
+            code_refs = self.extract_code_references(document)
 
             # 5. Verify each related file
             logger.info("Step 5: Verifying code examples")
-            all_discrepancies = []
 
-            # First check related files
-            for file_path in related_files:
-                full_path = os.path.join(repo_path, file_path)
-                if os.path.exists(full_path):
-                    discrepancies = self._verify_code_examples(doc_content, full_path)
-                    all_discrepancies.extend(discrepancies)
-
-            # Then search codebase for additional references if needed
+            # First the related files, then files found by searching the
+            # codebase for additional references
+            files_to_verify = [
+                file_path
+                for file_path in related_files
+                if os.path.exists(os.path.join(repo_path, file_path))
+            ]
             if code_refs:
                 additional_files = self.search_codebase(repo_path, code_refs)
-                for file_path in additional_files:
-                    if (
-                        file_path not in related_files
-                    ):  # Only check files we haven't checked yet
-                        full_path = os.path.join(repo_path, file_path)
-                        discrepancies = self._verify_code_examples(
-                            doc_content, full_path
-                        )
-                        all_discrepancies.extend(discrepancies)
+                files_to_verify.extend(
+                    file_path
+                    for file_path in additional_files
+                    if file_path not in related_files
+                )
 
-            # 6. Generate combined report
-            logger.info("Step 6: Generating report")
-            report = self._generate_combined_report(
-                docs_url, all_discrepancies, related_files, quality_issues
+            # An unchanged doc only needs re-verifying against changed sources
+            if not doc_changed:
+                files_to_verify = [f for f in files_to_verify if f in changed]
+                if not files_to_verify:
+                    logger.info("No changes affect this documentation, skipping review")
+                    return {
+                        "success": True,
+                        "skipped": True,
+                        "docs_url": docs_url,
+                        "related_files": related_files,
+                        "discrepancies_found": 0,
+                        "quality_issues_found": 0,
+                        "quality_checked": False,
+                        "discrepancies": [],
+                        "quality_issues": [],
+                        "report": None,
+                    }
+
+            # The report opens with everything known before verification
+            writer = CombinedReportWriter(
+                docs_url,
+                related_files,
+                quality_issues if doc_changed else None,
+                report_out,
             )
+            try:
+                all_discrepancies = self._verify_files(
+                    document,
+                    [
+                        os.path.join(repo_path, file_path)
+                        for file_path in files_to_verify
+                    ],
+                )
+            except Exception as e:
+                writer.abandon(f"review failed: {e}")
+                raise
+            if findings is not None:
+                findings.add(all_discrepancies)
+
+            submitted = self._submit_batch_job()
+            if submitted:
+                logger.info("LLM requests deferred to a batch job, not posting")
+                writer.abandon(
+                    f"LLM comparisons were deferred to batch job {submitted['path']}; "
+                    "review again once its results are collected"
+                )
+                return {
+                    "success": True,
+                    "docs_url": docs_url,
+                    "related_files": related_files,
+                    "discrepancies_found": len(all_discrepancies),
+                    "quality_issues_found": len(quality_issues),
+                    "quality_checked": doc_changed,
+                    "discrepancies": all_discrepancies,
+                    "quality_issues": quality_issues,
+                    "report": None,
+                    "batch_job": submitted,
+                }
 
-            # 7. Post to GitHub Discussions
-            logger.info("Step 7: Posting to GitHub Discussions")
-            posted = self.post_to_giscus(repo_name, discussion_category_id, report)
+            # 6. Finish the report with the discrepancies, file by file
+            logger.info("Step 6: Generating report")
+            writer.add_discrepancies(all_discrepancies)
+            report = writer.finish()
+
+            # 7. Post to GitHub Discussions, unless the caller took the report
+            if report_out is None:
+                logger.info("Step 7: Posting to GitHub Discussions")
+                posted = self.post_to_giscus(repo_name, discussion_category_id, report)
+            else:
+                logger.info("Step 7: Report written to the given stream, not posting")
+                posted = True
+
+            self._log_llm_cache_stats()
 
             result = {
                 "success": posted,
@@ -1101,6 +1644,9 @@ Respond in this exact JSON format:
                 "related_files": related_files,
                 "discrepancies_found": len(all_discrepancies),
                 "quality_issues_found": len(quality_issues),
+                "quality_checked": doc_changed,
+                "discrepancies": all_discrepancies,
+                "quality_issues": quality_issues,
                 "report": report,
             }
 
@@ -1111,117 +1657,28 @@ Respond in this exact JSON format:
             logger.error(error_msg)
             raise
 
+        finally:
+            self._batch_job = None
+            if findings is not None:
+                findings.finish()
+
     def _generate_combined_report(
         self,
         docs_url: str,
         discrepancies: List[dict],
         related_files: List[str],
-        quality_issues: List[dict],
-    ) -> str:
-        """Generates a combined report including both code discrepancies and quality issues."""
-        report = f"# Documentation Review Report\n\n"
-        report += f"## Reviewed Documentation\n{docs_url}\n\n"
-
-        # Quality Issues Section
-        report += "## Documentation Quality Issues\n"
-        if quality_issues:
-            report += f"\nFound {len(quality_issues)} quality issue(s):\n\n"
-            for issue in quality_issues:
-                report += f"### {issue['issue']}\n"
-                report += f"- **Line**: {issue['line_number']}\n"
-                report += f"- **Explanation**: {issue['explanation']}\n"
-                if issue.get("context"):
-                    report += "\nContext:\n```markdown\n"
-                    report += issue["context"]
-                    report += "\n```\n"
-                report += f"\n**Recommendation**: {issue['recommendation']}\n\n"
-        else:
-            report += "\n✅ No quality issues found.\n"
-
-        # List related files
-        report += "\n## Related Files\n"
-        if related_files:
-            for file in related_files:
-                report += f"- `{file}`\n"
-        else:
-            report += "*No related files explicitly mentioned in documentation*\n"
-
-        # Code Discrepancies Section
-        if not discrepancies:
-            report += "\n✅ **No code discrepancies found between documentation and codebase.**\n"
-            return report
-
-        report += f"\n## Code Discrepancies ({len(discrepancies)})\n"
-
-        # Group discrepancies by file
-        by_file = {}
-        for disc in discrepancies:
-            file_path = disc["file"]
-            if file_path not in by_file:
-                by_file[file_path] = []
-            by_file[file_path].append(disc)
-
-        for file_path, file_discs in by_file.items():
-            report += f"\n### File: `{file_path}`\n"
-
-            for i, disc in enumerate(file_discs, 1):
-                report += f"\n#### Discrepancy {i}\n"
-
-                if disc["type"] == "json_value_mismatch":
-                    report += f"*JSON Path: `{disc['path']}`*\n\n"
-                    report += "```diff\n"
-                    report += (
-                        f"- Documentation version: {disc['context']['docs_value']}\n"
-                    )
-                    report += f"+ Actual value: {disc['context']['actual_value']}\n"
-                    report += "```\n"
-
-                    report += "\nJSON Context:\n"
-                    report += "```json\n"
-                    report += f"# Documentation version:\n{disc['docs_version']}\n"
-                    report += f"\n# Actual version:\n{disc['code_version']}\n"
-                    report += "```\n"
-                elif disc["type"] == "semantic_mismatch":
-                    report += f"*Type: {disc['context']['type']}*\n"
-                    report += f"*Severity: {disc['context']['severity']}*\n"
-                    report += f"*Language: {disc['language']}*\n\n"
-
-                    report += "```diff\n"
-                    report += f"- Documentation version:\n{disc['docs_version']}\n"
-                    report += f"+ Actual code:\n{disc['code_version']}\n"
-                    report += "```\n"
-
-                    report += f"\nExplanation: {disc['context']['explanation']}\n"
-                else:
-                    # Handle other types of discrepancies
-                    if disc.get("language"):
-                        report += f"*Language: {disc['language']}*\n\n"
-
-                    report += "```diff\n"
-                    report += f"- Documentation version:\n{disc['docs_version']}\n"
-                    report += f"+ Actual code:\n{disc['code_version']}\n"
-                    report += "```\n"
-
-                    # Add context if available
-                    if context := disc.get("context"):
-                        report += "\nContext:\n"
-                        if context.get("before"):
-                            report += f"```\n# Before\n{context['before']}\n```\n"
-                        if context.get("after"):
-                            report += f"```\n# After\n{context['after']}\n```\n"
-
-        report += "\n## Recommendations\n"
-        report += (
-            "1. Update the documentation to match the current codebase implementation\n"
-        )
-        report += "2. Add version information to code examples if they represent older versions\n"
-        report += "3. Consider adding automated documentation testing to your CI/CD pipeline\n"
-        report += "4. Review the 'Related Files' section to ensure all relevant files are listed\n"
-        report += (
-            "5. Address any quality issues found to improve documentation consistency\n"
-        )
-
-        return report
+        quality_issues: Optional[List[dict]],
+        out: Optional[TextIO] = None,
+    ) -> Optional[str]:
+        """Generates a combined report including both code discrepancies and quality issues.
+
+        quality_issues is None when the quality checks were skipped because
+        the documentation did not change. The report is written to out when
+        given, otherwise it is returned.
+        """
+        writer = CombinedReportWriter(docs_url, related_files, quality_issues, out)
+        writer.add_discrepancies(discrepancies)
+        return writer.finish()
 
     def review_docs_quality(
         self, docs_url: str, repo_name: str, discussion_category_id: str
@@ -0,0 +1,199 @@
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from markdown_it import MarkdownIt
+
+import patterns
+
+logger = logging.getLogger("DocsReviewAgent")
+
+
+@dataclass
+class Heading:
+    level: int
+    text: str
+    line_number: int
+
+
+@dataclass
+class Fence:
+    language: str
+    content: str
+    line_number: int
+
+
+@dataclass
+class InlineCode:
+    content: str
+    line_number: int
+
+
+@dataclass
+class Link:
+    href: str
+    line_number: int
+
+
+@lru_cache(maxsize=None)
+def get_parser() -> MarkdownIt:
+    """Returns the markdown parser for MDX documents, shared by the process.
+
+    JSX components such as <Tabs> would otherwise open raw HTML blocks that
+    swallow the markdown nested inside them, including code fences.
+    """
+    return MarkdownIt().disable("html_block")
+
+
+def normalize_file_path(path: str) -> Optional[str]:
+    """Normalizes file paths found in documentation."""
+    if not path:
+        return None
+
+    # Remove any leading ./ or /
+    path = patterns.LEADING_PATH_PREFIX.sub("", path)
+
+    # Skip if it's not a file path or doesn't have an extension
+    if not patterns.FILE_EXTENSION.search(path):
+        return None
+
+    # Skip common non-source files
+    if patterns.EXCLUDED_PATH.match(path):
+        return None
+
+    return path
+
+
+class DocumentModel:
+    """A documentation file parsed once and shared by every review stage.
+
+    Line numbers are 1-based and refer to the original content, including
+    any frontmatter.
+    """
+
+    def __init__(
+        self, content: str, file_path: str, parser: Optional[MarkdownIt] = None
+    ):
+        self.content = content
+        self.file_path = file_path
+
+        # markdown-it has no frontmatter support and would read it as a
+        # thematic break plus a setext heading, so it is split off first
+        self.frontmatter: Optional[str] = None
+        self.line_offset = 0
+        body = content
+        match = patterns.FRONTMATTER.match(content)
+        if match:
+            self.frontmatter = match.group(1) or ""
+            body = content[match.end() :]
+            self.line_offset = content.count("\n", 0, match.end())
+
+        self.tokens = (parser or get_parser()).parse(body)
+        self.headings: List[Heading] = []
+        self.fences: List[Fence] = []
+        self.fences_by_language: Dict[str, List[Fence]] = {}
+        self.inline_code: List[InlineCode] = []
+        self.links: List[Link] = []
+        self._collect()
+        self._related_files: Optional[List[str]] = None
+
+    def _line_number(self, token) -> int:
+        return token.map[0] + self.line_offset + 1 if token.map else 0
+
+    def _collect(self) -> None:
+        """Extracts headings, fences, inline code and links from the token stream."""
+        for i, token in enumerate(self.tokens):
+            if token.type == "heading_open":
+                inline = self.tokens[i + 1]
+                self.headings.append(
+                    Heading(
+                        int(token.tag[1:]), inline.content, self._line_number(token)
+                    )
+                )
+            elif token.type == "fence":
+                language = token.info.split()[0].lower() if token.info.strip() else ""
+                fence = Fence(language, token.content, self._line_number(token))
+                self.fences.append(fence)
+                self.fences_by_language.setdefault(language, []).append(fence)
+            elif token.type == "inline":
+                line_number = self._line_number(token)
+                for child in token.children or []:
+                    if child.type == "code_inline":
+                        self.inline_code.append(InlineCode(child.content, line_number))
+                    elif child.type == "link_open":
+                        self.links.append(
+                            Link(child.attrs.get("href", ""), line_number)
+                        )
+
+    def context_around(self, line_number: int, chars: int = 100) -> str:
+        """Returns a line with roughly the given number of characters around it."""
+        lines = self.content.split("\n")
+        start = sum(len(line) + 1 for line in lines[: line_number - 1])
+        end = (
+            start + len(lines[line_number - 1]) if line_number <= len(lines) else start
+        )
+        return self.content[max(0, start - chars) : end + chars]
+
+    @staticmethod
+    def _item_paths(token) -> List[str]:
+        """Returns the backtick-formatted and plain /paths in a list item."""
+        paths = []
+        for child in token.children or []:
+            if child.type == "code_inline":
+                paths.append(child.content)
+            elif child.type == "text":
+                paths.extend(patterns.PLAIN_PATH.findall(child.content))
+        return paths
+
+    @property
+    def related_files(self) -> List[str]:
+        """Files listed in the Related Files section of the document.
+
+        Falls back to paths quoted in JSON and YAML examples when the
+        document has no such section.
+        """
+        if self._related_files is None:
+            self._related_files = self._find_related_files()
+        return self._related_files
+
+    def _find_related_files(self) -> List[str]:
+        related_files = set()
+
+        # One pass over the tokens: a section runs from a "Related Files"
+        # heading to the next heading of the same or a higher level, and its
+        # paths come from the items of bullet lists inside it
+        section_level = None
+        list_depth = 0
+        for i, token in enumerate(self.tokens):
+            if token.type == "heading_open":
+                level = int(token.tag[1:])
+                if section_level is not None and level <= section_level:
+                    section_level = None
+                title = self.tokens[i + 1].content.strip().lower()
+                if section_level is None and title.startswith("related files"):
+                    section_level = level
+            elif token.type == "bullet_list_open":
+                list_depth += 1
+            elif token.type == "bullet_list_close":
+                list_depth -= 1
+            elif section_level is not None and list_depth and token.type == "inline":
+                for path in self._item_paths(token):
+                    clean_path = normalize_file_path(path.strip())
+                    if clean_path:
+                        related_files.add(clean_path)
+
+        # If no files found in Related Files section, try to find files mentioned in code blocks
+        if not related_files:
+            logger.info("No files found in Related Files section, checking code blocks")
+            for language in ("json", "yaml"):
+                for fence in self.fences_by_language.get(language, []):
+                    for quote_match, single_match in patterns.QUOTED_PATH.findall(
+                        fence.content
+                    ):
+                        filename = quote_match or single_match
+                        clean_path = normalize_file_path(filename.strip())
+                        if clean_path:
+                            related_files.add(clean_path)
+
+        return list(related_files)
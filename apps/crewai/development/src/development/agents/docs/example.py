@@ -2,6 +2,7 @@ import os
 import logging
 from pathlib import Path
 from dotenv import load_dotenv
+from development.tools.repository import RepositoryContext
 from docs_review_agent import DocsReviewAgent
 
 # Load environment variables from .env
@@ -22,13 +23,13 @@ def main():
         logger.info("Initializing DocsReviewAgent")
         agent = DocsReviewAgent()
 
-        # Set up parameters
-        current_file = Path(__file__)
-        workspace_root = (
-            current_file.parent.parent.parent.parent.parent.parent.parent
-        )  # Navigate up to monorepo root
-        docs_url = "/Users/jhs/Projects/sfh/apps/docs/src/content/docs/dev/stack/turborepo.mdx"  # Absolute path to local MDX file
-        repo_path = "/Users/jhs/Projects/sfh"  # Path to your monorepo root
+        # Set up parameters; the monorepo root comes from REPOSITORY_ROOT or
+        # the git checkout containing this file
+        repository = RepositoryContext.resolve(str(Path(__file__).parent))
+        docs_url = repository.absolute(
+            "apps/docs/src/content/docs/dev/stack/turborepo.mdx"
+        )  # Absolute path to local MDX file
+        repo_path = repository.root  # Path to your monorepo root
         repo_name = "javierhinojosa/scaffold"  # Replace with your GitHub repo
         discussion_category_id = (
             "DIC_kwDON4sFNc4Cm7FL"  # Replace with your GitHub Discussions category ID
@@ -0,0 +1,144 @@
+import re
+from array import array
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+# Comments and whitespace are ignored when comparing code
+COMMENT_PATTERN = re.compile(r"#.*$")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+# Matches shorter than KGRAM_SIZE characters are noise; any shared run of at
+# least KGRAM_SIZE + WINDOW_SIZE - 1 characters is guaranteed to be found
+KGRAM_SIZE = 8
+WINDOW_SIZE = 4
+
+# Share of a block's fingerprints a region needs to count as similar
+DEFAULT_MIN_SIMILARITY = 0.5
+
+
+@dataclass
+class SimilarCode:
+    code: str
+    similarity: float
+    start_line: int
+    end_line: int
+
+
+def normalize(text: str) -> Tuple[str, array]:
+    """Strips comments and whitespace, remembering the line of each character.
+
+    Returns the normalized text and the 0-based source line of each of its
+    characters.
+    """
+    parts = []
+    line_of = array("I")
+    for number, line in enumerate(text.split("\n")):
+        cleaned = WHITESPACE_PATTERN.sub("", COMMENT_PATTERN.sub("", line))
+        parts.append(cleaned)
+        line_of.extend([number] * len(cleaned))
+    return "".join(parts), line_of
+
+
+def winnow(
+    text: str, k: int = KGRAM_SIZE, window: int = WINDOW_SIZE
+) -> List[Tuple[int, int]]:
+    """Selects (hash, position) fingerprints of the text's k-grams.
+
+    From every window of consecutive k-gram hashes the minimum is kept
+    (the rightmost on ties), so matching text selects matching fingerprints
+    whatever surrounds it.
+    """
+    hashes = [hash(text[i : i + k]) for i in range(len(text) - k + 1)]
+    if len(hashes) < window:
+        return [(h, i) for i, h in enumerate(hashes)]
+
+    fingerprints = []
+    last = -1
+    for start in range(len(hashes) - window + 1):
+        minimum = start
+        for i in range(start + 1, start + window):
+            if hashes[i] <= hashes[minimum]:
+                minimum = i
+        if minimum != last:
+            fingerprints.append((hashes[minimum], minimum))
+            last = minimum
+    return fingerprints
+
+
+class FingerprintIndex:
+    """Winnowing index over one source file for locating near-matching code.
+
+    The file is normalized and fingerprinted once; each lookup then costs
+    a hash lookup per fingerprint of the searched block.
+    """
+
+    def __init__(self, source: str, k: int = KGRAM_SIZE, window: int = WINDOW_SIZE):
+        self.lines = source.split("\n")
+        self.k = k
+        self.window = window
+        self.text, self.line_of = normalize(source)
+        self.positions: Dict[int, List[int]] = defaultdict(list)
+        for h, position in winnow(self.text, k, window):
+            self.positions[h].append(position)
+
+    def _region(self, start: int, end: int) -> Tuple[int, int]:
+        """Maps a normalized character range to a 0-based line range."""
+        start = max(0, min(start, len(self.text) - 1))
+        end = max(start, min(end, len(self.text)) - 1)
+        return self.line_of[start], self.line_of[end]
+
+    def _result(self, start: int, end: int, similarity: float) -> SimilarCode:
+        first, last = self._region(start, end)
+        return SimilarCode(
+            code="\n".join(self.lines[first : last + 1]),
+            similarity=similarity,
+            start_line=first + 1,
+            end_line=last + 1,
+        )
+
+    def find(self, block: str) -> Optional[SimilarCode]:
+        """Finds the region of the source most similar to a code block.
+
+        The similarity is the share of the block's fingerprints found in
+        that region, or 1.0 when the normalized block occurs verbatim.
+        """
+        if not self.text:
+            return None
+        normalized, _ = normalize(block)
+        if not normalized:
+            return None
+
+        exact = self.text.find(normalized)
+        if exact != -1:
+            return self._result(exact, exact + len(normalized), 1.0)
+
+        block_fingerprints = winnow(normalized, self.k, self.window)
+        if not block_fingerprints:
+            return None
+
+        # Each shared fingerprint votes for where the block starts in the source
+        votes = Counter()
+        hits = []
+        for h, block_position in block_fingerprints:
+            for position in self.positions.get(h, ()):
+                offset = position - block_position
+                votes[offset] += 1
+                hits.append((block_position, position, offset))
+        if not votes:
+            return None
+
+        # Accept hits near the best alignment, allowing for edits that shift it
+        best, _ = votes.most_common(1)[0]
+        tolerance = max(self.k, len(normalized) // 2)
+        matched = set()
+        start = best
+        end = best + len(normalized)
+        for block_position, position, offset in hits:
+            if abs(offset - best) <= tolerance:
+                matched.add(block_position)
+                start = min(start, position)
+                end = max(end, position + self.k)
+
+        similarity = len(matched) / len(block_fingerprints)
+        return self._result(start, end, similarity)
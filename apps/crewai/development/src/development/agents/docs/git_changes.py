@@ -0,0 +1,52 @@
+import logging
+import subprocess
+from typing import List, Set
+
+logger = logging.getLogger("DocsReviewAgent")
+
+
+def _git(cwd: str, *args: str) -> str:
+    """Runs a git command in cwd and returns its output."""
+    try:
+        result = subprocess.run(
+            ["git", "-C", cwd, *args], capture_output=True, text=True, check=True
+        )
+    except FileNotFoundError as e:
+        raise RuntimeError("git executable not found") from e
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(
+            f"git {' '.join(args)} failed: {e.stderr.strip() or e.returncode}"
+        ) from e
+    return result.stdout
+
+
+def _split_paths(output: str) -> List[str]:
+    """Splits NUL-separated git output into paths."""
+    return [path for path in output.split("\0") if path]
+
+
+def changed_files(path: str, base_rev: str) -> Set[str]:
+    """Returns the files under path that changed since base_rev.
+
+    Changes are measured from the merge base of base_rev and HEAD, so work
+    that landed on the base branch afterwards is not counted. Committed,
+    staged, unstaged and untracked changes are all included. Paths are
+    relative to path.
+    """
+    try:
+        base = _git(path, "merge-base", base_rev, "HEAD").strip()
+    except RuntimeError as e:
+        logger.warning(
+            f"Could not find merge base with {base_rev}, diffing directly: {e}"
+        )
+        base = base_rev
+
+    changed = set(
+        _split_paths(_git(path, "diff", "--name-only", "--relative", "-z", base))
+    )
+    changed.update(
+        _split_paths(_git(path, "ls-files", "--others", "--exclude-standard", "-z"))
+    )
+
+    logger.info(f"Found {len(changed)} files changed since {base_rev}")
+    return changed
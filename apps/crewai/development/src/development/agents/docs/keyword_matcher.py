@@ -0,0 +1,121 @@
+import logging
+import re
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from mapped_file import DEFAULT_MAX_FILE_BYTES, SkippedFile, map_file
+
+logger = logging.getLogger("DocsReviewAgent")
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton that finds every keyword in a single pass.
+
+    The automaton is compiled once and can then scan any number of texts; the
+    cost of a scan depends on the text length, not on the number of keywords.
+    Keywords are compiled as UTF-8 bytes, so files can be scanned straight
+    from a memory map without being decoded.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: List[str] = list(dict.fromkeys(k for k in keywords if k))
+
+        # State 0 is the root; each state maps a byte to the next state
+        self._goto: List[Dict[int, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Set[int]] = [set()]
+
+        for keyword_id, keyword in enumerate(self.keywords):
+            self._add(keyword_id, keyword.encode("utf-8"))
+        self._link()
+
+        # Jumps over text that cannot start any keyword while at the root
+        first_bytes = b"".join(re.escape(bytes([byte])) for byte in self._goto[0])
+        self._start = re.compile(b"[" + first_bytes + b"]") if first_bytes else None
+
+    def _add(self, keyword_id: int, keyword: bytes) -> None:
+        """Adds a keyword to the trie."""
+        state = 0
+        for byte in keyword:
+            next_state = self._goto[state].get(byte)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(set())
+                self._goto[state][byte] = next_state
+            state = next_state
+        self._output[state].add(keyword_id)
+
+    def _link(self) -> None:
+        """Computes failure links breadth-first and merges their outputs."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for byte, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and byte not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(byte, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] |= self._output[self._fail[next_state]]
+
+    def find_all(self, data: Union[str, bytes, memoryview]) -> List[str]:
+        """Returns the keywords that occur in the text or buffer, in keyword order.
+
+        Accepts str or any bytes-like buffer, including an mmap.
+        """
+        if self._start is None:
+            return []
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+
+        goto, fail, output = self._goto, self._fail, self._output
+        remaining = len(self.keywords)
+        found: Set[int] = set()
+        state = 0
+        position = 0
+        length = len(data)
+
+        while position < length:
+            if state == 0:
+                match = self._start.search(data, position)
+                if match is None:
+                    break
+                position = match.start()
+
+            byte = data[position]
+            while state and byte not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(byte, 0)
+
+            if output[state]:
+                found |= output[state]
+                if len(found) == remaining:
+                    break
+            position += 1
+
+        return [self.keywords[keyword_id] for keyword_id in sorted(found)]
+
+
+def match_file(
+    matcher: KeywordMatcher,
+    repo_path: Path,
+    relative_path: str,
+    max_file_bytes: Optional[int] = DEFAULT_MAX_FILE_BYTES,
+) -> Tuple[str, List[str]]:
+    """Scans a repository file and returns it with the keywords found in it.
+
+    Binary files and files over max_file_bytes are skipped.
+    """
+    file_path = repo_path / relative_path
+    try:
+        with map_file(file_path, max_file_bytes) as data:
+            return relative_path, matcher.find_all(data)
+    except SkippedFile as e:
+        logger.debug(f"Skipping file: {e}")
+    except Exception as e:
+        logger.warning(f"Error reading file {file_path}: {e}")
+    return relative_path, []
@@ -0,0 +1,173 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("DocsReviewAgent")
+
+DEFAULT_TTL_SECONDS = 30 * 24 * 60 * 60
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def make_cache_key(*parts: Any) -> str:
+    """Hashes everything that determines an LLM result into a cache key."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """Content-addressed on-disk cache for LLM results.
+
+    Each entry is a JSON file named after its key. Entries expire after
+    ttl_seconds, and the least recently used entries are evicted once the
+    cache grows past max_entries or max_bytes.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        ttl_seconds: Optional[float] = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+        entries = self._entries()
+        self._entry_count = len(entries)
+        self._total_bytes = sum(size for _, _, size in entries)
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def _entries(self) -> List[Tuple[float, Path, int]]:
+        """Lists (last used time, path, size) for every entry."""
+        entries = []
+        for path in self.cache_dir.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, path, stat.st_size))
+        return entries
+
+    def get(self, key: str) -> Optional[Any]:
+        """Returns the cached value for a key, or None on a miss."""
+        path = self._path(key)
+        try:
+            stat = path.stat()
+            if (
+                self.ttl_seconds is not None
+                and time.time() - stat.st_mtime > self.ttl_seconds
+            ):
+                self._remove(path, stat.st_size)
+                self.misses += 1
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        # Touch the entry so eviction keeps recently used results
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        """Stores a JSON-serializable value under a key."""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+        try:
+            previous_size = path.stat().st_size
+        except OSError:
+            previous_size = None
+
+        # Write atomically so concurrent reviews never read partial entries
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Error writing cache entry {path}: {e}")
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            return
+
+        self.stores += 1
+        if previous_size is None:
+            self._entry_count += 1
+        else:
+            self._total_bytes -= previous_size
+        self._total_bytes += len(data)
+
+        if self._entry_count > self.max_entries or self._total_bytes > self.max_bytes:
+            self._evict()
+
+    def _remove(self, path: Path, size: int) -> None:
+        try:
+            path.unlink()
+        except OSError:
+            return
+        self._entry_count -= 1
+        self._total_bytes -= size
+        self.evictions += 1
+
+    def _evict(self) -> None:
+        """Drops expired entries, then the least recently used down to 90% of the limits."""
+        entries = sorted(self._entries())
+        self._entry_count = len(entries)
+        self._total_bytes = sum(size for _, _, size in entries)
+
+        now = time.time()
+        target_entries = int(self.max_entries * 0.9)
+        target_bytes = int(self.max_bytes * 0.9)
+        for mtime, path, size in entries:
+            expired = self.ttl_seconds is not None and now - mtime > self.ttl_seconds
+            over_limit = (
+                self._entry_count > target_entries or self._total_bytes > target_bytes
+            )
+            if not expired and not over_limit:
+                break
+            self._remove(path, size)
+
+        logger.debug(f"Evicted cache entries, {self._entry_count} remaining")
+
+    def clear(self) -> None:
+        """Removes every entry."""
+        for _, path, size in self._entries():
+            self._remove(path, size)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns hit/miss counters and the current cache size."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "entries": self._entry_count,
+            "bytes": self._total_bytes,
+        }
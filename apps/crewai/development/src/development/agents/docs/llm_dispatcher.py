@@ -0,0 +1,233 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Union
+
+logger = logging.getLogger("DocsReviewAgent")
+
+# Rough characters-per-token ratio used to budget requests before sending them
+CHARS_PER_TOKEN = 4
+
+
+@dataclass
+class LLMRequest:
+    """A single Claude messages request."""
+
+    model: str
+    system: str
+    prompt: str
+    max_tokens: int
+    temperature: float = 0
+
+    def estimated_input_tokens(self) -> int:
+        return (len(self.system) + len(self.prompt)) // CHARS_PER_TOKEN + 1
+
+
+def batched_results(analysis: dict) -> Dict[int, dict]:
+    """Maps the results of a batched response to their comparison numbers.
+
+    The model may quote the numbers ("2") instead of writing them as
+    integers. Results without a usable number are dropped, so their
+    comparisons are retried on their own.
+    """
+    results = {}
+    for result in analysis.get("results", []):
+        try:
+            results[int(result.get("id"))] = result
+        except (AttributeError, TypeError, ValueError):
+            logger.warning(f"Ignoring batched result without a number: {result!r}")
+    return results
+
+
+class RateLimiter:
+    """Token-bucket limiter for requests and input tokens per minute."""
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = requests_per_minute
+        self._tokens = tokens_per_minute
+        self._updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed_minutes = (now - self._updated) / 60
+        self._updated = now
+        self._requests = min(
+            self.requests_per_minute,
+            self._requests + elapsed_minutes * self.requests_per_minute,
+        )
+        self._tokens = min(
+            self.tokens_per_minute,
+            self._tokens + elapsed_minutes * self.tokens_per_minute,
+        )
+
+    async def acquire(self, tokens: int) -> None:
+        """Waits until a request of the given size fits in both budgets."""
+        # The budget outlives any one event loop, the lock cannot
+        loop = asyncio.get_running_loop()
+        if self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+
+        # A request larger than the whole budget waits for a full bucket
+        tokens = min(tokens, self.tokens_per_minute)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._requests >= 1 and self._tokens >= tokens:
+                    self._requests -= 1
+                    self._tokens -= tokens
+                    return
+                wait_minutes = max(
+                    (1 - self._requests) / self.requests_per_minute,
+                    (tokens - self._tokens) / self.tokens_per_minute,
+                )
+                await asyncio.sleep(wait_minutes * 60)
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Retries rate limits, overload, server errors and connection problems."""
+    import anthropic
+
+    if isinstance(error, (anthropic.APIConnectionError, anthropic.RateLimitError)):
+        return True
+    if isinstance(error, anthropic.APIStatusError):
+        return error.status_code >= 500
+    return False
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Returns the server's retry-after hint in seconds, if it sent one."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class AsyncLLMDispatcher:
+    """Runs Claude requests concurrently within a rate budget.
+
+    Requests are sent through an async client with at most max_concurrency
+    in flight, throttled to the configured requests and input tokens per
+    minute, and retried with jittered exponential backoff on transient
+    errors. The rate budget is shared by every call to run(). Synchronous
+    callers share one background event loop, so a long-lived client
+    returned by client_factory keeps its connections open between calls.
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[], Any],
+        max_concurrency: int = 8,
+        requests_per_minute: float = 50,
+        tokens_per_minute: float = 50000,
+        max_retries: int = 4,
+        backoff_base: float = 1.0,
+        backoff_max: float = 30.0,
+    ):
+        self.client_factory = client_factory
+        self.max_concurrency = max_concurrency
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    async def _send(
+        self,
+        client: Any,
+        request: LLMRequest,
+        semaphore: asyncio.Semaphore,
+    ) -> str:
+        """Sends one request, retrying transient failures."""
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.acquire(request.estimated_input_tokens())
+            try:
+                async with semaphore:
+                    response = await client.messages.create(
+                        model=request.model,
+                        max_tokens=request.max_tokens,
+                        temperature=request.temperature,
+                        system=request.system,
+                        messages=[{"role": "user", "content": request.prompt}],
+                    )
+                return response.content[0].text
+            except Exception as e:
+                if attempt == self.max_retries or not _is_retryable(e):
+                    raise
+                delay = _retry_after(e) or min(
+                    self.backoff_max, self.backoff_base * 2**attempt
+                )
+                delay *= 1 + random.random() * 0.25
+                logger.warning(
+                    f"Claude request failed ({e}), retrying in {delay:.1f}s "
+                    f"(attempt {attempt + 1}/{self.max_retries})"
+                )
+                await asyncio.sleep(delay)
+
+    async def run(self, requests: List[LLMRequest]) -> List[Union[str, Exception]]:
+        """Sends all requests concurrently.
+
+        Returns the response text for each request in order, or the
+        exception that made it fail.
+        """
+        if not requests:
+            return []
+
+        client = self.client_factory()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        logger.info(f"Dispatching {len(requests)} Claude requests concurrently")
+        return await asyncio.gather(
+            *(self._send(client, request, semaphore) for request in requests),
+            return_exceptions=True,
+        )
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Starts the background event loop on first use."""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever,
+                    name="llm-dispatcher",
+                    daemon=True,
+                )
+                self._thread.start()
+            return self._loop
+
+    def run_sync(self, requests: List[LLMRequest]) -> List[Union[str, Exception]]:
+        """Blocking wrapper around run() for synchronous callers."""
+        if not requests:
+            return []
+        future = asyncio.run_coroutine_threadsafe(
+            self.run(requests), self._ensure_loop()
+        )
+        return future.result()
+
+    def run_coroutine(self, func: Callable[[], Any]) -> Any:
+        """Runs a coroutine function on the background loop and waits for it."""
+        return asyncio.run_coroutine_threadsafe(func(), self._ensure_loop()).result()
+
+    def close(self) -> None:
+        """Stops the background event loop."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
@@ -0,0 +1,42 @@
+import mmap
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+# Bytes inspected when deciding whether a file is binary, as git does
+SNIFF_BYTES = 8192
+
+DEFAULT_MAX_FILE_BYTES = 8 * 1024 * 1024
+
+
+class SkippedFile(Exception):
+    """Raised when a file is not worth searching, e.g. it is binary or too large."""
+
+
+def is_binary(data: Union[bytes, mmap.mmap]) -> bool:
+    """Treats data as binary if its first block contains a NUL byte."""
+    return data.find(b"\0", 0, SNIFF_BYTES) != -1
+
+
+@contextmanager
+def map_file(
+    file_path: Path, max_bytes: Optional[int] = DEFAULT_MAX_FILE_BYTES
+) -> Iterator[Union[bytes, mmap.mmap]]:
+    """Maps a text file read-only so it can be searched without decoding it.
+
+    Raises SkippedFile for binary files and for files larger than max_bytes,
+    which bounds the memory a single file can take.
+    """
+    with open(file_path, "rb") as f:
+        size = f.seek(0, 2)
+        if max_bytes is not None and size > max_bytes:
+            raise SkippedFile(f"{file_path} is larger than {max_bytes} bytes")
+        if size == 0:
+            # Empty files cannot be mapped
+            yield b""
+            return
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if is_binary(mapped):
+                raise SkippedFile(f"{file_path} is binary")
+            yield mapped
@@ -0,0 +1,29 @@
+import re
+
+# Frontmatter block at the very top of an MDX file
+FRONTMATTER = re.compile(r"\A---[ \t]*\n(?:(.*?)\n)?---[ \t]*(?:\n|\Z)", re.DOTALL)
+
+# A non-empty title in the frontmatter, which Starlight requires
+FRONTMATTER_TITLE = re.compile(r"^title[ \t]*:[ \t]*\S", re.MULTILINE)
+
+# Characters dropped from a heading's anchor (GitHub and Starlight slugs)
+SLUG_EXCLUDED = re.compile(r"[^\w\- ]")
+
+# Names declared in code examples
+DECLARATION = re.compile(r"\b(?:class|def|function|const|let|var)\s+(\w+)")
+
+# Plain /paths in a Related Files list item; backtick paths come from
+# the code_inline tokens
+PLAIN_PATH = re.compile(r"(?:^|\s)(/[^\s,]+)")
+QUOTED_PATH = re.compile(r'(?:"([^"]+\.[a-zA-Z]+)"|\'([^\']+\.[a-zA-Z]+)\')')
+
+# File path normalization
+LEADING_PATH_PREFIX = re.compile(r"^\.?/")
+FILE_EXTENSION = re.compile(r"\.[a-zA-Z]+$")
+EXCLUDED_PATH = re.compile(r"^(node_modules|dist|build|coverage|\.git)/")
+
+# Code normalization
+HASH_COMMENT = re.compile(r"#.*$", re.MULTILINE)
+SLASH_COMMENT = re.compile(r"//.*$", re.MULTILINE)
+BLOCK_COMMENT = re.compile(r"/\*.*?\*/", re.DOTALL)
+WHITESPACE = re.compile(r"\s+")
@@ -0,0 +1,219 @@
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Optional, TextIO, Union
+
+SARIF_VERSION = "2.1.0"
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+TOOL_NAME = "docs-review-agent"
+
+# Short descriptions for the discrepancy types; quality rules are
+# described by the title of their first issue
+RULE_DESCRIPTIONS = {
+    "code_mismatch": "Code example differs from the implementation",
+    "json_value_mismatch": "JSON example value differs from the actual file",
+    "semantic_mismatch": "Code example disagrees with the implementation",
+}
+
+SEVERITY_LEVELS = {"high": "error", "medium": "warning", "low": "note"}
+
+
+# Formats accepted for findings_out by the review and scan methods
+FINDINGS_FORMATS = ("jsonl", "sarif")
+
+
+def write_jsonl(findings: Iterable[dict], out: TextIO, **fields) -> int:
+    """Writes one JSON object per issue or discrepancy and returns the count.
+
+    Extra fields, such as the reviewed docs_url, are added to every line.
+    """
+    count = 0
+    for finding in findings:
+        record = {**fields, **finding} if fields else finding
+        out.write(json.dumps(record, ensure_ascii=False, default=str))
+        out.write("\n")
+        count += 1
+    return count
+
+
+def _details(finding: dict) -> dict:
+    """The context of a discrepancy; quality issues keep a text excerpt there."""
+    context = finding.get("context")
+    return context if isinstance(context, dict) else {}
+
+
+def rule_id(finding: dict) -> str:
+    """Quality issues are identified by category, discrepancies by type."""
+    if finding.get("type") == "quality_issue":
+        return finding.get("category") or "quality_issue"
+    rule = finding.get("type") or "discrepancy"
+    if rule == "semantic_mismatch" and _details(finding).get("type"):
+        rule = f"{rule}/{_details(finding)['type']}"
+    return rule
+
+
+def sarif_level(finding: dict) -> str:
+    severity = _details(finding).get("severity")
+    return SEVERITY_LEVELS.get(severity, "warning")
+
+
+def sarif_message(finding: dict) -> str:
+    kind = finding.get("type")
+    context = _details(finding)
+    if kind == "quality_issue":
+        return f"{finding['issue']}: {finding['explanation']}"
+    if kind == "json_value_mismatch":
+        return (
+            f"JSON value at `{finding['path']}` is {context['docs_value']} in the "
+            f"documentation but {context['actual_value']} in the file"
+        )
+    if kind == "semantic_mismatch":
+        return context["explanation"]
+    if "similarity" in finding:
+        return (
+            f"{RULE_DESCRIPTIONS['code_mismatch']} (similarity {finding['similarity']})"
+        )
+    return RULE_DESCRIPTIONS.get(kind, "Documentation differs from the codebase")
+
+
+def artifact_uri(
+    file_path: str, base_dir: Optional[str] = None, source_dir: Optional[str] = None
+) -> str:
+    """Returns the file as a forward-slash URI, relative to base_dir when inside it.
+
+    Relative paths are taken to be relative to source_dir, or to the current
+    directory; URLs are returned unchanged.
+    """
+    if "://" in file_path:
+        return file_path
+    if base_dir:
+        path = os.path.abspath(os.path.join(source_dir or "", file_path))
+        relative = os.path.relpath(path, os.path.abspath(base_dir))
+        if relative != os.pardir and not relative.startswith(os.pardir + os.sep):
+            file_path = relative
+    return Path(file_path).as_posix()
+
+
+def sarif_result(
+    finding: dict, base_dir: Optional[str] = None, source_dir: Optional[str] = None
+) -> dict:
+    uri = artifact_uri(finding["file"], base_dir, source_dir)
+    location = {"artifactLocation": {"uri": uri}}
+    line_number = finding.get("line_number")
+    if isinstance(line_number, int) and line_number > 0:
+        location["region"] = {"startLine": line_number}
+
+    # Everything that is not already part of the result goes into the
+    # property bag so no detail of the finding is lost
+    properties = {
+        key: value
+        for key, value in finding.items()
+        if key not in ("file", "line_number", "issue", "explanation")
+    }
+    return {
+        "ruleId": rule_id(finding),
+        "level": sarif_level(finding),
+        "message": {"text": sarif_message(finding)},
+        "locations": [{"physicalLocation": location}],
+        "properties": properties,
+    }
+
+
+class JsonlWriter:
+    """Writes findings as JSON lines as they are added."""
+
+    def __init__(self, out: TextIO, **fields):
+        self.out = out
+        self.fields = fields
+        self.count = 0
+
+    def add(self, findings: Iterable[dict]) -> None:
+        self.count += write_jsonl(findings, self.out, **self.fields)
+        self.out.flush()
+
+    def finish(self) -> int:
+        return self.count
+
+
+class SarifWriter:
+    """Writes findings as a SARIF log as they are added.
+
+    Results are written one at a time and the tool description, which
+    lists the rules seen, comes after them in finish(), so the findings are
+    never all held in memory. File URIs are made relative to base_dir, the
+    repository root, when the file is inside it; relative file paths are
+    resolved against source_dir first.
+    """
+
+    def __init__(
+        self,
+        out: TextIO,
+        base_dir: Optional[str] = None,
+        source_dir: Optional[str] = None,
+    ):
+        self.out = out
+        self.base_dir = base_dir
+        self.source_dir = source_dir
+        self.count = 0
+        self._rules: Dict[str, dict] = {}
+        out.write(f'{{"$schema": "{SARIF_SCHEMA}", "version": "{SARIF_VERSION}", ')
+        out.write('"runs": [{"results": [')
+
+    def add(self, findings: Iterable[dict]) -> None:
+        for finding in findings:
+            result = sarif_result(finding, self.base_dir, self.source_dir)
+            if result["ruleId"] not in self._rules:
+                description = finding.get("issue") or RULE_DESCRIPTIONS.get(
+                    finding.get("type"), result["ruleId"]
+                )
+                self._rules[result["ruleId"]] = {
+                    "id": result["ruleId"],
+                    "shortDescription": {"text": description},
+                }
+            if self.count:
+                self.out.write(", ")
+            self.out.write(json.dumps(result, ensure_ascii=False, default=str))
+            self.count += 1
+        self.out.flush()
+
+    def finish(self) -> int:
+        """Closes the log and returns the number of results written."""
+        tool = {"driver": {"name": TOOL_NAME, "rules": list(self._rules.values())}}
+        self.out.write('], "tool": ')
+        self.out.write(json.dumps(tool, ensure_ascii=False))
+        self.out.write("}]}\n")
+        self.out.flush()
+        return self.count
+
+
+def write_sarif(
+    findings: Iterable[dict],
+    out: TextIO,
+    base_dir: Optional[str] = None,
+    source_dir: Optional[str] = None,
+) -> int:
+    """Writes issues and discrepancies as a SARIF log and returns the count."""
+    writer = SarifWriter(out, base_dir, source_dir)
+    writer.add(findings)
+    return writer.finish()
+
+
+def findings_writer(
+    out: TextIO,
+    findings_format: str = "jsonl",
+    base_dir: Optional[str] = None,
+    source_dir: Optional[str] = None,
+    **fields,
+) -> Union[JsonlWriter, SarifWriter]:
+    """Returns a writer for findings_out in one of FINDINGS_FORMATS.
+
+    Extra fields are added to every JSON line; SARIF results keep the
+    whole finding in their properties instead.
+    """
+    if findings_format == "jsonl":
+        return JsonlWriter(out, **fields)
+    if findings_format == "sarif":
+        return SarifWriter(out, base_dir, source_dir)
+    raise ValueError(
+        f"Unknown findings format {findings_format!r}, expected one of {FINDINGS_FORMATS}"
+    )
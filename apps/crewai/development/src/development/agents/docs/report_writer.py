@@ -0,0 +1,272 @@
+import io
+from typing import Dict, Iterable, List, Optional, TextIO
+
+
+def group_by_file(items: Iterable[dict]) -> Dict[str, List[dict]]:
+    """Groups issues or discrepancies by file, in order of first appearance."""
+    by_file: Dict[str, List[dict]] = {}
+    for item in items:
+        by_file.setdefault(item["file"], []).append(item)
+    return by_file
+
+
+class _StreamingReport:
+    """Writes a report section by section, as the results arrive.
+
+    Each section is written to the output stream as soon as it is added,
+    so nothing but the counts is held back. The heading above the
+    sections is written before the total is known, so a streamed report
+    states the total in the closing part that finish() writes instead.
+
+    Without an output stream the report is built in memory and returned.
+    The sections are then held back until finish(), which writes the
+    heading with its count above them, as the report always had.
+    """
+
+    def __init__(self, out: Optional[TextIO] = None):
+        self._buffered = out is None
+        self.out = io.StringIO() if out is None else out
+        self._sections = io.StringIO() if out is None else out
+        self.count = 0
+
+    def _start(self) -> None:
+        """Writes the opening part; subclasses call it once they are set up."""
+        self._write_header()
+        self.out.flush()
+
+    def _add_section(self, text: str, count: int) -> None:
+        """Writes the section of one file holding count results."""
+        if not self.count and not self._buffered:
+            self.out.write(self._sections_heading(None))
+        self._sections.write(text)
+        self._sections.flush()
+        self.count += count
+
+    def _sections_heading(self, count: Optional[int]) -> str:
+        """Returns the heading above the sections, with count when known."""
+        raise NotImplementedError
+
+    def _write_header(self) -> None:
+        raise NotImplementedError
+
+    def _write_footer(self) -> None:
+        raise NotImplementedError
+
+    def finish(self) -> Optional[str]:
+        """Writes the closing part of the report.
+
+        Returns the report as a string when no output stream was given.
+        """
+        if self._buffered and self.count:
+            self.out.write(self._sections_heading(self.count))
+            self.out.write(self._sections.getvalue())
+        self._write_footer()
+        if self._buffered:
+            return self.out.getvalue()
+        self.out.flush()
+        return None
+
+    def abandon(self, reason: str) -> None:
+        """Ends a report that cannot be completed, saying why."""
+        if not self._buffered:
+            self.out.write(f"\n⚠️ **Report incomplete**: {reason}\n")
+            self.out.flush()
+
+
+class QualityReportWriter(_StreamingReport):
+    """Writes the documentation quality report one file at a time."""
+
+    def __init__(self, out: Optional[TextIO] = None):
+        super().__init__(out)
+        self.files = 0
+        self._start()
+
+    def add_file(self, file_path: str, issues: List[dict]) -> None:
+        """Adds the issues of one file; each file should be added once."""
+        if not issues:
+            return
+        parts = []
+        write = parts.append
+        write(f"### File: `{file_path}`\n\n")
+
+        for i, issue in enumerate(issues, 1):
+            write(f"#### Issue {i}: {issue['issue']}\n")
+            write(f"- **Category**: {issue['category']}\n")
+            write(f"- **Line**: {issue['line_number']}\n")
+            write(f"- **Explanation**: {issue['explanation']}\n")
+
+            if issue.get("context"):
+                write("\nContext:\n```markdown\n")
+                write(issue["context"])
+                write("\n```\n")
+
+            write(f"\n**Recommendation**: {issue['recommendation']}\n\n")
+        self._add_section("".join(parts), len(issues))
+        self.files += 1
+
+    def add_issues(self, issues: Iterable[dict]) -> None:
+        for file_path, file_issues in group_by_file(issues).items():
+            self.add_file(file_path, file_issues)
+
+    def _sections_heading(self, count: Optional[int]) -> str:
+        return (
+            "## Found Issues\n\n" if count is None else f"## Found Issues ({count})\n\n"
+        )
+
+    def _write_header(self) -> None:
+        self.out.write("# Documentation Quality Report\n\n")
+
+    def _write_footer(self) -> None:
+        out = self.out
+        if not self.count:
+            out.write("✅ **No quality issues found in documentation.**\n")
+            return
+
+        if not self._buffered:
+            out.write(f"**Total**: {self.count} issue(s) in {self.files} file(s)\n\n")
+        out.write("## Summary of Requirements\n")
+        out.write(
+            "1. ❌ Do not include '# Overview' headers - these are automatically added by the table of contents\n"
+        )
+
+
+class CombinedReportWriter(_StreamingReport):
+    """Writes the review report for one document, discrepancies file by file.
+
+    quality_issues is None when the document's quality was not checked.
+    """
+
+    def __init__(
+        self,
+        docs_url: str,
+        related_files: List[str],
+        quality_issues: Optional[List[dict]],
+        out: Optional[TextIO] = None,
+    ):
+        super().__init__(out)
+        self.docs_url = docs_url
+        self.related_files = related_files
+        self.quality_issues = quality_issues
+        self._start()
+
+    def add_file(self, file_path: str, discrepancies: List[dict]) -> None:
+        """Adds the discrepancies found in one file; each file should be added once."""
+        if not discrepancies:
+            return
+        parts = []
+        write = parts.append
+        write(f"\n### File: `{file_path}`\n")
+
+        for i, disc in enumerate(discrepancies, 1):
+            write(f"\n#### Discrepancy {i}\n")
+
+            if disc["type"] == "json_value_mismatch":
+                write(f"*JSON Path: `{disc['path']}`*\n\n")
+                write("```diff\n")
+                write(f"- Documentation version: {disc['context']['docs_value']}\n")
+                write(f"+ Actual value: {disc['context']['actual_value']}\n")
+                write("```\n")
+
+                write("\nJSON Context:\n")
+                write("```json\n")
+                write(f"# Documentation version:\n{disc['docs_version']}\n")
+                write(f"\n# Actual version:\n{disc['code_version']}\n")
+                write("```\n")
+            elif disc["type"] == "semantic_mismatch":
+                write(f"*Type: {disc['context']['type']}*\n")
+                write(f"*Severity: {disc['context']['severity']}*\n")
+                write(f"*Language: {disc['language']}*\n\n")
+
+                write("```diff\n")
+                write(f"- Documentation version:\n{disc['docs_version']}\n")
+                write(f"+ Actual code:\n{disc['code_version']}\n")
+                write("```\n")
+
+                write(f"\nExplanation: {disc['context']['explanation']}\n")
+            else:
+                # Handle other types of discrepancies
+                if disc.get("language"):
+                    write(f"*Language: {disc['language']}*\n\n")
+
+                write("```diff\n")
+                write(f"- Documentation version:\n{disc['docs_version']}\n")
+                write(f"+ Actual code:\n{disc['code_version']}\n")
+                write("```\n")
+
+                # Add context if available
+                if context := disc.get("context"):
+                    write("\nContext:\n")
+                    if context.get("before"):
+                        write(f"```\n# Before\n{context['before']}\n```\n")
+                    if context.get("after"):
+                        write(f"```\n# After\n{context['after']}\n```\n")
+        self._add_section("".join(parts), len(discrepancies))
+
+    def add_discrepancies(self, discrepancies: Iterable[dict]) -> None:
+        for file_path, file_discs in group_by_file(discrepancies).items():
+            self.add_file(file_path, file_discs)
+
+    def _sections_heading(self, count: Optional[int]) -> str:
+        if count is None:
+            return "\n## Code Discrepancies\n"
+        return f"\n## Code Discrepancies ({count})\n"
+
+    def _write_header(self) -> None:
+        out = self.out
+        out.write("# Documentation Review Report\n\n")
+        out.write(f"## Reviewed Documentation\n{self.docs_url}\n\n")
+
+        # Quality Issues Section
+        out.write("## Documentation Quality Issues\n")
+        if self.quality_issues is None:
+            out.write(
+                "\n⏭️ Not re-checked: the documentation is unchanged since the base revision.\n"
+            )
+        elif self.quality_issues:
+            out.write(f"\nFound {len(self.quality_issues)} quality issue(s):\n\n")
+            for issue in self.quality_issues:
+                out.write(f"### {issue['issue']}\n")
+                out.write(f"- **Line**: {issue['line_number']}\n")
+                out.write(f"- **Explanation**: {issue['explanation']}\n")
+                if issue.get("context"):
+                    out.write("\nContext:\n```markdown\n")
+                    out.write(issue["context"])
+                    out.write("\n```\n")
+                out.write(f"\n**Recommendation**: {issue['recommendation']}\n\n")
+        else:
+            out.write("\n✅ No quality issues found.\n")
+
+        # List related files
+        out.write("\n## Related Files\n")
+        if self.related_files:
+            for file in self.related_files:
+                out.write(f"- `{file}`\n")
+        else:
+            out.write("*No related files explicitly mentioned in documentation*\n")
+
+    def _write_footer(self) -> None:
+        out = self.out
+        if not self.count:
+            out.write(
+                "\n✅ **No code discrepancies found between documentation and codebase.**\n"
+            )
+            return
+
+        if not self._buffered:
+            out.write(f"\n**Total**: {self.count} discrepancy(ies)\n")
+        out.write("\n## Recommendations\n")
+        out.write(
+            "1. Update the documentation to match the current codebase implementation\n"
+        )
+        out.write(
+            "2. Add version information to code examples if they represent older versions\n"
+        )
+        out.write(
+            "3. Consider adding automated documentation testing to your CI/CD pipeline\n"
+        )
+        out.write(
+            "4. Review the 'Related Files' section to ensure all relevant files are listed\n"
+        )
+        out.write(
+            "5. Address any quality issues found to improve documentation consistency\n"
+        )
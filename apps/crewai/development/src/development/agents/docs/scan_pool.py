@@ -0,0 +1,66 @@
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
+from typing import Callable, Iterable, Iterator, List, Optional, TypeVar
+
+logger = logging.getLogger("DocsReviewAgent")
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+EXECUTORS = {"thread": ThreadPoolExecutor, "process": ProcessPoolExecutor}
+
+
+def _run_chunk(func: Callable[[T], R], chunk: List[T]) -> List[R]:
+    """Applies a function to every item of a chunk inside a worker."""
+    return [func(item) for item in chunk]
+
+
+class ScanPool:
+    """Worker pool that processes items in chunks and yields results in input order.
+
+    Threads suit I/O-bound work such as reading files; processes suit
+    CPU-bound matching on large repositories. The function passed to a
+    process pool must be picklable, e.g. a module-level function or a
+    functools.partial of one.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        executor: str = "thread",
+        chunk_size: int = 64,
+    ):
+        if executor not in EXECUTORS:
+            raise ValueError(
+                f"Unknown executor '{executor}', expected one of {sorted(EXECUTORS)}"
+            )
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = executor
+        self.chunk_size = chunk_size
+
+    def map(self, func: Callable[[T], R], items: Iterable[T]) -> Iterator[R]:
+        """Yields func(item) for each item, preserving the order of the items."""
+        items = list(items)
+        chunks = [
+            items[start : start + self.chunk_size]
+            for start in range(0, len(items), self.chunk_size)
+        ]
+
+        # Not worth starting workers for a single chunk
+        if self.workers <= 1 or len(chunks) <= 1:
+            for item in items:
+                yield func(item)
+            return
+
+        workers = min(self.workers, len(chunks))
+        logger.debug(
+            f"Scanning {len(items)} items in {len(chunks)} chunks with {workers} {self.executor} workers"
+        )
+        with EXECUTORS[self.executor](max_workers=workers) as pool:
+            for results in pool.map(_run_chunk, repeat(func), chunks):
+                yield from results
@@ -1,40 +1,65 @@
 from crewai import Agent, Crew, Process, Task
-from langchain.tools import Tool
+from langchain.tools import StructuredTool, Tool
 import os
-import glob
 import yaml
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 from functools import wraps
 import uuid
 from pydantic import Field, BaseModel
+from development.tools.file_tools import (
+    MAX_READ_LENGTH,
+    READ_LENGTH,
+    bind_repository,
+    generate_bounded_file_tree,
+    list_directory,
+    read_file,
+)
+from development.tools.repository import RepositoryContext
+from development.tools.tool_cache import ToolCache
 
 
 class Development:
     """Development crew for maintaining documentation and sitemap"""
 
-    def __init__(self):
+    def __init__(self, repository: Optional[RepositoryContext] = None):
+        # Resolved once; every tool and task works on the same repository
+        self.repository = repository or RepositoryContext.resolve()
         self._setup_tools()
         self._load_configurations()
         self._create_agents_and_tasks()
 
     def _setup_tools(self):
         """Set up the tools"""
+        # Both agents walk the same paths, so their tools share one cache
+        self.tool_cache = ToolCache()
         self.tools = {
             "list_directory": Tool(
                 name="List directory contents",
-                func=list_directory,
+                func=self.tool_cache.wrap(
+                    "list_directory",
+                    bind_repository(list_directory, self.repository),
+                    self.repository.absolute,
+                ),
                 description="List up to 20 items in a directory, filtering out system files",
             ),
-            "read_file": Tool(
+            "read_file": StructuredTool.from_function(
                 name="Read file contents",
-                func=read_file,
-                description="Read the first 4000 characters of a file",
+                func=self.tool_cache.wrap(
+                    "read_file",
+                    bind_repository(read_file, self.repository),
+                    self.repository.absolute,
+                ),
+                description=f"Read a file in pages: up to length bytes (default {READ_LENGTH}, at most {MAX_READ_LENGTH}) from a byte offset, lines start_line to end_line, or with outline=true only its headings (Markdown) or top-level definitions (Python, JS/TS) with line numbers. Every mode returns at most length characters. Truncated output says where to continue",
             ),
             "generate_file_tree": Tool(
                 name="Generate file tree",
-                func=generate_file_tree,
-                description="Generate a file tree up to 5 levels deep, excluding gitignored files",
+                func=self.tool_cache.wrap(
+                    "generate_file_tree",
+                    bind_repository(generate_bounded_file_tree, self.repository),
+                    self.repository.absolute,
+                ),
+                description="Generate a file tree up to 5 levels deep, excluding gitignored files. Lists one directory per line, shallow directories first, and summarizes what does not fit as '+N more files'",
             ),
         }
 
@@ -85,7 +110,7 @@ class Development:
 
         for task_id, config in task_configs.items():
             description = config["description"].format(
-                root_path="/Users/jhs/Projects/sfh", current_time=current_time
+                root_path=self.repository.root, current_time=current_time
             )
 
             expected_output = config["expected_output"]
@@ -110,153 +135,10 @@ class Development:
             tasks=self.tasks,
             process=Process.sequential,
             verbose=True,
+            after_kickoff_callbacks=[self._report_tool_cache],
         )
 
-
-def list_directory(path: str) -> str:
-    """List the contents of a directory"""
-    try:
-        # Define directories and files to ignore
-        ignore_patterns = {
-            ".git",
-            "node_modules",
-            "__pycache__",
-            ".venv",
-            ".DS_Store",
-            "*.pyc",
-            "*.pyo",
-            "*.pyd",
-            ".env",
-            ".vscode",
-            ".idea",
-            "dist",
-            "build",
-            "coverage",
-            "tmp",
-            "temp",
-            "logs",
-            ".next",
-            ".cache",
-        }
-
-        # Add openlit directory to ignore patterns
-        ignore_paths = {"apps/crewai/openlit", "apps/crewai/development/openlit"}
-
-        items = glob.glob(os.path.join(path, "*"))
-        filtered_items = []
-
-        for item in items:
-            basename = os.path.basename(item)
-            rel_path = os.path.relpath(item, "/Users/jhs/Projects/sfh")
-
-            # Skip if item matches any ignore pattern or is in ignore paths
-            if not any(
-                pattern in basename
-                or basename.endswith(pattern.replace("*", ""))
-                or pattern in item.lower()
-                for pattern in ignore_patterns
-            ) and not any(
-                rel_path.startswith(ignore_path) for ignore_path in ignore_paths
-            ):
-                filtered_items.append(
-                    f"{'[DIR]' if os.path.isdir(item) else '[FILE]'} {basename}"
-                )
-
-        return "\n".join(filtered_items[:20])  # Limit to top 20 items
-    except Exception as e:
-        return f"Error listing directory: {str(e)}"
-
-
-def read_file(path: str) -> str:
-    """Read the contents of a file with size limits"""
-    try:
-        # Skip certain file types
-        if any(path.endswith(ext) for ext in [".pyc", ".pyo", ".pyd", ".log", ".lock"]):
-            return "File type not supported for reading"
-
-        with open(path, "r") as f:
-            content = f.read(4000)  # Read only first 4000 chars
-            if len(content) == 4000:
-                content += "\n... (content truncated for length)"
-            return content
-    except Exception as e:
-        return f"Error reading file: {str(e)}"
-
-
-def generate_file_tree(path: str, max_depth: int = 5) -> str:
-    """Generate a file tree up to specified depth, respecting gitignore"""
-
-    def should_ignore(path: str, ignore_patterns: set, ignore_paths: set) -> bool:
-        path_parts = path.split(os.sep)
-        rel_path = os.path.relpath(path, "/Users/jhs/Projects/sfh")
-        return any(
-            any(
-                pattern in part.lower() or part.endswith(pattern.replace("*", ""))
-                for pattern in ignore_patterns
-            )
-            for part in path_parts
-        ) or any(rel_path.startswith(ignore_path) for ignore_path in ignore_paths)
-
-    def tree_helper(dir_path: str, prefix: str = "", depth: int = 0) -> List[str]:
-        if depth > max_depth:
-            return []
-
-        ignore_patterns = {
-            ".git",
-            "node_modules",
-            "__pycache__",
-            ".venv",
-            ".DS_Store",
-            "*.pyc",
-            "*.pyo",
-            "*.pyd",
-            ".env",
-            ".vscode",
-            ".idea",
-            "dist",
-            "build",
-            "coverage",
-            "tmp",
-            "temp",
-            "logs",
-            ".next",
-            ".cache",
-        }
-
-        ignore_paths = {"apps/crewai/openlit", "apps/crewai/development/openlit"}
-
-        try:
-            entries = os.listdir(dir_path)
-            entries = sorted(
-                [
-                    e
-                    for e in entries
-                    if not should_ignore(
-                        os.path.join(dir_path, e), ignore_patterns, ignore_paths
-                    )
-                ]
-            )
-
-            tree = []
-            for i, entry in enumerate(entries):
-                is_last = i == len(entries) - 1
-                entry_path = os.path.join(dir_path, entry)
-
-                # Add current entry
-                marker = "└── " if is_last else "├── "
-                tree.append(f"{prefix}{marker}{entry}")
-
-                # Recursively add subdirectories
-                if os.path.isdir(entry_path):
-                    ext_prefix = "    " if is_last else "│   "
-                    tree.extend(tree_helper(entry_path, prefix + ext_prefix, depth + 1))
-
-            return tree
-        except Exception as e:
-            return [f"Error accessing {dir_path}: {str(e)}"]
-
-    try:
-        tree_lines = [".", *tree_helper(path)]
-        return "\n".join(tree_lines)
-    except Exception as e:
-        return f"Error generating file tree: {str(e)}"
+    def _report_tool_cache(self, output):
+        """Prints the tool cache counters once the crew has finished"""
+        print(f"\nTool cache: {self.tool_cache.summary()}")
+        return output
@@ -0,0 +1,399 @@
+import inspect
+import os
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from functools import wraps
+from itertools import islice
+from typing import Callable, Iterator, List, Optional
+
+from development.tools.repo_walker import scan_directory
+from development.tools.repository import RepositoryContext, default_repository
+from development.tools.tool_cache import track
+
+# Budget of the bounded file tree, sized for an agent's context
+MAX_TREE_CHARS = 8000
+MAX_TREE_ENTRIES = 600
+MAX_ENTRIES_PER_DIR = 40
+BUDGET_REACHED = "... (budget reached, remaining directories not listed)"
+
+# Default and largest number of bytes returned by read_file
+READ_LENGTH = 4000
+MAX_READ_LENGTH = 16000
+
+# Lines that make up a file's outline
+MARKDOWN_EXTENSIONS = frozenset({".md", ".mdx"})
+MARKDOWN_FENCE = re.compile(r"^\s*(```|~~~)")
+MARKDOWN_HEADING = re.compile(r"^#{1,6}\s")
+PYTHON_DEFINITION = re.compile(r"^(?:async\s+def|def|class)\s")
+SCRIPT_DEFINITION = re.compile(
+    r"^(?:export\s+)?(?:default\s+)?(?:declare\s+)?(?:abstract\s+)?(?:async\s+)?"
+    r"(?:function\*?|class|interface|type|enum|const|let|var|namespace)\s"
+)
+OUTLINE_PATTERNS = {
+    ".md": MARKDOWN_HEADING,
+    ".mdx": MARKDOWN_HEADING,
+    ".py": PYTHON_DEFINITION,
+    ".js": SCRIPT_DEFINITION,
+    ".jsx": SCRIPT_DEFINITION,
+    ".mjs": SCRIPT_DEFINITION,
+    ".ts": SCRIPT_DEFINITION,
+    ".tsx": SCRIPT_DEFINITION,
+}
+
+
+def bind_repository(
+    func: Callable[..., str], repository: RepositoryContext
+) -> Callable[..., str]:
+    """Binds a tool to a repository and hides the repository argument from agents."""
+
+    @wraps(func)
+    def bound(*args, **kwargs):
+        return func(*args, repository=repository, **kwargs)
+
+    signature = inspect.signature(func)
+    bound.__signature__ = signature.replace(
+        parameters=[
+            parameter
+            for parameter in signature.parameters.values()
+            if parameter.name != "repository"
+        ]
+    )
+    bound.__annotations__ = {
+        name: annotation
+        for name, annotation in func.__annotations__.items()
+        if name != "repository"
+    }
+    return bound
+
+
+def list_directory(path: str, repository: Optional[RepositoryContext] = None) -> str:
+    """List the contents of a directory"""
+    try:
+        repository = repository or default_repository()
+        path = repository.absolute(path)
+        repository, relative_dir = repository.locate(path)
+        entry_filter = repository.entry_filter
+        if entry_filter.ignores_path(relative_dir):
+            return ""
+
+        # Entries ignored by the .gitignore files above them are dropped up front
+        track(path)
+        track(os.path.join(path, ".gitignore"))
+        entries = scan_directory(path, repository.matcher(relative_dir), relative_dir)
+        filtered_items = []
+
+        for entry in entries:
+            basename = entry.name
+            if basename.startswith("."):
+                continue
+
+            # Skip if item matches any ignore pattern or is in ignore paths
+            if not entry_filter.ignores(
+                f"{relative_dir}/{basename}" if relative_dir else basename
+            ):
+                filtered_items.append(
+                    f"{'[DIR]' if entry.is_dir() else '[FILE]'} {basename}"
+                )
+
+        return "\n".join(filtered_items[:20])  # Limit to top 20 items
+    except Exception as e:
+        return f"Error listing directory: {str(e)}"
+
+
+def read_file(
+    path: str,
+    offset: int = 0,
+    length: int = READ_LENGTH,
+    start_line: Optional[int] = None,
+    end_line: Optional[int] = None,
+    outline: bool = False,
+    repository: Optional[RepositoryContext] = None,
+) -> str:
+    """Read part of a file: a byte range, a range of lines or an outline.
+
+    By default up to length bytes are read from offset, seeking straight to
+    it. start_line and end_line (1-based, inclusive) return numbered lines
+    instead, and outline lists the headings of Markdown files or the
+    top-level definitions of Python and JS/TS files. Only the lines up to
+    the requested ones are read, and no mode returns more than length
+    characters. length is capped at MAX_READ_LENGTH, so a large file is
+    always read in pages. Relative paths are taken from the repository root.
+    """
+    try:
+        path = (repository or default_repository()).absolute(path)
+        # Skip certain file types
+        if any(path.endswith(ext) for ext in [".pyc", ".pyo", ".pyd", ".log", ".lock"]):
+            return "File type not supported for reading"
+        if offset < 0 or length <= 0:
+            raise ValueError("offset must not be negative and length must be positive")
+        length = min(length, MAX_READ_LENGTH)
+
+        track(path)
+        if outline:
+            return _read_outline(path, length)
+        if start_line is not None or end_line is not None:
+            return _read_lines(path, start_line or 1, end_line, length)
+        return _read_range(path, offset, length)
+    except Exception as e:
+        return f"Error reading file: {str(e)}"
+
+
+def _read_range(path: str, offset: int, length: int) -> str:
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        f.seek(offset)
+        data = f.read(length)
+    if offset and offset >= size:
+        return f"Offset {offset} is past the end of the file ({size} bytes)"
+
+    # A range can split a multi-byte character at either end
+    content = data.decode("utf-8", errors="ignore")
+    end = offset + len(data)
+    if end < size:
+        content += (
+            f"\n... (content truncated for length: bytes {offset}-{end} of {size},"
+            f" continue with offset={end})"
+        )
+    return content
+
+
+def _read_lines(
+    path: str, start_line: int, end_line: Optional[int], length: int
+) -> str:
+    if start_line < 1 or (end_line is not None and end_line < start_line):
+        raise ValueError(
+            "line numbers start at 1 and end_line must not be before start_line"
+        )
+
+    lines = []
+    chars = 0
+    with open(path, "r", errors="replace") as f:
+        for number, line in enumerate(islice(f, start_line - 1, end_line), start_line):
+            line = f"{number:>6}  {line.rstrip()}"
+            if chars + len(line) + 1 > length:
+                lines.append(
+                    f"... (content truncated for length, continue with start_line={number})"
+                )
+                break
+            lines.append(line)
+            chars += len(line) + 1
+    if not lines:
+        return f"The file has fewer than {start_line} lines"
+    return "\n".join(lines)
+
+
+def _read_outline(path: str, length: int) -> str:
+    extension = os.path.splitext(path)[1].lower()
+    pattern = OUTLINE_PATTERNS.get(extension)
+    if pattern is None:
+        raise ValueError(
+            f"No outline available for {extension or 'files without an extension'}"
+        )
+
+    lines = []
+    chars = 0
+    in_fence = False
+    with open(path, "r", errors="replace") as f:
+        for number, line in enumerate(f, 1):
+            # Headings inside Markdown code blocks are code, not structure
+            if extension in MARKDOWN_EXTENSIONS and MARKDOWN_FENCE.match(line):
+                in_fence = not in_fence
+                continue
+            if in_fence or not pattern.match(line):
+                continue
+            line = f"{number:>6}  {line.rstrip()}"
+            if chars + len(line) + 1 > length:
+                lines.append("... (outline truncated for length)")
+                break
+            lines.append(line)
+            chars += len(line) + 1
+    if not lines:
+        return "No headings or top-level definitions found"
+    return "\n".join(lines)
+
+
+def generate_file_tree(
+    path: str, max_depth: int = 5, repository: Optional[RepositoryContext] = None
+) -> str:
+    """Generate a file tree up to specified depth, respecting gitignore"""
+    repository = repository or default_repository()
+    path = repository.absolute(path)
+    repository, start = repository.locate(path)
+    entry_filter = repository.entry_filter
+    ignores_root = entry_filter.ignores_path(start)
+    tree = ["."]
+
+    def tree_helper(dir_path: str, relative_dir: str, prefix: str, depth: int) -> None:
+        try:
+            track(dir_path)
+            track(os.path.join(dir_path, ".gitignore"))
+            # Nested .gitignore files apply to their own subtree
+            matcher = repository.matcher(relative_dir)
+
+            entries = []
+            for entry in scan_directory(dir_path, matcher, relative_dir):
+                entry_relative = (
+                    f"{relative_dir}/{entry.name}" if relative_dir else entry.name
+                )
+                if not (ignores_root or entry_filter.ignores(entry_relative)):
+                    entries.append((entry, entry_relative))
+        except Exception as e:
+            tree.append(f"Error accessing {dir_path}: {str(e)}")
+            return
+
+        last = len(entries) - 1
+        for i, (entry, entry_relative) in enumerate(entries):
+            # Add current entry
+            tree.append(f"{prefix}{'└── ' if i == last else '├── '}{entry.name}")
+
+            # Recursively add subdirectories, using the type scandir already read
+            if depth < max_depth and entry.is_dir():
+                tree_helper(
+                    entry.path,
+                    entry_relative,
+                    prefix + ("    " if i == last else "│   "),
+                    depth + 1,
+                )
+
+    try:
+        tree_helper(path, start, "", 0)
+        return "\n".join(tree)
+    except Exception as e:
+        return f"Error generating file tree: {str(e)}"
+
+
+@dataclass
+class DirectoryListing:
+    """The entries of one directory shown by the bounded file tree."""
+
+    path: str
+    dirs: List[str] = field(default_factory=list)
+    files: List[str] = field(default_factory=list)
+    hidden_dirs: int = 0
+    hidden_files: int = 0
+    error: Optional[str] = None
+
+    @property
+    def shown(self) -> int:
+        return len(self.dirs) + len(self.files)
+
+    def hide(self, count: int) -> None:
+        """Moves the last count shown entries into the summary, files first."""
+        if count <= 0:
+            return
+        files = min(count, len(self.files))
+        if files:
+            self.files, self.hidden_files = (
+                self.files[:-files],
+                self.hidden_files + files,
+            )
+        dirs = min(count - files, len(self.dirs))
+        if dirs:
+            self.dirs, self.hidden_dirs = self.dirs[:-dirs], self.hidden_dirs + dirs
+
+    def format(self) -> str:
+        if self.error:
+            return f"{self.path}: error: {self.error}"
+        names = [f"{name}/" for name in self.dirs] + self.files
+        summary = []
+        if self.hidden_dirs:
+            summary.append(f"+{self.hidden_dirs} more directories")
+        if self.hidden_files:
+            summary.append(f"+{self.hidden_files} more files")
+        if not names and not summary:
+            return f"{self.path}: (empty)"
+        return f"{self.path}: " + ", ".join(names + summary)
+
+
+def iter_file_tree(
+    path: str,
+    max_depth: int = 5,
+    max_entries_per_dir: int = MAX_ENTRIES_PER_DIR,
+    repository: Optional[RepositoryContext] = None,
+) -> Iterator[DirectoryListing]:
+    """Yields the directories of a tree breadth-first, one listing each.
+
+    Subdirectories are listed before files. Entries past max_entries_per_dir
+    are only counted, and their subdirectories are never entered, so
+    stopping the iteration early also stops the walk.
+    """
+    repository = repository or default_repository()
+    path = repository.absolute(path)
+    repository, start = repository.locate(path)
+    entry_filter = repository.entry_filter
+    ignores_root = entry_filter.ignores_path(start)
+    queue = deque([(path, start, 0)])
+    while queue:
+        dir_path, relative_dir, depth = queue.popleft()
+        # Listings are shown relative to the tree's root
+        shown_dir = relative_dir[len(start) :].lstrip("/")
+        listing = DirectoryListing(f"{shown_dir}/" if shown_dir else "./")
+        try:
+            track(dir_path)
+            track(os.path.join(dir_path, ".gitignore"))
+            # Nested .gitignore files apply to their own subtree
+            matcher = repository.matcher(relative_dir)
+            for entry in scan_directory(dir_path, matcher, relative_dir):
+                entry_relative = (
+                    f"{relative_dir}/{entry.name}" if relative_dir else entry.name
+                )
+                if not (ignores_root or entry_filter.ignores(entry_relative)):
+                    if entry.is_dir():
+                        listing.dirs.append(entry.name)
+                    else:
+                        listing.files.append(entry.name)
+        except Exception as e:
+            listing.error = str(e)
+            yield listing
+            continue
+
+        listing.hide(listing.shown - max_entries_per_dir)
+        if depth < max_depth:
+            queue.extend(
+                (
+                    os.path.join(dir_path, name),
+                    f"{relative_dir}/{name}" if relative_dir else name,
+                    depth + 1,
+                )
+                for name in listing.dirs
+            )
+        yield listing
+
+
+def generate_bounded_file_tree(
+    path: str,
+    max_depth: int = 5,
+    max_chars: int = MAX_TREE_CHARS,
+    max_entries: int = MAX_TREE_ENTRIES,
+    max_entries_per_dir: int = MAX_ENTRIES_PER_DIR,
+    repository: Optional[RepositoryContext] = None,
+) -> str:
+    """Generate a breadth-first file tree that stays within a size budget.
+
+    Each line lists one directory, shallow directories first. Once the
+    character or entry budget runs out the walk stops, so the cost does
+    not depend on the size of the repository.
+    """
+    lines = []
+    chars = 0
+    entries = 0
+    try:
+        for listing in iter_file_tree(path, max_depth, max_entries_per_dir, repository):
+            # Trim the directory that crosses the entry budget and stop after it
+            if entries + listing.shown > max_entries:
+                listing.hide(entries + listing.shown - max_entries)
+            line = listing.format()
+            # Room is kept for the note that the tree was cut short
+            if chars + len(line) + 1 + len(BUDGET_REACHED) > max_chars:
+                lines.append(BUDGET_REACHED)
+                break
+            lines.append(line)
+            chars += len(line) + 1
+            entries += listing.shown
+            if entries >= max_entries:
+                lines.append(BUDGET_REACHED)
+                break
+        return "\n".join(lines)
+    except Exception as e:
+        return f"Error generating file tree: {str(e)}"
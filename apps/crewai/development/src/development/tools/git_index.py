@@ -0,0 +1,106 @@
+import os
+import struct
+from typing import List, Optional
+
+# Fixed-size part of an index entry; only the mode and flags are unpacked from
+# ctime, mtime, dev, ino, mode, uid, gid, size, object id and flags
+ENTRY_HEADER = struct.Struct(">8x8x4x4xI4x4x4x20xH")
+EXTENDED_FLAG = 0x4000
+NAME_MASK = 0x0FFF
+STAGE_SHIFT = 12
+STAGE_MASK = 0x3
+
+# Object types stored in the upper bits of the entry mode
+MODE_TYPE_MASK = 0o170000
+MODE_REGULAR = 0o100000
+MODE_SYMLINK = 0o120000
+
+
+class GitIndexError(ValueError):
+    """Raised when a git index file cannot be parsed."""
+
+
+def find_git_dir(root: str) -> Optional[str]:
+    """Returns the git directory for a working tree root, or None if it has none.
+
+    Follows the "gitdir:" pointer used by worktrees and submodules.
+    """
+    dot_git = os.path.join(root, ".git")
+    if os.path.isdir(dot_git):
+        return dot_git
+    if os.path.isfile(dot_git):
+        with open(dot_git, "r") as f:
+            content = f.read().strip()
+        if content.startswith("gitdir:"):
+            git_dir = content[len("gitdir:") :].strip()
+            return os.path.normpath(os.path.join(root, git_dir))
+    return None
+
+
+def _read_varint(data: bytes, offset: int) -> tuple:
+    """Decodes the offset-encoded varint used by index version 4."""
+    byte = data[offset]
+    offset += 1
+    value = byte & 0x7F
+    while byte & 0x80:
+        byte = data[offset]
+        offset += 1
+        value = ((value + 1) << 7) | (byte & 0x7F)
+    return value, offset
+
+
+def read_tracked_files(git_dir: str) -> List[str]:
+    """Lists the tracked regular files and symlinks recorded in the git index.
+
+    Supports index versions 2, 3 and 4 by parsing the file directly, so no
+    git executable is needed. Files with unresolved merge conflicts have an
+    entry per stage but are listed once.
+    """
+    index_path = os.path.join(git_dir, "index")
+    with open(index_path, "rb") as f:
+        data = f.read()
+
+    if len(data) < 12 or data[:4] != b"DIRC":
+        raise GitIndexError(f"Not a git index file: {index_path}")
+    version, count = struct.unpack_from(">II", data, 4)
+    if version not in (2, 3, 4):
+        raise GitIndexError(f"Unsupported git index version {version}")
+
+    files: List[str] = []
+    offset = 12
+    previous_name = b""
+    last_listed = None
+
+    for _ in range(count):
+        entry_start = offset
+        mode, flags = ENTRY_HEADER.unpack_from(data, offset)
+        offset += ENTRY_HEADER.size
+        if version >= 3 and flags & EXTENDED_FLAG:
+            offset += 2
+
+        if version == 4:
+            strip, offset = _read_varint(data, offset)
+            end = data.index(b"\0", offset)
+            name = previous_name[: len(previous_name) - strip] + data[offset:end]
+            offset = end + 1
+        else:
+            name_length = flags & NAME_MASK
+            if name_length == NAME_MASK:
+                end = data.index(b"\0", offset)
+            else:
+                end = offset + name_length
+            name = data[offset:end]
+            # Entries are NUL-padded to a multiple of eight bytes
+            entry_length = end - entry_start
+            offset = entry_start + (entry_length + 8) // 8 * 8
+        previous_name = name
+
+        # Entries are sorted by name, so conflict stages are adjacent
+        if flags >> STAGE_SHIFT & STAGE_MASK and name == last_listed:
+            continue
+        if mode & MODE_TYPE_MASK not in (MODE_REGULAR, MODE_SYMLINK):
+            continue  # Submodules and sparse-index directories
+        files.append(name.decode("utf-8", errors="surrogateescape"))
+        last_listed = name
+
+    return files
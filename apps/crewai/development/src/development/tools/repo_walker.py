@@ -0,0 +1,179 @@
+import logging
+import os
+from typing import Iterable, Iterator, List, Optional
+
+import pathspec
+
+from development.tools.git_index import GitIndexError, find_git_dir, read_tracked_files
+
+logger = logging.getLogger(__name__)
+
+# Generated or vendored directories that are never worth descending into
+DEFAULT_PRUNED_DIRS = frozenset(
+    {".git", "node_modules", ".turbo", ".next", "dist", "__pycache__", ".venv"}
+)
+
+
+class IgnoreMatcher:
+    """Gitignore-style matcher for paths relative to a repository root.
+
+    Matchers form a chain: each nested .gitignore adds a child scoped to its
+    directory, and the deepest file with a matching rule decides, as in git.
+    """
+
+    def __init__(
+        self,
+        patterns: Iterable[str] = (),
+        pruned_dirs: Iterable[str] = DEFAULT_PRUNED_DIRS,
+        base: str = "",
+        parent: Optional["IgnoreMatcher"] = None,
+    ):
+        self.pruned_dirs = frozenset(pruned_dirs)
+        self.base = base
+        self.parent = parent
+        self._spec = pathspec.PathSpec.from_lines(
+            pathspec.patterns.GitWildMatchPattern, patterns
+        )
+
+    @classmethod
+    def from_gitignore(
+        cls, root: str, pruned_dirs: Iterable[str] = DEFAULT_PRUNED_DIRS
+    ) -> "IgnoreMatcher":
+        """Builds a matcher from .git/info/exclude and the root .gitignore, if any."""
+        git_dir = find_git_dir(root)
+        exclude_patterns = (
+            _read_patterns(os.path.join(git_dir, "info", "exclude")) if git_dir else []
+        )
+        return cls(exclude_patterns, pruned_dirs).for_directory(root, "")
+
+    def for_directory(self, root: str, relative_dir: str) -> "IgnoreMatcher":
+        """Returns the matcher for a directory, adding its .gitignore if it has one."""
+        dir_path = os.path.join(root, relative_dir) if relative_dir else root
+        patterns = _read_patterns(os.path.join(dir_path, ".gitignore"))
+        if not patterns:
+            return self
+        logger.debug(f"Loading .gitignore patterns from {dir_path}")
+        return IgnoreMatcher(patterns, self.pruned_dirs, relative_dir, self)
+
+    def is_ignored(self, relative_path: str, is_dir: bool) -> bool:
+        """Checks a path relative to the root; directories are matched with a trailing slash."""
+        if is_dir:
+            if os.path.basename(relative_path) in self.pruned_dirs:
+                return True
+            relative_path += "/"
+
+        matcher: Optional[IgnoreMatcher] = self
+        while matcher is not None:
+            local_path = (
+                relative_path[len(matcher.base) + 1 :]
+                if matcher.base
+                else relative_path
+            )
+            include = matcher._spec.check_file(local_path).include
+            if include is not None:
+                return include
+            matcher = matcher.parent
+        return False
+
+
+def _read_patterns(path: str) -> List[str]:
+    """Reads the patterns of a gitignore-style file, or none if it does not exist."""
+    if not os.path.isfile(path):
+        return []
+    with open(path, "r") as f:
+        return [
+            line.rstrip("\n") for line in f if line.strip() and not line.startswith("#")
+        ]
+
+
+def scan_directory(
+    dir_path: str, matcher: IgnoreMatcher, relative_dir: str = ""
+) -> List[os.DirEntry]:
+    """Lists the entries of a directory that are not ignored, sorted by name.
+
+    relative_dir is the directory's path relative to the matcher's root.
+    """
+    with os.scandir(dir_path) as it:
+        entries = sorted(it, key=lambda entry: entry.name)
+
+    return [
+        entry
+        for entry in entries
+        if not matcher.is_ignored(
+            f"{relative_dir}/{entry.name}" if relative_dir else entry.name,
+            entry.is_dir(follow_symlinks=False),
+        )
+    ]
+
+
+def walk_files(root: str, matcher: Optional[IgnoreMatcher] = None) -> Iterator[str]:
+    """Yields the relative paths of all non-ignored files under root.
+
+    Ignored directories are pruned as soon as they are seen, so their
+    contents are never listed or stat'ed. Nested .gitignore files apply to
+    the directories that contain them.
+    """
+    if matcher is None:
+        matcher = IgnoreMatcher.from_gitignore(root)
+
+    stack = [("", matcher)]
+    while stack:
+        relative_dir, dir_matcher = stack.pop()
+        dir_path = os.path.join(root, relative_dir) if relative_dir else root
+        try:
+            if relative_dir:
+                dir_matcher = dir_matcher.for_directory(root, relative_dir)
+            entries = scan_directory(dir_path, dir_matcher, relative_dir)
+        except OSError as e:
+            logger.warning(f"Error scanning directory {dir_path}: {e}")
+            continue
+
+        subdirs = []
+        for entry in entries:
+            relative_path = (
+                f"{relative_dir}/{entry.name}" if relative_dir else entry.name
+            )
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append((relative_path, dir_matcher))
+            elif entry.is_file():
+                yield relative_path
+
+        # Reversed so directories are visited in sorted order
+        stack.extend(reversed(subdirs))
+
+
+def list_repository_files(
+    root: str, backend: str = "auto", matcher: Optional[IgnoreMatcher] = None
+) -> List[str]:
+    """Lists the relative paths of the repository's files.
+
+    The "git-index" backend reads tracked files straight from the git index,
+    which avoids walking the tree but omits untracked files. "walk" always
+    walks the tree, and "auto" uses the index when the root has a git
+    directory and falls back to walking otherwise.
+    """
+    if backend not in ("auto", "walk", "git-index"):
+        raise ValueError(f"Unknown file enumeration backend '{backend}'")
+    if matcher is None:
+        matcher = IgnoreMatcher.from_gitignore(root)
+
+    if backend != "walk":
+        git_dir = find_git_dir(root)
+        if git_dir is None:
+            if backend == "git-index":
+                raise ValueError(f"No git directory found in {root}")
+        else:
+            try:
+                return [
+                    path
+                    for path in read_tracked_files(git_dir)
+                    if not matcher.pruned_dirs.intersection(path.split("/")[:-1])
+                ]
+            except (OSError, GitIndexError) as e:
+                if backend == "git-index":
+                    raise
+                logger.warning(
+                    f"Error reading git index, walking the tree instead: {e}"
+                )
+
+    return list(walk_files(root, matcher))
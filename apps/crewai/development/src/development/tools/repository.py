@@ -0,0 +1,204 @@
+import logging
+import os
+import posixpath
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from development.tools.git_index import find_git_dir
+from development.tools.repo_walker import IgnoreMatcher
+from development.tools.tool_cache import file_stamp, track
+
+logger = logging.getLogger(__name__)
+
+# Environment variable that overrides the repository root
+ROOT_ENV_VAR = "REPOSITORY_ROOT"
+
+# Directories and files to ignore, matched against every path component
+IGNORE_PATTERNS = frozenset(
+    {
+        ".git",
+        "node_modules",
+        "__pycache__",
+        ".venv",
+        ".DS_Store",
+        "*.pyc",
+        "*.pyo",
+        "*.pyd",
+        ".env",
+        ".vscode",
+        ".idea",
+        "dist",
+        "build",
+        "coverage",
+        "tmp",
+        "temp",
+        "logs",
+        ".next",
+        ".cache",
+    }
+)
+
+# Paths relative to the repository root that are never listed
+IGNORE_PATHS = ("apps/crewai/openlit", "apps/crewai/development/openlit")
+
+
+class EntryFilter:
+    """The tools' name and path ignore rules, compiled once per repository.
+
+    A name is ignored when it contains one of the patterns (case-insensitive)
+    or ends with one with the "*" removed. A path is ignored when it starts
+    with one of the ignored paths. Paths are relative to the repository
+    root, so where the repository is checked out does not matter.
+    """
+
+    def __init__(
+        self,
+        patterns: Iterable[str] = IGNORE_PATTERNS,
+        ignore_paths: Iterable[str] = IGNORE_PATHS,
+    ):
+        patterns = sorted(patterns)
+        self._contains = re.compile(
+            "|".join(re.escape(pattern) for pattern in patterns)
+        )
+        self._suffixes = tuple(pattern.replace("*", "") for pattern in patterns)
+        self._ignore_paths = tuple(ignore_paths)
+
+    def ignores_name(self, name: str) -> bool:
+        return bool(self._contains.search(name.lower())) or name.endswith(
+            self._suffixes
+        )
+
+    def ignores(self, relative_path: str) -> bool:
+        """Checks an entry whose parent directories already passed the filter."""
+        return self.ignores_name(
+            posixpath.basename(relative_path)
+        ) or relative_path.startswith(self._ignore_paths)
+
+    def ignores_path(self, relative_path: str) -> bool:
+        """Checks every component of a path, for directories not reached through the filter."""
+        if not relative_path:
+            return False
+        return any(
+            self.ignores_name(part) for part in relative_path.split("/")
+        ) or relative_path.startswith(self._ignore_paths)
+
+
+def find_repository_root(start: str) -> Optional[str]:
+    """Returns the closest directory at or above start with a .git entry, like git's toplevel."""
+    path = os.path.abspath(start)
+    while True:
+        if find_git_dir(path) is not None:
+            return path
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+
+class RepositoryContext:
+    """The repository the crew's tools and tasks work on.
+
+    Resolved once at startup and shared by every tool, so the ignore rules
+    are compiled once and each directory's .gitignore chain is only rebuilt
+    when one of its files changes.
+    """
+
+    def __init__(self, root: str, entry_filter: Optional[EntryFilter] = None):
+        self.root = os.path.abspath(root)
+        self.entry_filter = entry_filter or EntryFilter()
+        # Directory -> (stamps of its ignore files, parent matcher, matcher)
+        self._matchers: Dict[
+            str, Tuple[tuple, Optional[IgnoreMatcher], IgnoreMatcher]
+        ] = {}
+        git_dir = find_git_dir(self.root)
+        self._exclude_file = (
+            os.path.join(git_dir, "info", "exclude") if git_dir else None
+        )
+
+    @classmethod
+    def resolve(cls, start: Optional[str] = None) -> "RepositoryContext":
+        """Finds the repository root once, for the whole process.
+
+        REPOSITORY_ROOT wins when set; otherwise the root is the top of the
+        git checkout containing start, which defaults to the current directory.
+        """
+        root = os.getenv(ROOT_ENV_VAR)
+        if root:
+            if not os.path.isdir(root):
+                raise ValueError(f"{ROOT_ENV_VAR} is not a directory: {root}")
+        else:
+            start = start or os.getcwd()
+            root = find_repository_root(start)
+            if root is None:
+                logger.warning(
+                    f"No git checkout found above {start}, using it as the repository root"
+                )
+                root = start
+        logger.info(f"Repository root: {os.path.abspath(root)}")
+        return cls(root)
+
+    def absolute(self, path: str) -> str:
+        """Resolves a path given relative to the repository root."""
+        return path if os.path.isabs(path) else os.path.join(self.root, path)
+
+    def relative(self, path: str) -> Optional[str]:
+        """Returns path relative to the root with forward slashes, or None if outside it."""
+        relative = os.path.relpath(os.path.abspath(path), self.root)
+        if relative == ".":
+            return ""
+        if relative == os.pardir or relative.startswith(os.pardir + os.sep):
+            return None
+        return Path(relative).as_posix()
+
+    def locate(self, path: str) -> Tuple["RepositoryContext", str]:
+        """Returns the context containing path and path relative to its root.
+
+        Relative paths are taken to be relative to the root. Paths outside
+        the repository get a context of their own, rooted at the path and
+        sharing this context's filter.
+        """
+        path = self.absolute(path)
+        relative = self.relative(path)
+        if relative is not None:
+            return self, relative
+        return RepositoryContext(path, self.entry_filter), ""
+
+    def _ignore_files(self, relative_dir: str) -> List[str]:
+        """The files whose rules a directory adds to its parent's."""
+        files = [os.path.join(self.root, relative_dir, ".gitignore")]
+        if not relative_dir and self._exclude_file:
+            files.append(self._exclude_file)
+        return files
+
+    def matcher(self, relative_dir: str) -> IgnoreMatcher:
+        """Returns the gitignore matcher for a directory relative to the root.
+
+        It carries the rules of every .gitignore from the root down to the
+        directory, as git applies them. A cached matcher is reused while
+        none of those files has changed, and the files are reported to
+        track() so cached tool results are invalidated along with it.
+        """
+        ignore_files = self._ignore_files(relative_dir)
+        for path in ignore_files:
+            track(path)
+        stamps = tuple(file_stamp(path) for path in ignore_files)
+        parent = self.matcher(posixpath.dirname(relative_dir)) if relative_dir else None
+
+        cached = self._matchers.get(relative_dir)
+        if cached is not None and cached[0] == stamps and cached[1] is parent:
+            return cached[2]
+
+        if parent is not None:
+            matcher = parent.for_directory(self.root, relative_dir)
+        else:
+            matcher = IgnoreMatcher.from_gitignore(self.root)
+        self._matchers[relative_dir] = (stamps, parent, matcher)
+        return matcher
+
+
+@lru_cache(maxsize=None)
+def default_repository() -> RepositoryContext:
+    """The context resolved from the environment, for tools called without one."""
+    return RepositoryContext.resolve()
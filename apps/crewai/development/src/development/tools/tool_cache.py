@@ -0,0 +1,140 @@
+import os
+import threading
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import wraps
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Dependencies of the cached call running in the current context, if any
+_dependencies: ContextVar[Optional[Dict[str, Optional[Tuple[int, int]]]]] = ContextVar(
+    "tool_cache_dependencies", default=None
+)
+
+
+def file_stamp(path: str) -> Optional[Tuple[int, int]]:
+    """Returns the mtime and size of a path, or None if it does not exist.
+
+    A directory's mtime changes whenever an entry is added, removed or
+    renamed, which is all a listing depends on.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def track(path: str) -> None:
+    """Records that the cached call being computed depends on path.
+
+    Tools call this for every file they read and directory they list;
+    outside a cached call it does nothing.
+    """
+    dependencies = _dependencies.get()
+    if dependencies is not None and path not in dependencies:
+        dependencies[path] = file_stamp(path)
+
+
+@dataclass
+class _Entry:
+    result: Any
+    dependencies: Dict[str, Optional[Tuple[int, int]]]
+
+    def is_fresh(self) -> bool:
+        return all(
+            file_stamp(path) == stamp for path, stamp in self.dependencies.items()
+        )
+
+
+class ToolCache:
+    """Memoizes file system tools shared by the agents of a crew.
+
+    Results are keyed by tool name, path and arguments, and are reused
+    until one of the files or directories the tool reported through track()
+    changes, so a tree is only re-walked once something in it has changed.
+    Paths are resolved the way the tools resolve them, against the
+    repository root rather than the current directory.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries: "OrderedDict[tuple, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def wrap(
+        self,
+        name: str,
+        func: Callable[..., Any],
+        resolve_path: Optional[Callable[[str], str]] = None,
+    ) -> Callable[..., Any]:
+        """Returns func with its results cached; its first argument is a path.
+
+        resolve_path turns the path into the absolute path the tool works
+        on, and should be the absolute() of the repository the tool is
+        bound to. It defaults to the default repository's.
+        """
+        if resolve_path is None:
+            from development.tools.repository import default_repository
+
+            resolve_path = default_repository().absolute
+
+        @wraps(func)
+        def cached(path: str, *args, **kwargs):
+            key = (
+                name,
+                os.path.normpath(resolve_path(path)),
+                args,
+                tuple(sorted(kwargs.items())),
+            )
+            with self._lock:
+                entry = self._entries.get(key)
+            if entry is not None:
+                if entry.is_fresh():
+                    with self._lock:
+                        self.hits += 1
+                        if key in self._entries:
+                            self._entries.move_to_end(key)
+                    return entry.result
+                with self._lock:
+                    self.invalidations += 1
+
+            token = _dependencies.set({})
+            try:
+                result = func(path, *args, **kwargs)
+                dependencies = _dependencies.get()
+            finally:
+                _dependencies.reset(token)
+
+            with self._lock:
+                self.misses += 1
+                self._entries[key] = _Entry(result, dependencies)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            return result
+
+        return cached
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "entries": len(self._entries),
+        }
+
+    def summary(self) -> str:
+        calls = self.hits + self.misses
+        hit_rate = self.hits / calls * 100 if calls else 0.0
+        return (
+            f"{self.hits} hits, {self.misses} misses ({hit_rate:.0f}% hit rate), "
+            f"{self.invalidations} invalidated, {len(self._entries)} entries"
+        )
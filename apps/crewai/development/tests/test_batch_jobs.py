@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+from batch_jobs import BatchJob, LocalBatchBackend
+from llm_dispatcher import LLMRequest
+
+
+def request(prompt):
+    return LLMRequest(model="claude", system="Compare", prompt=prompt, max_tokens=100)
+
+
+@pytest.fixture
+def backend(tmp_path):
+    def respond(llm_request):
+        if llm_request.prompt == "fail":
+            raise RuntimeError("refused")
+        return json.dumps({"echo": llm_request.prompt})
+
+    return LocalBatchBackend(str(tmp_path / "batches"), responder=respond)
+
+
+def submitted_job(path, backend):
+    job = BatchJob(str(path))
+    job.add("key_a", request("a"), kind="compare")
+    job.add("key_b", request("fail"), kind="rule:example")
+    job.add("key_a", request("ignored duplicate"))
+    job.submit(backend)
+    return job
+
+
+def test_job_file_round_trip(tmp_path, backend):
+    job = submitted_job(tmp_path / "job.json", backend)
+
+    loaded = BatchJob.load(str(job.path))
+    assert loaded.batch_id == job.batch_id
+    assert loaded.backend == "local"
+    assert loaded.status == "submitted"
+    assert loaded.requests == {"key_a": request("a"), "key_b": request("fail")}
+    assert loaded.kinds == {"key_a": "compare", "key_b": "rule:example"}
+
+
+def test_collect_stores_results_once_ended(tmp_path, backend):
+    submitted_job(tmp_path / "job.json", backend)
+    stored = {}
+
+    summary = BatchJob.load(str(tmp_path / "job.json")).collect(
+        backend, lambda key, text: stored.__setitem__(key, json.loads(text))
+    )
+
+    assert summary["status"] == "collected"
+    assert (summary["succeeded"], summary["failed"]) == (1, 1)
+    assert stored == {"key_a": {"echo": "a"}}
+    assert BatchJob.load(str(tmp_path / "job.json")).status == "collected"
+
+
+def test_results_rejected_by_store_count_as_failed(tmp_path, backend):
+    submitted_job(tmp_path / "job.json", backend)
+
+    def store(key, text):
+        raise ValueError("malformed")
+
+    summary = BatchJob.load(str(tmp_path / "job.json")).collect(backend, store)
+    assert (summary["succeeded"], summary["failed"]) == (0, 2)
+
+
+def test_collect_waits_for_the_batch(tmp_path):
+    backend = LocalBatchBackend(str(tmp_path / "batches"))
+    job = submitted_job(tmp_path / "job.json", backend)
+    summary = job.collect(backend, lambda key, text: None)
+    assert summary["status"] == "in_progress"
+
+
+def test_submitted_job_cannot_change(tmp_path, backend):
+    job = submitted_job(tmp_path / "job.json", backend)
+    with pytest.raises(ValueError):
+        job.add("key_c", request("c"))
+    with pytest.raises(ValueError):
+        job.submit(backend)
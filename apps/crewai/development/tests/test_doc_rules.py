@@ -0,0 +1,139 @@
+import pytest
+
+from doc_rules import (
+    DEFAULT_RULES,
+    FenceLanguageRule,
+    FrontmatterRule,
+    LinkRule,
+    LLMRule,
+    OverviewHeaderRule,
+    RelatedFilesRule,
+    Rule,
+    RuleEngine,
+    heading_anchors,
+)
+from document_model import DocumentModel
+
+DOCUMENT = """---
+title: Guide
+---
+
+## Overview
+
+Intro, see [setup](#setup-steps) and [usage](#usage).
+
+## Setup steps
+
+```
+pnpm install
+```
+
+```bash
+pnpm dev
+```
+
+### Overview
+
+Nested overviews are fine. [Nothing]() here.
+"""
+
+
+def check(rule, content, file_path="docs/guide.mdx"):
+    return rule.check(DocumentModel(content, file_path))
+
+
+def lines(issues):
+    return [issue["line_number"] for issue in issues]
+
+
+def test_rules_must_implement_their_checks():
+    class Incomplete(Rule):
+        id = "incomplete"
+
+    class IncompleteLLM(LLMRule):
+        def build_prompt(self, document):
+            return ""
+
+    with pytest.raises(TypeError):
+        Incomplete()
+    with pytest.raises(TypeError):
+        IncompleteLLM()
+
+
+def test_overview_header():
+    issues = check(OverviewHeaderRule(), DOCUMENT)
+    assert lines(issues) == [5]
+    assert issues[0] == {
+        "file": "docs/guide.mdx",
+        "type": "quality_issue",
+        "category": "unnecessary_header",
+        "line_number": 5,
+        "issue": 'Unnecessary "Overview" header found',
+        "explanation": 'The "Overview" header is automatically added by the table of contents and should be removed',
+        "context": DocumentModel(DOCUMENT, "docs/guide.mdx").context_around(5),
+        "recommendation": 'Remove the "Overview" header and keep the content',
+    }
+
+
+def test_fence_language():
+    assert lines(check(FenceLanguageRule(), DOCUMENT)) == [11]
+
+
+@pytest.mark.parametrize(
+    "content, expected",
+    [
+        (DOCUMENT, []),
+        ("# Guide\n", ["Missing frontmatter"]),
+        ("---\ndescription: A guide\n---\n# Guide\n", ["Missing title in frontmatter"]),
+        ("---\ntitle:\n---\n", ["Missing title in frontmatter"]),
+    ],
+)
+def test_frontmatter(content, expected):
+    assert [issue["issue"] for issue in check(FrontmatterRule(), content)] == expected
+
+
+def test_heading_anchors():
+    document = DocumentModel("# A `code` title!\n## Usage\n## Usage\n", "a.md")
+    assert heading_anchors(document) == {"a-code-title", "usage", "usage-1"}
+
+
+def test_links():
+    issues = check(LinkRule(), DOCUMENT)
+    assert [issue["issue"] for issue in issues] == [
+        "Link to a missing section: #usage",
+        "Link without a target",
+    ]
+    assert lines(issues) == [7, 21]
+    assert check(LinkRule(), "[Docs](/dev/getting-started/) [x](https://a.b)") == []
+
+
+def test_related_files():
+    assert lines(check(RelatedFilesRule(), DOCUMENT)) == [4]
+    assert check(RelatedFilesRule(), "# Guide\n## Related Files\n- `a.py`\n") == []
+
+
+def test_engine_runs_local_rules_in_order():
+    class Failing(Rule):
+        id = "failing"
+
+        def check(self, document):
+            raise RuntimeError("broken rule")
+
+    class Prompted(LLMRule):
+        id = "prompted"
+
+        def build_prompt(self, document):
+            return document.content
+
+        def parse_response(self, analysis, document):
+            return []
+
+    engine = RuleEngine([Failing(), Prompted(), *DEFAULT_RULES])
+    assert [rule.id for rule in engine.llm_rules] == ["prompted"]
+    issues = engine.run_local(DocumentModel(DOCUMENT, "docs/guide.mdx"))
+    assert [issue["category"] for issue in issues] == [
+        "unnecessary_header",
+        "missing_language",
+        "broken_link",
+        "broken_link",
+    ]
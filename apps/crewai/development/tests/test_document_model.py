@@ -0,0 +1,151 @@
+import re
+from pathlib import Path
+
+import pytest
+
+from document_model import DocumentModel, normalize_file_path
+
+DOCS_DIR = Path(__file__).resolve().parents[3] / "docs"
+
+
+def legacy_related_files(doc_content):
+    """The regex extraction the agent used before parsing markdown tokens."""
+    section_patterns = [
+        r"(?:##?\s*Related Files[^\n]*\n(?:[^\n]*\n)*?)((?:[-*]\s*`[^`]+`[^\n]*\n)+)",
+        r"(?:##?\s*Related Files[^\n]*\n(?:[^\n]*\n)*?)((?:[-*]\s*\/[^\n]+\n)+)",
+        r"(?:##?\s*Related Files[^\n]*\n(?:[^\n]*\n)*?)((?:[-*]\s*(?:`[^`]+`|\/[^\n]+)[^\n]*\n)+)",
+    ]
+    related_files = set()
+    for pattern in section_patterns:
+        for match in re.finditer(pattern, doc_content, re.MULTILINE | re.IGNORECASE):
+            file_list = match.group(1)
+            for found in re.findall(
+                r"(?:`([^`]+)`|[-*]\s*(\/[^\s\n]+))", file_list
+            ) + re.findall(r"(?:^|\s)(?:`([^`]+)`|(/[^\s,]+))", file_list):
+                clean_path = normalize_file_path((found[0] or found[1]).strip())
+                if clean_path:
+                    related_files.add(clean_path)
+
+    if not related_files:
+        for block in re.finditer(r"```(?:json|yaml)\n(.*?)```", doc_content, re.DOTALL):
+            for found in re.findall(
+                r'(?:"([^"]+\.[a-zA-Z]+)"|\'([^\']+\.[a-zA-Z]+)\')', block.group(1)
+            ):
+                clean_path = normalize_file_path((found[0] or found[1]).strip())
+                if clean_path:
+                    related_files.add(clean_path)
+    return related_files
+
+
+def related_files(content):
+    return set(DocumentModel(content, "doc.md").related_files)
+
+
+@pytest.mark.parametrize(
+    "path",
+    sorted(DOCS_DIR.rglob("*.md*")),
+    ids=lambda path: path.relative_to(DOCS_DIR).as_posix(),
+)
+def test_related_files_match_legacy_extraction_on_site_docs(path):
+    content = path.read_text(encoding="utf-8")
+    assert related_files(content) == legacy_related_files(content)
+
+
+SIMPLE = """# Guide
+
+## Related Files
+
+The files below implement the guide:
+
+- `src/app.ts` - entry point
+- /src/lib/util.ts
+* `./config/settings.json`
+- `node_modules/pkg/index.js`
+- `README`
+"""
+
+
+def test_related_files_section():
+    assert related_files(SIMPLE) == {
+        "src/app.ts",
+        "src/lib/util.ts",
+        "config/settings.json",
+    }
+    assert related_files(SIMPLE) == legacy_related_files(SIMPLE)
+
+
+def test_related_files_section_ends_at_same_level_heading():
+    content = """## Related Files
+
+- `src/a.py`
+
+### Tests
+
+- `tests/test_a.py`
+
+## Usage
+
+- `src/usage.py`
+"""
+    assert related_files(content) == {"src/a.py", "tests/test_a.py"}
+
+
+def test_related_files_section_without_list_does_not_take_later_lists():
+    content = """## Related Files
+
+See the source.
+
+## Usage
+
+- `src/usage.py`
+"""
+    # The regex skipped ahead to the next list, whatever section it was in
+    assert legacy_related_files(content) == {"src/usage.py"}
+    assert related_files(content) == set()
+
+
+def test_related_files_from_nested_lists():
+    content = """## Related Files
+
+- Backend
+  - `api/server.py`
+  - /api/routes.py
+- `web/app.ts` and `web/main.ts`
+"""
+    assert related_files(content) == {
+        "api/server.py",
+        "api/routes.py",
+        "web/app.ts",
+        "web/main.ts",
+    }
+
+
+def test_related_files_fall_back_to_json_and_yaml_examples():
+    content = """# Config
+
+```json
+{"main": "./dist/index.js", "types": "src/index.d.ts", "name": "pkg"}
+```
+
+```yaml
+entry: 'apps/web/main.ts'
+```
+
+```ts
+import x from "./ignored.ts";
+```
+"""
+    assert related_files(content) == {"src/index.d.ts", "apps/web/main.ts"}
+    assert related_files(content) == legacy_related_files(content)
+
+
+def test_related_files_inside_jsx_components():
+    content = """<Tabs>
+
+## Related Files
+
+- `src/tabs.ts`
+
+</Tabs>
+"""
+    assert related_files(content) == {"src/tabs.ts"}
@@ -0,0 +1,83 @@
+import pytest
+
+from development.tools.file_tools import MAX_READ_LENGTH, read_file
+from development.tools.repository import RepositoryContext
+
+MARKDOWN = """# Title
+
+Intro.
+
+```bash
+# not a heading
+```
+
+## Usage
+"""
+
+
+@pytest.fixture
+def repository(tmp_path):
+    (tmp_path / "data.txt").write_text("".join(f"line {i}\n" for i in range(1, 101)))
+    (tmp_path / "guide.md").write_text(MARKDOWN)
+    (tmp_path / "app.py").write_text(
+        "import os\n\nclass App:\n    def run(self):\n        pass\n\nasync def main():\n    pass\n"
+    )
+    (tmp_path / "empty.txt").write_text("")
+    return RepositoryContext(str(tmp_path))
+
+
+def read(repository, path, **kwargs):
+    return read_file(path, repository=repository, **kwargs)
+
+
+def test_pages_through_bytes(repository):
+    with open(repository.absolute("data.txt")) as f:
+        text = f.read()
+    first = read(repository, "data.txt", length=50)
+    assert first.startswith("line 1\n")
+    assert f"bytes 0-50 of {len(text)}, continue with offset=50" in first
+
+    pages = [
+        read(repository, "data.txt", offset=offset, length=50).split("\n... (")[0]
+        for offset in range(0, len(text), 50)
+    ]
+    assert "".join(pages) == text
+
+
+def test_offset_past_end(repository):
+    assert "past the end" in read(repository, "data.txt", offset=10**6)
+    assert read(repository, "empty.txt") == ""
+
+
+def test_reads_line_ranges(repository):
+    lines = read(repository, "data.txt", start_line=10, end_line=12).split("\n")
+    assert [line.split(None, 1) for line in lines] == [
+        ["10", "line 10"],
+        ["11", "line 11"],
+        ["12", "line 12"],
+    ]
+    truncated = read(repository, "data.txt", start_line=1, length=40)
+    assert truncated.endswith("continue with start_line=3)")
+    assert "fewer than 500 lines" in read(repository, "data.txt", start_line=500)
+
+
+def test_outlines(repository):
+    outline = read(repository, "guide.md", outline=True)
+    assert "# Title" in outline and "## Usage" in outline
+    assert "not a heading" not in outline
+    outline = read(repository, "app.py", outline=True)
+    assert "class App:" in outline and "async def main():" in outline
+    assert "def run" not in outline
+
+
+def test_length_is_capped(tmp_path):
+    (tmp_path / "big.txt").write_text("x" * (MAX_READ_LENGTH * 3))
+    content = read(RepositoryContext(str(tmp_path)), "big.txt", length=10**9)
+    assert content.count("x") == MAX_READ_LENGTH
+    assert f"continue with offset={MAX_READ_LENGTH}" in content
+
+
+def test_rejects_invalid_arguments(repository):
+    assert read(repository, "data.txt", length=0).startswith("Error reading file")
+    assert read(repository, "data.txt", offset=-1).startswith("Error reading file")
+    assert read(repository, "missing.txt").startswith("Error reading file")
@@ -0,0 +1,61 @@
+from fingerprints import FingerprintIndex, normalize, winnow
+
+SOURCE = """import os
+
+
+def load_config(path):
+    # Read the settings file
+    with open(path) as f:
+        return parse(f.read())
+
+
+def save_config(path, config):
+    with open(path, "w") as f:
+        f.write(render(config))
+
+
+class Store:
+    def get(self, key):
+        return self.items[key]
+"""
+
+
+def test_normalize_maps_characters_to_lines():
+    text, line_of = normalize("a = 1  # note\n\n  b=2")
+    assert text == "a=1b=2"
+    assert list(line_of) == [0, 0, 0, 2, 2, 2]
+
+
+def test_winnow_selects_matching_fingerprints_in_matching_text():
+    shared = "returnparse(f.read())"
+    left = {h for h, _ in winnow("xxxxxxxx" + shared)}
+    right = {h for h, _ in winnow(shared + "yyyyyyyyyy")}
+    assert left & right
+
+
+def test_exact_block_ignores_whitespace_and_comments():
+    block = "def save_config(path, config):\n  with open(path, 'w') as f:  # write\n    f.write(render(config))"
+    index = FingerprintIndex(SOURCE.replace('"w"', "'w'"))
+    match = index.find(block)
+    assert match.similarity == 1.0
+    assert (match.start_line, match.end_line) == (10, 12)
+    assert match.code.startswith("def save_config")
+
+
+def test_edited_block_finds_its_region():
+    block = """def save_config(path, config):
+    with open(path, "w") as handle:
+        handle.write(render(config))"""
+    match = FingerprintIndex(SOURCE).find(block)
+    assert match is not None
+    assert 0 < match.similarity < 1.0
+    assert match.start_line <= 10 <= match.end_line
+
+
+def test_unrelated_block_is_not_found():
+    assert FingerprintIndex(SOURCE).find("SELECT * FROM users WHERE id = 1;") is None
+
+
+def test_empty_inputs():
+    assert FingerprintIndex("").find("anything") is None
+    assert FingerprintIndex(SOURCE).find("   # only a comment") is None
@@ -0,0 +1,78 @@
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from development.tools.git_index import (
+    GitIndexError,
+    find_git_dir,
+    read_tracked_files,
+)
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="needs git")
+
+
+def git(repo, *args):
+    return subprocess.run(
+        ["git", "-C", str(repo), *args], check=True, capture_output=True, text=True
+    ).stdout
+
+
+def ls_files(repo):
+    return sorted(set(git(repo, "ls-files", "-z").split("\0")) - {""})
+
+
+@pytest.fixture
+def repo(tmp_path):
+    git(tmp_path, "init", "-q")
+    for path in ["README.md", "src/app.py", "src/nested/deep/util.ts", "ünïcode.md"]:
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text(path)
+    # Long names exercise the NUL padding of version 2 and 3 entries
+    long_name = "docs/" + "a" * 200 + ".md"
+    (tmp_path / "docs").mkdir()
+    (tmp_path / long_name).write_text("long")
+    (tmp_path / "untracked.txt").write_text("not added")
+    git(tmp_path, "add", "README.md", "src", "ünïcode.md", "docs")
+    return tmp_path
+
+
+@pytest.mark.parametrize("version", ["2", "3", "4"])
+def test_matches_git_ls_files(repo, version):
+    git(repo, "update-index", "--index-version", version)
+    files = read_tracked_files(find_git_dir(str(repo)))
+    assert sorted(files) == ls_files(repo)
+    assert "untracked.txt" not in files
+
+
+def test_lists_symlinks(repo):
+    os.symlink("README.md", repo / "link.md")
+    git(repo, "add", "link.md")
+    assert "link.md" in read_tracked_files(find_git_dir(str(repo)))
+
+
+def test_conflicted_file_listed_once(repo):
+    git(repo, "-c", "user.name=t", "-c", "user.email=t@t", "commit", "-qm", "base")
+    blob = git(repo, "hash-object", "-w", "README.md").strip()
+    info = "".join(f"100644 {blob} {stage}\tconflict.md\n" for stage in (1, 2, 3))
+    subprocess.run(
+        ["git", "-C", str(repo), "update-index", "--index-info"],
+        input=info,
+        text=True,
+        check=True,
+    )
+    files = read_tracked_files(find_git_dir(str(repo)))
+    assert files.count("conflict.md") == 1
+
+
+def test_follows_gitdir_pointer(repo, tmp_path_factory):
+    worktree = tmp_path_factory.mktemp("worktree")
+    (worktree / ".git").write_text(f"gitdir: {repo / '.git'}\n")
+    assert find_git_dir(str(worktree)) == os.path.normpath(str(repo / ".git"))
+
+
+def test_rejects_other_files(tmp_path):
+    (tmp_path / "index").write_bytes(b"not an index")
+    with pytest.raises(GitIndexError):
+        read_tracked_files(str(tmp_path))
@@ -0,0 +1,126 @@
+import random
+
+import pytest
+
+from codebase_index import CodebaseIndex, keyword_tokens
+from keyword_matcher import KeywordMatcher, match_file
+
+
+def naive(keywords, text):
+    return [
+        keyword for keyword in dict.fromkeys(keywords) if keyword and keyword in text
+    ]
+
+
+@pytest.mark.parametrize(
+    "keywords, text, expected",
+    [
+        (["he", "she", "his", "hers"], "ushers", ["he", "she", "hers"]),
+        (["abc", "bc", "c"], "xxabcxx", ["abc", "bc", "c"]),
+        (["aaa", "aa"], "aaaa", ["aaa", "aa"]),
+        (["missing"], "nothing to see", []),
+        (["café", "naïve"], "un café naïve", ["café", "naïve"]),
+        ([], "anything", []),
+    ],
+)
+def test_find_all(keywords, text, expected):
+    assert KeywordMatcher(keywords).find_all(text) == expected
+
+
+def test_returns_keywords_in_keyword_order():
+    matcher = KeywordMatcher(["zeta", "alpha", "zeta", ""])
+    assert matcher.keywords == ["zeta", "alpha"]
+    assert matcher.find_all("alpha zeta") == ["zeta", "alpha"]
+
+
+def test_scans_bytes_like_str():
+    matcher = KeywordMatcher(["useState", "effect"])
+    text = "const [a] = useState(); // side effect"
+    assert matcher.find_all(text.encode()) == matcher.find_all(text)
+    assert matcher.find_all(memoryview(text.encode())) == ["useState", "effect"]
+
+
+def test_agrees_with_substring_search():
+    rng = random.Random(7)
+    for _ in range(200):
+        keywords = ["".join(rng.choices("abc", k=rng.randint(1, 4))) for _ in range(6)]
+        text = "".join(rng.choices("abcd", k=rng.randint(0, 40)))
+        assert KeywordMatcher(keywords).find_all(text) == naive(keywords, text)
+
+
+def test_match_file_skips_binary_files(tmp_path):
+    (tmp_path / "a.py").write_text("def handler(): pass")
+    (tmp_path / "b.bin").write_bytes(b"handler\0\0\0")
+    matcher = KeywordMatcher(["handler"])
+    assert match_file(matcher, tmp_path, "a.py") == ("a.py", ["handler"])
+    assert match_file(matcher, tmp_path, "b.bin") == ("b.bin", [])
+
+
+@pytest.mark.parametrize(
+    "keyword, lookups",
+    [
+        ("Thing", {("exact", "Thing", None, None)}),
+        ("123abc", {("exact", "123abc", None, None)}),
+        (
+            "npm run dev",
+            {
+                ("suffix", "npm", None, " "),
+                ("exact", "run", " ", " "),
+                ("prefix", "dev", " ", None),
+            },
+        ),
+        (".env", {("prefix", "env", ".", None)}),
+        ("apps/*", {("suffix", "apps", None, "/")}),
+        ("->", None),
+    ],
+)
+def test_keyword_tokens(keyword, lookups):
+    assert keyword_tokens(keyword) == lookups
+
+
+def build_index(tmp_path, files):
+    for name, content in files.items():
+        (tmp_path / name).write_text(content)
+    index = CodebaseIndex(str(tmp_path), str(tmp_path / "index.db"))
+    index.update([tmp_path / name for name in files])
+    return index
+
+
+def test_index_lookup_keeps_token_semantics(tmp_path):
+    files = {
+        "a.ts": "useThing()\nconst Other = 1",
+        "b.ts": "useThingHook()",
+        "c.ts": "Thing",
+        "d.sh": "npm run dev && foo-bar",
+    }
+    keywords = ["Thing", "Other", "foo-bar", "npm run dev", "->"]
+    with build_index(tmp_path, files) as index:
+        candidates = index.lookup(keywords)
+
+    assert sorted(path for path, found in candidates.items() if "Thing" in found) == [
+        "c.ts"
+    ]
+    assert sorted(p for p, found in candidates.items() if "foo-bar" in found) == [
+        "d.sh"
+    ]
+    assert "npm run dev" in candidates["d.sh"]
+    # Keywords without word characters are checked in every file
+    assert all("->" in found for found in candidates.values())
+
+
+def test_index_narrows_keywords_with_partial_words(tmp_path):
+    files = {
+        "load.py": "load_dotenv('.env')",
+        "example.md": "Copy .env.example to .env",
+        "names.py": "environment = dotenv",
+        "turbo.md": "See turbo.json and pyproject.toml",
+        "other.md": "json turbo",
+    }
+    with build_index(tmp_path, files) as index:
+        assert index.lookup([".env"]) == {
+            "load.py": [".env"],
+            "example.md": [".env"],
+        }
+        assert index.lookup(["turbo.json", "pyproject.toml"]) == {
+            "turbo.md": ["turbo.json", "pyproject.toml"]
+        }
@@ -0,0 +1,69 @@
+import os
+import time
+
+from llm_cache import ResultCache, make_cache_key
+
+
+def age(cache, key, seconds):
+    """Moves an entry's last use back in time."""
+    path = cache._path(key)
+    then = time.time() - seconds
+    os.utime(path, (then, then))
+
+
+def test_keys_depend_on_every_part():
+    assert make_cache_key("model", "prompt") == make_cache_key("model", "prompt")
+    assert make_cache_key("model", "prompt") != make_cache_key("model", "prompt2")
+
+
+def test_round_trip_and_counters(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    key = make_cache_key("a")
+    assert cache.get(key) is None
+    cache.set(key, {"discrepancies": []})
+    assert cache.get(key) == {"discrepancies": []}
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["stores"]) == (1, 1, 1)
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = ResultCache(str(tmp_path), ttl_seconds=60)
+    key = make_cache_key("a")
+    cache.set(key, 1)
+    age(cache, key, 120)
+    assert cache.get(key) is None
+    assert not cache._path(key).exists()
+
+
+def test_evicts_least_recently_used_past_max_entries(tmp_path):
+    cache = ResultCache(str(tmp_path), ttl_seconds=None, max_entries=10)
+    keys = [make_cache_key(i) for i in range(10)]
+    for i, key in enumerate(keys):
+        cache.set(key, i)
+        age(cache, key, 100 - i)
+    # Reading an old entry makes it recently used
+    assert cache.get(keys[0]) == 0
+
+    cache.set(make_cache_key("new"), "new")
+
+    remaining = [key for key in keys if cache._path(key).exists()]
+    assert len(remaining) == 8
+    assert keys[0] in remaining
+    assert keys[1] not in remaining and keys[2] not in remaining
+    assert cache.stats()["evictions"] == 2
+
+
+def test_evicts_past_max_bytes(tmp_path):
+    cache = ResultCache(str(tmp_path), ttl_seconds=None, max_bytes=1000)
+    for i in range(20):
+        cache.set(make_cache_key(i), "x" * 100)
+    assert cache.stats()["evictions"] > 0
+    assert sum(path.stat().st_size for path in tmp_path.glob("*/*.json")) <= 1000
+
+
+def test_size_survives_reopening(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    for i in range(3):
+        cache.set(make_cache_key(i), i)
+    reopened = ResultCache(str(tmp_path))
+    assert reopened.stats()["entries"] == 3
@@ -0,0 +1,27 @@
+from llm_dispatcher import batched_results
+
+
+def test_batched_results_accept_quoted_numbers():
+    analysis = {
+        "results": [
+            {"id": 1, "discrepancies": []},
+            {"id": "2", "discrepancies": [{"type": "semantic_mismatch"}]},
+            {"id": " 3 ", "discrepancies": []},
+        ]
+    }
+    results = batched_results(analysis)
+    assert sorted(results) == [1, 2, 3]
+    assert results[2]["discrepancies"] == [{"type": "semantic_mismatch"}]
+
+
+def test_batched_results_drop_results_without_a_number():
+    analysis = {
+        "results": [
+            {"id": "second", "discrepancies": []},
+            {"discrepancies": []},
+            "not a result",
+            {"id": 4, "discrepancies": []},
+        ]
+    }
+    assert list(batched_results(analysis)) == [4]
+    assert batched_results({}) == {}
@@ -0,0 +1,138 @@
+import io
+import json
+
+import pytest
+
+from report_formats import (
+    SARIF_VERSION,
+    artifact_uri,
+    findings_writer,
+    write_jsonl,
+    write_sarif,
+)
+
+QUALITY_ISSUE = {
+    "file": "src/content/docs/guide.mdx",
+    "type": "quality_issue",
+    "category": "unnecessary_header",
+    "line_number": 5,
+    "issue": 'Unnecessary "Overview" header found',
+    "explanation": "Added by the table of contents",
+    "context": "## Overview",
+    "recommendation": "Remove it",
+}
+
+SEMANTIC_MISMATCH = {
+    "file": "/repo/src/app.ts",
+    "type": "semantic_mismatch",
+    "language": "typescript",
+    "context": {"type": "signature", "severity": "high", "explanation": "Renamed"},
+    "docs_version": "start()",
+    "code_version": "run()",
+}
+
+JSON_MISMATCH = {
+    "file": "/repo/package.json",
+    "type": "json_value_mismatch",
+    "path": "scripts.dev",
+    "context": {"docs_value": "vite", "actual_value": "astro dev"},
+    "docs_version": "{}",
+    "code_version": "{}",
+}
+
+FINDINGS = [QUALITY_ISSUE, SEMANTIC_MISMATCH, JSON_MISMATCH, dict(QUALITY_ISSUE)]
+
+
+def test_jsonl_writes_one_finding_per_line():
+    out = io.StringIO()
+    assert write_jsonl(FINDINGS, out, docs_url="docs/guide.mdx") == 4
+    lines = out.getvalue().splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {"docs_url": "docs/guide.mdx", **finding} for finding in FINDINGS
+    ]
+
+
+def test_sarif_log_shape():
+    out = io.StringIO()
+    assert (
+        write_sarif(FINDINGS, out, base_dir="/repo", source_dir="/repo/apps/docs") == 4
+    )
+    log = json.loads(out.getvalue())
+
+    assert log["version"] == SARIF_VERSION == "2.1.0"
+    (run,) = log["runs"]
+    assert run["tool"]["driver"]["name"] == "docs-review-agent"
+    rules = run["tool"]["driver"]["rules"]
+    assert [rule["id"] for rule in rules] == [
+        "unnecessary_header",
+        "semantic_mismatch/signature",
+        "json_value_mismatch",
+    ]
+    assert all(rule["shortDescription"]["text"] for rule in rules)
+
+    results = run["results"]
+    assert [result["ruleId"] for result in results] == [
+        "unnecessary_header",
+        "semantic_mismatch/signature",
+        "json_value_mismatch",
+        "unnecessary_header",
+    ]
+    assert [result["level"] for result in results] == [
+        "warning",
+        "error",
+        "warning",
+        "warning",
+    ]
+    locations = [result["locations"][0]["physicalLocation"] for result in results]
+    assert locations[0] == {
+        "artifactLocation": {"uri": "apps/docs/src/content/docs/guide.mdx"},
+        "region": {"startLine": 5},
+    }
+    assert locations[1] == {"artifactLocation": {"uri": "src/app.ts"}}
+    assert results[2]["message"]["text"] == (
+        "JSON value at `scripts.dev` is vite in the documentation "
+        "but astro dev in the file"
+    )
+    assert results[1]["properties"]["code_version"] == "run()"
+
+
+def test_empty_sarif_log_is_valid():
+    out = io.StringIO()
+    assert write_sarif([], out) == 0
+    log = json.loads(out.getvalue())
+    assert log["runs"][0]["results"] == []
+    assert log["runs"][0]["tool"]["driver"]["rules"] == []
+
+
+def test_writers_emit_findings_as_they_are_added():
+    out = io.StringIO()
+    writer = findings_writer(out, "jsonl", docs_url="guide")
+    writer.add([QUALITY_ISSUE])
+    assert out.getvalue().count("\n") == 1
+    writer.add([SEMANTIC_MISMATCH, JSON_MISMATCH])
+    assert writer.finish() == 3
+
+    out = io.StringIO()
+    writer = findings_writer(out, "sarif", base_dir="/repo")
+    writer.add([SEMANTIC_MISMATCH])
+    assert '"ruleId": "semantic_mismatch/signature"' in out.getvalue()
+    writer.add([JSON_MISMATCH])
+    assert writer.finish() == 2
+    assert len(json.loads(out.getvalue())["runs"][0]["results"]) == 2
+
+
+def test_unknown_findings_format():
+    with pytest.raises(ValueError):
+        findings_writer(io.StringIO(), "xml")
+
+
+@pytest.mark.parametrize(
+    "file_path, base_dir, source_dir, expected",
+    [
+        ("docs/a.md", "/repo", "/repo/apps", "apps/docs/a.md"),
+        ("/elsewhere/a.md", "/repo", None, "/elsewhere/a.md"),
+        ("https://example.com/a", "/repo", None, "https://example.com/a"),
+    ],
+)
+def test_artifact_uri(file_path, base_dir, source_dir, expected):
+    assert artifact_uri(file_path, base_dir, source_dir) == expected
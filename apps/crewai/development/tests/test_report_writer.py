@@ -0,0 +1,271 @@
+import io
+
+import pytest
+
+from report_writer import CombinedReportWriter, QualityReportWriter
+
+
+def legacy_quality_report(issues):
+    """The quality report as the agent formatted it before the report writer."""
+    report = f"# Documentation Quality Report\n\n"
+
+    if not issues:
+        report += "✅ **No quality issues found in documentation.**\n"
+        return report
+
+    report += f"## Found Issues ({len(issues)})\n\n"
+
+    by_file = {}
+    for issue in issues:
+        by_file.setdefault(issue["file"], []).append(issue)
+
+    for file_path, file_issues in by_file.items():
+        report += f"### File: `{file_path}`\n\n"
+
+        for i, issue in enumerate(file_issues, 1):
+            report += f"#### Issue {i}: {issue['issue']}\n"
+            report += f"- **Category**: {issue['category']}\n"
+            report += f"- **Line**: {issue['line_number']}\n"
+            report += f"- **Explanation**: {issue['explanation']}\n"
+
+            if issue.get("context"):
+                report += "\nContext:\n```markdown\n"
+                report += issue["context"]
+                report += "\n```\n"
+
+            report += f"\n**Recommendation**: {issue['recommendation']}\n\n"
+
+    report += "## Summary of Requirements\n"
+    report += "1. ❌ Do not include '# Overview' headers - these are automatically added by the table of contents\n"
+
+    return report
+
+
+def legacy_combined_report(docs_url, discrepancies, related_files, quality_issues):
+    """The review report as the agent formatted it before the report writer."""
+    report = f"# Documentation Review Report\n\n"
+    report += f"## Reviewed Documentation\n{docs_url}\n\n"
+
+    report += "## Documentation Quality Issues\n"
+    if quality_issues:
+        report += f"\nFound {len(quality_issues)} quality issue(s):\n\n"
+        for issue in quality_issues:
+            report += f"### {issue['issue']}\n"
+            report += f"- **Line**: {issue['line_number']}\n"
+            report += f"- **Explanation**: {issue['explanation']}\n"
+            if issue.get("context"):
+                report += "\nContext:\n```markdown\n"
+                report += issue["context"]
+                report += "\n```\n"
+            report += f"\n**Recommendation**: {issue['recommendation']}\n\n"
+    else:
+        report += "\n✅ No quality issues found.\n"
+
+    report += "\n## Related Files\n"
+    if related_files:
+        for file in related_files:
+            report += f"- `{file}`\n"
+    else:
+        report += "*No related files explicitly mentioned in documentation*\n"
+
+    if not discrepancies:
+        report += (
+            "\n✅ **No code discrepancies found between documentation and codebase.**\n"
+        )
+        return report
+
+    report += f"\n## Code Discrepancies ({len(discrepancies)})\n"
+
+    by_file = {}
+    for disc in discrepancies:
+        by_file.setdefault(disc["file"], []).append(disc)
+
+    for file_path, file_discs in by_file.items():
+        report += f"\n### File: `{file_path}`\n"
+
+        for i, disc in enumerate(file_discs, 1):
+            report += f"\n#### Discrepancy {i}\n"
+
+            if disc["type"] == "json_value_mismatch":
+                report += f"*JSON Path: `{disc['path']}`*\n\n"
+                report += "```diff\n"
+                report += f"- Documentation version: {disc['context']['docs_value']}\n"
+                report += f"+ Actual value: {disc['context']['actual_value']}\n"
+                report += "```\n"
+
+                report += "\nJSON Context:\n"
+                report += "```json\n"
+                report += f"# Documentation version:\n{disc['docs_version']}\n"
+                report += f"\n# Actual version:\n{disc['code_version']}\n"
+                report += "```\n"
+            elif disc["type"] == "semantic_mismatch":
+                report += f"*Type: {disc['context']['type']}*\n"
+                report += f"*Severity: {disc['context']['severity']}*\n"
+                report += f"*Language: {disc['language']}*\n\n"
+
+                report += "```diff\n"
+                report += f"- Documentation version:\n{disc['docs_version']}\n"
+                report += f"+ Actual code:\n{disc['code_version']}\n"
+                report += "```\n"
+
+                report += f"\nExplanation: {disc['context']['explanation']}\n"
+            else:
+                if disc.get("language"):
+                    report += f"*Language: {disc['language']}*\n\n"
+
+                report += "```diff\n"
+                report += f"- Documentation version:\n{disc['docs_version']}\n"
+                report += f"+ Actual code:\n{disc['code_version']}\n"
+                report += "```\n"
+
+                if context := disc.get("context"):
+                    report += "\nContext:\n"
+                    if context.get("before"):
+                        report += f"```\n# Before\n{context['before']}\n```\n"
+                    if context.get("after"):
+                        report += f"```\n# After\n{context['after']}\n```\n"
+
+    report += "\n## Recommendations\n"
+    report += (
+        "1. Update the documentation to match the current codebase implementation\n"
+    )
+    report += (
+        "2. Add version information to code examples if they represent older versions\n"
+    )
+    report += (
+        "3. Consider adding automated documentation testing to your CI/CD pipeline\n"
+    )
+    report += "4. Review the 'Related Files' section to ensure all relevant files are listed\n"
+    report += (
+        "5. Address any quality issues found to improve documentation consistency\n"
+    )
+
+    return report
+
+
+ISSUES = [
+    {
+        "file": "docs/a.md",
+        "issue": "Overview header",
+        "category": "structure",
+        "line_number": 3,
+        "explanation": "Added by the table of contents",
+        "context": "# Overview",
+        "recommendation": "Remove it",
+    },
+    {
+        "file": "docs/b.md",
+        "issue": "Missing language",
+        "category": "formatting",
+        "line_number": 10,
+        "explanation": "Fence without a language",
+        "recommendation": "Tag the fence",
+    },
+    {
+        "file": "docs/a.md",
+        "issue": "Broken link",
+        "category": "links",
+        "line_number": 20,
+        "explanation": "Target does not exist",
+        "recommendation": "Fix the link",
+    },
+]
+
+DISCREPANCIES = [
+    {
+        "file": "package.json",
+        "type": "json_value_mismatch",
+        "path": "scripts.dev",
+        "context": {"docs_value": "vite", "actual_value": "astro dev"},
+        "docs_version": '{"dev": "vite"}',
+        "code_version": '{"dev": "astro dev"}',
+    },
+    {
+        "file": "src/app.ts",
+        "type": "semantic_mismatch",
+        "language": "typescript",
+        "context": {"type": "signature", "severity": "high", "explanation": "Renamed"},
+        "docs_version": "start()",
+        "code_version": "run()",
+    },
+    {
+        "file": "package.json",
+        "type": "code_mismatch",
+        "language": "json",
+        "context": {"before": "{", "after": "}"},
+        "docs_version": '"name": "a"',
+        "code_version": '"name": "b"',
+    },
+]
+
+
+@pytest.mark.parametrize("issues", [ISSUES, []])
+def test_buffered_quality_report_matches_legacy_format(issues):
+    writer = QualityReportWriter()
+    writer.add_issues(issues)
+    assert writer.finish() == legacy_quality_report(issues)
+
+
+@pytest.mark.parametrize(
+    "discrepancies, related_files, quality_issues",
+    [
+        (DISCREPANCIES, ["package.json", "src/app.ts"], ISSUES[:2]),
+        ([], [], []),
+    ],
+)
+def test_buffered_combined_report_matches_legacy_format(
+    discrepancies, related_files, quality_issues
+):
+    writer = CombinedReportWriter("docs/a.md", related_files, quality_issues)
+    writer.add_discrepancies(discrepancies)
+    assert writer.finish() == legacy_combined_report(
+        "docs/a.md", discrepancies, related_files, quality_issues
+    )
+
+
+def test_streamed_report_writes_sections_as_they_are_added():
+    out = io.StringIO()
+    writer = QualityReportWriter(out)
+    assert out.getvalue() == "# Documentation Quality Report\n\n"
+
+    writer.add_file("docs/a.md", ISSUES[:1])
+    assert out.getvalue().endswith("**Recommendation**: Remove it\n\n")
+    writer.add_file("docs/b.md", ISSUES[1:2])
+    assert writer.finish() is None
+
+    # Only the heading and the total differ from the buffered report
+    streamed = out.getvalue()
+    assert "## Found Issues\n\n" in streamed
+    assert "**Total**: 2 issue(s) in 2 file(s)\n\n" in streamed
+    legacy = legacy_quality_report(ISSUES[:2])
+    assert (
+        streamed.replace("## Found Issues\n", "## Found Issues (2)\n").replace(
+            "**Total**: 2 issue(s) in 2 file(s)\n\n", ""
+        )
+        == legacy
+    )
+
+
+def test_streamed_combined_report_states_total_at_the_end():
+    out = io.StringIO()
+    writer = CombinedReportWriter("docs/a.md", ["package.json"], None, out)
+    assert "Not re-checked" in out.getvalue()
+    writer.add_discrepancies(DISCREPANCIES)
+    writer.finish()
+    streamed = out.getvalue()
+    assert "\n## Code Discrepancies\n" in streamed
+    assert streamed.index("**Total**: 3 discrepancy(ies)") < streamed.index(
+        "## Recommendations"
+    )
+
+
+def test_abandoned_report_says_why():
+    out = io.StringIO()
+    writer = QualityReportWriter(out)
+    writer.add_file("docs/a.md", ISSUES[:1])
+    writer.abandon("scan failed: boom")
+    assert out.getvalue().endswith("⚠️ **Report incomplete**: scan failed: boom\n")
+
+    buffered = QualityReportWriter()
+    buffered.abandon("scan failed: boom")
+    assert "incomplete" not in buffered.finish()
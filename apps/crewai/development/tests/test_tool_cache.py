@@ -0,0 +1,59 @@
+import os
+
+import pytest
+
+from development.tools.file_tools import bind_repository, read_file
+from development.tools.repository import RepositoryContext
+from development.tools.tool_cache import ToolCache
+
+
+@pytest.fixture
+def repository(tmp_path):
+    root = tmp_path / "repo"
+    root.mkdir()
+    (root / "notes.txt").write_text("repository notes\n")
+    return RepositoryContext(str(root))
+
+
+def cached_read_file(cache, repository):
+    return cache.wrap(
+        "read_file", bind_repository(read_file, repository), repository.absolute
+    )
+
+
+def test_paths_resolve_against_the_repository(tmp_path, repository, monkeypatch):
+    elsewhere = tmp_path / "elsewhere"
+    elsewhere.mkdir()
+    (elsewhere / "notes.txt").write_text("unrelated notes\n")
+    monkeypatch.chdir(elsewhere)
+
+    cache = ToolCache()
+    read = cached_read_file(cache, repository)
+    assert "repository notes" in read("notes.txt")
+    assert "repository notes" in read(os.path.join(repository.root, "notes.txt"))
+    assert "repository notes" in read("./notes.txt")
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["hits"] == 2
+
+
+def test_changed_files_invalidate_results(repository):
+    cache = ToolCache()
+    read = cached_read_file(cache, repository)
+    assert "repository notes" in read("notes.txt")
+
+    path = repository.absolute("notes.txt")
+    with open(path, "w") as f:
+        f.write("rewritten, and longer than before\n")
+    assert "rewritten" in read("notes.txt")
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_each_repository_has_its_own_entries(tmp_path, repository):
+    other_root = tmp_path / "other"
+    other_root.mkdir()
+    (other_root / "notes.txt").write_text("other notes\n")
+    other = RepositoryContext(str(other_root))
+
+    cache = ToolCache()
+    assert "repository notes" in cached_read_file(cache, repository)("notes.txt")
+    assert "other notes" in cached_read_file(cache, other)("notes.txt")